@@ -0,0 +1,95 @@
+# ========================================================================
+# File: app/artifact_store.py
+# Deskripsi: Penyimpanan file hasil ekspor yang dialamatkan berdasarkan hash
+#            konten. Ekspor ulang dengan isi yang sama langsung memakai file
+#            yang sudah ada; file lama dibersihkan berdasarkan umur dan total
+#            ukuran direktori.
+# ========================================================================
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+_KEY_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+
+class ArtifactStore:
+    def __init__(self, directory, max_age_seconds=24 * 3600, max_total_bytes=500 * 1024 * 1024):
+        self.directory = directory
+        self.max_age_seconds = max_age_seconds
+        self.max_total_bytes = max_total_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(*parts):
+        """Hash SHA-256 dari bagian-bagian yang menentukan isi artefak."""
+        payload = json.dumps(parts, ensure_ascii=False, sort_keys=True).encode('utf-8')
+        return hashlib.sha256(payload).hexdigest()
+
+    @staticmethod
+    def is_valid_key(key):
+        return bool(_KEY_PATTERN.match(key or ''))
+
+    def path_for(self, key, extension):
+        return os.path.join(self.directory, f"{key}.{extension}")
+
+    def find(self, key, extensions):
+        """Mengembalikan (path, ekstensi) artefak yang sudah ada, atau (None, None)."""
+        if not self.is_valid_key(key):
+            return None, None
+        for extension in extensions:
+            path = self.path_for(key, extension)
+            if os.path.exists(path):
+                return path, extension
+        return None, None
+
+    def write(self, key, extension, render):
+        """
+        Memanggil render(file) untuk menulis artefak ke file sementara lalu
+        memindahkannya secara atomik ke lokasi akhirnya.
+        """
+        path = self.path_for(key, extension)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                render(f)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.evict()
+        return path
+
+    def evict(self):
+        """Menghapus artefak yang kedaluwarsa, lalu yang tertua jika total ukuran melebihi batas."""
+        with self._lock:
+            now = time.time()
+            entries = []
+            for entry in os.scandir(self.directory):
+                if not entry.is_file() or entry.name.endswith('.tmp'):
+                    continue
+                stat = entry.stat()
+                if now - stat.st_mtime > self.max_age_seconds:
+                    self._remove(entry.path)
+                else:
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total_bytes = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total_bytes <= self.max_total_bytes:
+                    break
+                self._remove(path)
+                total_bytes -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError as e:
+            print(f"Peringatan: Gagal menghapus artefak ekspor {path}: {e}")
@@ -0,0 +1,156 @@
+# ========================================================================
+# File: app/batch_analysis.py
+# Deskripsi: Menjalankan banyak uji statistik atas banyak kolom dalam satu
+#            request. Kolom dimuat sekali, pemisahan grup (group split)
+#            dihitung sekali dan dipakai bersama, lalu setiap uji dijalankan
+#            paralel di process pool seukuran jumlah core.
+# ========================================================================
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from app import stats_engine
+
+# Nama uji pada spec -> fungsi stats_engine (nama dari pengguna tidak pernah di-getattr)
+BATCH_FUNCTIONS = {
+    'normality': stats_engine.normality,
+    'descriptive': stats_engine.describe,
+    'levene': stats_engine.levene,
+    'bartlett': stats_engine.bartlett,
+    'independent_ttest': stats_engine.independent_ttest,
+    'paired_ttest': stats_engine.paired_ttest,
+}
+BATCH_TESTS = tuple(BATCH_FUNCTIONS)
+MAX_BATCH_SPECS = 200
+# Di bawah jumlah nilai ini, biaya mengirim data ke proses lain lebih mahal daripada menghitungnya
+INLINE_MAX_VALUES = 50_000
+
+_batch_pool = None
+
+
+def get_batch_pool():
+    global _batch_pool
+    if _batch_pool is None:
+        _batch_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 2)
+    return _batch_pool
+
+def run_test(test, args, kwargs):
+    """Dijalankan di worker: memanggil fungsi stats_engine dan mengembalikan dict hasil."""
+    return stats_engine.to_dict(BATCH_FUNCTIONS[test](*args, **kwargs))
+
+
+class _ColumnCache:
+    """Memuat kolom dan pemisahan grup sekali saja untuk seluruh batch."""
+    def __init__(self, load_columns):
+        self._load_columns = load_columns
+        self._values = {}
+        self._splits = {}
+
+    def preload(self, columns):
+        missing = [c for c in dict.fromkeys(columns) if c not in self._values]
+        if missing:
+            df = self._load_columns(missing)
+            for col in missing:
+                self._values[col] = df[col]
+
+    def numeric(self, column):
+        series = self._values[column]
+        return pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+
+    def split(self, column, group_column):
+        key = (column, group_column)
+        if key not in self._splits:
+            values = self.numeric(column)
+            codes, labels = pd.factorize(self._values[group_column], sort=True)
+            self._splits[key] = ([values[codes == i] for i in range(len(labels))], [str(l) for l in labels])
+        return self._splits[key]
+
+
+def _spec_columns(spec):
+    columns = list(spec.get('columns') or [])
+    group_column = (spec.get('params') or {}).get('group_column')
+    return columns + [group_column] if group_column else columns
+
+def plan_batch(specs, load_columns, available_columns):
+    """
+    Mengubah daftar spec {'id', 'test', 'columns', 'params'} menjadi daftar
+    tugas (meta, test, args, kwargs) dan daftar error per spec.
+    load_columns(list_kolom) harus mengembalikan DataFrame berisi kolom tersebut;
+    available_columns adalah nama kolom yang ada. Spec yang merujuk kolom tidak
+    dikenal dicatat sebagai error miliknya sendiri dan tidak ikut dimuat.
+    """
+    available = set(available_columns)
+    unknown = {}
+    for index, spec in enumerate(specs):
+        missing = [c for c in _spec_columns(spec) if not isinstance(c, str) or c not in available]
+        if missing:
+            unknown[index] = missing
+
+    cache = _ColumnCache(load_columns)
+    cache.preload([c for index, spec in enumerate(specs) if index not in unknown for c in _spec_columns(spec)])
+
+    tasks, errors = [], []
+    for index, spec in enumerate(specs):
+        spec_id = str(spec.get('id', index))
+        test = spec.get('test')
+        columns = spec.get('columns') or []
+        params = spec.get('params') or {}
+        group_column = params.get('group_column')
+        confidence = float(params.get('confidence_level', 95)) / 100.0
+
+        if test not in BATCH_TESTS:
+            errors.append({'id': spec_id, 'status': 'error', 'error': f"Jenis uji tidak dikenal: {test}"})
+            continue
+        if index in unknown:
+            errors.append({'id': spec_id, 'status': 'error', 'error': f"Kolom berikut tidak ditemukan: {', '.join(map(str, unknown[index]))}."})
+            continue
+        if not columns:
+            errors.append({'id': spec_id, 'status': 'error', 'error': 'Daftar kolom tidak boleh kosong.'})
+            continue
+
+        if test in ('normality', 'descriptive'):
+            for col in columns:
+                tasks.append(({'id': spec_id, 'test': test, 'column': col}, test, (cache.numeric(col),), {}))
+        elif test in ('levene', 'bartlett', 'independent_ttest') and group_column:
+            for col in columns:
+                groups, labels = cache.split(col, group_column)
+                meta = {'id': spec_id, 'test': test, 'column': col, 'groups': labels}
+                if test == 'independent_ttest':
+                    if len(groups) != 2:
+                        errors.append({**meta, 'status': 'error', 'error': f"Kolom grup '{group_column}' harus memiliki tepat 2 kategori."})
+                        continue
+                    tasks.append((meta, test, (groups[0], groups[1]), {'confidence': confidence}))
+                else:
+                    tasks.append((meta, test, (groups,), {}))
+        elif test in ('levene', 'bartlett'):
+            tasks.append(({'id': spec_id, 'test': test, 'columns': columns}, test, ([cache.numeric(c) for c in columns],), {}))
+        else:
+            if len(columns) != 2:
+                errors.append({'id': spec_id, 'status': 'error', 'error': 'Uji T membutuhkan tepat dua kolom (atau group_column).'})
+                continue
+            meta = {'id': spec_id, 'test': test, 'columns': columns}
+            tasks.append((meta, test, (cache.numeric(columns[0]), cache.numeric(columns[1])), {'confidence': confidence}))
+    return tasks, errors
+
+def run_batch(tasks):
+    """Menjalankan tugas dan menghasilkan dict hasil per tugas begitu selesai."""
+    total_values = sum(sum(np.size(a) for a in (args[0] if isinstance(args[0], list) else args)) for _, _, args, _ in tasks)
+    if total_values <= INLINE_MAX_VALUES or len(tasks) == 1:
+        for meta, test, args, kwargs in tasks:
+            try:
+                yield {**meta, 'status': 'success', 'result': run_test(test, args, kwargs)}
+            except Exception as e:
+                yield {**meta, 'status': 'error', 'error': str(e)}
+        return
+
+    pool = get_batch_pool()
+    futures = {pool.submit(run_test, test, args, kwargs): meta for meta, test, args, kwargs in tasks}
+    for future in as_completed(futures):
+        meta = futures[future]
+        try:
+            yield {**meta, 'status': 'success', 'result': future.result()}
+        except Exception as e:
+            yield {**meta, 'status': 'error', 'error': str(e)}
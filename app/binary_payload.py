@@ -0,0 +1,162 @@
+# ========================================================================
+# File: app/binary_payload.py
+# Deskripsi: Dukungan body biner untuk endpoint analisis. Selain JSON,
+#            request dapat dikirim sebagai MessagePack (array angka bertipe
+#            sebagai ext type) atau Arrow IPC stream (satu kolom per array),
+#            yang didekode langsung ke array NumPy tanpa mem-parsing dan
+#            mem-box setiap angka. Respons dapat dikodekan dengan format
+#            yang sama sesuai header Accept.
+# ========================================================================
+
+import json
+import re
+from functools import wraps
+
+import msgpack
+import numpy as np
+from flask import Response, make_response, request
+
+from app.lazy import LazyModule, module_available
+
+# pyarrow diimpor saat body/respons Arrow pertama diproses
+ARROW_ENABLED = module_available('pyarrow')
+pa = LazyModule('pyarrow')
+pc = LazyModule('pyarrow.compute')
+
+MSGPACK_MIMETYPE = 'application/msgpack'
+MSGPACK_MIMETYPES = (MSGPACK_MIMETYPE, 'application/x-msgpack')
+ARROW_MIMETYPE = 'application/vnd.apache.arrow.stream'
+
+# Ext type MessagePack untuk array angka little-endian
+EXT_FLOAT64 = 1
+EXT_FLOAT32 = 2
+EXT_INT64 = 3
+_EXT_DTYPES = {EXT_FLOAT64: '<f8', EXT_FLOAT32: '<f4', EXT_INT64: '<i8'}
+
+# Nama kolom Arrow "groups.0", "pairs.1", ... dipetakan ke list pada key tersebut
+_INDEXED_COLUMN = re.compile(r'^(.+)\.(\d+)$')
+
+
+class PayloadError(ValueError):
+    pass
+
+
+def _ext_hook(code, data):
+    dtype = _EXT_DTYPES.get(code)
+    if dtype is None:
+        return msgpack.ExtType(code, data)
+    return np.frombuffer(data, dtype=dtype)
+
+def _ext_default(obj):
+    if isinstance(obj, np.ndarray) and obj.dtype.kind in 'fiu':
+        arr = np.ascontiguousarray(obj, dtype='<f8')
+        return msgpack.ExtType(EXT_FLOAT64, arr.tobytes())
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Tipe tidak dapat dikodekan ke MessagePack: {type(obj).__name__}")
+
+def decode_msgpack(body):
+    """Body MessagePack -> dict; array ext type menjadi ndarray (view atas buffer ext)."""
+    try:
+        data = msgpack.unpackb(body, ext_hook=_ext_hook, raw=False, strict_map_key=False)
+    except (msgpack.ExtraData, msgpack.FormatError, msgpack.StackError, ValueError):
+        raise PayloadError('Body MessagePack tidak valid.')
+    if not isinstance(data, dict):
+        raise PayloadError('Body MessagePack harus berupa map.')
+    return data
+
+def encode_msgpack(payload):
+    return msgpack.packb(payload, default=_ext_default, use_bin_type=True)
+
+def _arrow_column_to_numpy(column):
+    column = column.combine_chunks() if isinstance(column, pa.ChunkedArray) else column
+    if pa.types.is_floating(column.type) and column.null_count == 0:
+        return column.to_numpy(zero_copy_only=True).astype(np.float64, copy=False)
+    if pa.types.is_integer(column.type) or pa.types.is_floating(column.type):
+        return pc.fill_null(column.cast(pa.float64()), np.nan).to_numpy(zero_copy_only=False)
+    return column.to_pylist()
+
+def decode_arrow(body):
+    """
+    Body Arrow IPC stream -> dict. Setiap kolom menjadi array NumPy (tanpa
+    salinan untuk kolom float tanpa null). Kolom "nama.i" dikumpulkan ke list
+    data['nama'][i]. Parameter non-array dikirim sebagai JSON di metadata
+    skema dengan key "params".
+    """
+    if not ARROW_ENABLED:
+        raise PayloadError('Format Arrow tidak didukung di server ini.')
+    try:
+        table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    except (pa.ArrowInvalid, OSError):
+        raise PayloadError('Body Arrow IPC tidak valid.')
+    metadata = table.schema.metadata or {}
+    try:
+        data = json.loads(metadata.get(b'params', b'{}'))
+    except ValueError:
+        raise PayloadError("Metadata 'params' pada body Arrow harus berupa JSON.")
+
+    indexed = {}
+    for name in table.column_names:
+        values = _arrow_column_to_numpy(table.column(name))
+        match = _INDEXED_COLUMN.match(name)
+        if match:
+            indexed.setdefault(match.group(1), {})[int(match.group(2))] = values
+        else:
+            data[name] = values
+    for key, items in indexed.items():
+        data[key] = [items[i] for i in sorted(items)]
+    return data
+
+def encode_arrow(payload):
+    """Hasil (dict bersarang) sebagai satu baris Arrow dengan kolom struct/list."""
+    table = pa.Table.from_pylist([payload])
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def is_binary_request():
+    return request.mimetype in MSGPACK_MIMETYPES or request.mimetype == ARROW_MIMETYPE
+
+def read_request_data():
+    """
+    Body request analisis sebagai dict, dari JSON, MessagePack, atau Arrow
+    IPC. Mengembalikan None jika body kosong/tidak valid untuk JSON
+    (perilaku sama dengan get_json(silent=True)); melempar PayloadError untuk
+    body biner yang rusak.
+    """
+    if request.mimetype in MSGPACK_MIMETYPES:
+        return decode_msgpack(request.get_data(cache=True))
+    if request.mimetype == ARROW_MIMETYPE:
+        return decode_arrow(request.get_data(cache=True))
+    data = request.get_json(silent=True)
+    return data if isinstance(data, dict) else None
+
+
+def _preferred_encoding():
+    best = request.accept_mimetypes.best_match(['application/json', MSGPACK_MIMETYPE, ARROW_MIMETYPE])
+    if best == ARROW_MIMETYPE and not ARROW_ENABLED:
+        return 'application/json'
+    return best or 'application/json'
+
+def negotiated_response(view):
+    """
+    Decorator: respons JSON endpoint dikodekan ulang ke MessagePack atau Arrow
+    IPC jika header Accept memintanya. Respons error tetap JSON.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        response = make_response(view(*args, **kwargs))
+        encoding = _preferred_encoding()
+        if (encoding == 'application/json' or response.status_code != 200
+                or response.mimetype != 'application/json' or response.is_streamed):
+            return response
+        payload = json.loads(response.get_data())
+        try:
+            body = encode_msgpack(payload) if encoding == MSGPACK_MIMETYPE else encode_arrow(payload)
+        except (TypeError, ValueError, NotImplementedError):
+            return response
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in ('content-type', 'content-length')}
+        return Response(body, status=response.status_code, mimetype=encoding, headers=headers)
+    return wrapper
@@ -0,0 +1,234 @@
+# ========================================================================
+# File: app/dataset_store.py
+# Deskripsi: Penyimpanan dataset di server. File CSV/XLSX diunggah sekali,
+#            dikonversi ke format kolumnar (Parquet, atau pickle jika
+#            pyarrow tidak tersedia) beserta metadata tipe dan ringkasan
+#            per kolom, lalu dianalisis berkali-kali melalui dataset_id.
+# ========================================================================
+
+import json
+import os
+import re
+import threading
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+from cachetools import LRUCache
+
+from app.ingest import PYARROW_AVAILABLE, read_full_table
+
+_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+# Kolom teks dengan proporsi nilai unik di bawah ambang ini disimpan sebagai categorical
+CATEGORICAL_MAX_UNIQUE_RATIO = 0.5
+# Ukuran row group Parquet; read_rows hanya membaca row group yang memuat halaman diminta
+ROW_GROUP_ROWS = 100_000
+# Ukuran batch saat mendekode row group untuk satu halaman baris
+ROWS_BATCH_ROWS = 10_000
+
+
+class DatasetNotFound(LookupError):
+    pass
+
+
+def _column_metadata(name, series):
+    meta = {'name': name, 'dtype': str(series.dtype), 'n_missing': int(series.isna().sum())}
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = values[~np.isnan(values)]
+        meta['kind'] = 'numeric'
+        if valid.size:
+            meta.update({
+                'mean': float(valid.mean()),
+                'std': float(valid.std(ddof=1)) if valid.size > 1 else None,
+                'min': float(valid.min()),
+                'max': float(valid.max())
+            })
+    else:
+        meta['kind'] = 'categorical' if isinstance(series.dtype, pd.CategoricalDtype) else 'text'
+        meta['n_unique'] = int(series.nunique(dropna=True))
+    return meta
+
+def _compact(df):
+    """Merapikan tipe kolom: string kolom, teks numerik -> float64, teks berulang -> categorical."""
+    df.columns = [str(c) for c in df.columns]
+    for col in df.columns:
+        series = df[col]
+        if series.dtype == object:
+            numeric = pd.to_numeric(series, errors='coerce')
+            if numeric.notna().sum() == series.notna().sum():
+                df[col] = numeric.astype('float64')
+            elif series.nunique(dropna=True) <= max(len(series) * CATEGORICAL_MAX_UNIQUE_RATIO, 1):
+                df[col] = series.astype(str).where(series.notna()).astype('category')
+            else:
+                df[col] = series.astype(str).where(series.notna())
+    return df
+
+
+class DatasetStore:
+    def __init__(self, root, max_cached_columns=64):
+        self.root = root
+        self._cache = LRUCache(maxsize=max_cached_columns)
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _owner_dir(self, owner_id):
+        safe_owner = re.sub(r'[^A-Za-z0-9_-]', '_', str(owner_id))
+        path = os.path.join(self.root, safe_owner)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def _paths(self, owner_id, dataset_id):
+        if not _ID_PATTERN.match(dataset_id or ''):
+            raise DatasetNotFound('Dataset tidak ditemukan.')
+        base = os.path.join(self._owner_dir(owner_id), dataset_id)
+        return base + '.json', base + ('.parquet' if PYARROW_AVAILABLE else '.pkl')
+
+    def create(self, owner_id, file, filename, sheet=None, header_row=None):
+        df = _compact(read_full_table(file, filename, sheet=sheet, header_row=header_row))
+        if df.empty:
+            raise ValueError('File tidak berisi data.')
+        dataset_id = uuid.uuid4().hex
+        meta_path, data_path = self._paths(owner_id, dataset_id)
+        if PYARROW_AVAILABLE:
+            df.to_parquet(data_path, index=False, row_group_size=ROW_GROUP_ROWS)
+        else:
+            df.to_pickle(data_path)
+
+        metadata = {
+            'dataset_id': dataset_id,
+            'filename': filename,
+            'n_rows': int(len(df)),
+            'created_at': time.time(),
+            'format': 'parquet' if PYARROW_AVAILABLE else 'pickle',
+            'columns': [_column_metadata(col, df[col]) for col in df.columns]
+        }
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, ensure_ascii=False)
+        return metadata
+
+    def metadata(self, owner_id, dataset_id):
+        meta_path, _ = self._paths(owner_id, dataset_id)
+        if not os.path.exists(meta_path):
+            raise DatasetNotFound('Dataset tidak ditemukan.')
+        with open(meta_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def load_columns(self, owner_id, dataset_id, columns):
+        """Memuat hanya kolom yang diminta; kolom yang baru dipakai disimpan di cache LRU."""
+        metadata = self.metadata(owner_id, dataset_id)
+        available = {c['name'] for c in metadata['columns']}
+        missing = [c for c in columns if c not in available]
+        if missing:
+            raise ValueError(f"Kolom berikut tidak ditemukan di dataset: {', '.join(map(str, missing))}.")
+
+        _, data_path = self._paths(owner_id, dataset_id)
+        result = {}
+        to_load = []
+        with self._lock:
+            for col in columns:
+                cached = self._cache.get((owner_id, dataset_id, col))
+                if cached is None:
+                    to_load.append(col)
+                else:
+                    result[col] = cached
+        if to_load:
+            if PYARROW_AVAILABLE:
+                loaded = pd.read_parquet(data_path, columns=to_load)
+            else:
+                loaded = pd.read_pickle(data_path)[to_load]
+            with self._lock:
+                for col in to_load:
+                    result[col] = loaded[col]
+                    self._cache[(owner_id, dataset_id, col)] = loaded[col]
+        return pd.DataFrame({col: result[col] for col in columns})
+
+    def read_rows(self, owner_id, dataset_id, columns=None, offset=0, limit=500):
+        """
+        Satu halaman baris mentah (offset/limit) untuk kolom yang diminta;
+        mengembalikan (DataFrame, total_baris). Hanya row group Parquet yang
+        memuat halaman tersebut yang dibaca, per batch, tanpa mengisi cache kolom.
+        """
+        metadata = self.metadata(owner_id, dataset_id)
+        columns = list(columns) if columns else [c['name'] for c in metadata['columns']]
+        available = {c['name'] for c in metadata['columns']}
+        missing = [c for c in columns if c not in available]
+        if missing:
+            raise ValueError(f"Kolom berikut tidak ditemukan di dataset: {', '.join(map(str, missing))}.")
+
+        _, data_path = self._paths(owner_id, dataset_id)
+        total = metadata['n_rows']
+        if not PYARROW_AVAILABLE:
+            return pd.read_pickle(data_path)[columns].iloc[offset:offset + limit], total
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        parquet = pq.ParquetFile(data_path)
+        row_groups = []
+        first_row = None
+        start = 0
+        for index in range(parquet.num_row_groups):
+            rows = parquet.metadata.row_group(index).num_rows
+            if start + rows > offset and start < offset + limit:
+                first_row = start if first_row is None else first_row
+                row_groups.append(index)
+            start += rows
+        if not row_groups:
+            return parquet.schema_arrow.empty_table().select(columns).to_pandas(), total
+
+        skip = offset - first_row
+        batches = []
+        taken = 0
+        for batch in parquet.iter_batches(batch_size=ROWS_BATCH_ROWS, row_groups=row_groups, columns=columns):
+            if skip >= batch.num_rows:
+                skip -= batch.num_rows
+                continue
+            batch = batch.slice(skip, limit - taken)
+            skip = 0
+            batches.append(batch)
+            taken += batch.num_rows
+            if taken >= limit:
+                break
+        page = pa.Table.from_batches(batches).to_pandas()
+        return page.set_axis(range(offset, offset + len(page))), total
+
+    def iter_column_chunks(self, owner_id, dataset_id, columns, chunk_rows=100_000):
+        """
+        Menghasilkan matriks float64 (baris x kolom) per potongan baris tanpa
+        memuat seluruh kolom sekaligus dan tanpa mengisi cache kolom.
+        """
+        metadata = self.metadata(owner_id, dataset_id)
+        available = {c['name'] for c in metadata['columns']}
+        missing = [c for c in columns if c not in available]
+        if missing:
+            raise ValueError(f"Kolom berikut tidak ditemukan di dataset: {', '.join(map(str, missing))}.")
+
+        _, data_path = self._paths(owner_id, dataset_id)
+        if PYARROW_AVAILABLE:
+            import pyarrow.parquet as pq
+            for batch in pq.ParquetFile(data_path).iter_batches(batch_size=chunk_rows, columns=list(columns)):
+                frame = batch.to_pandas()
+                yield np.column_stack([
+                    pd.to_numeric(frame[col], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+                    for col in columns
+                ])
+        else:
+            df = pd.read_pickle(data_path)[list(columns)]
+            for start in range(0, len(df), chunk_rows):
+                frame = df.iloc[start:start + chunk_rows]
+                yield np.column_stack([
+                    pd.to_numeric(frame[col], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+                    for col in columns
+                ])
+
+    def delete(self, owner_id, dataset_id):
+        meta_path, data_path = self._paths(owner_id, dataset_id)
+        if not os.path.exists(meta_path):
+            raise DatasetNotFound('Dataset tidak ditemukan.')
+        for path in (meta_path, data_path):
+            if os.path.exists(path):
+                os.remove(path)
+        with self._lock:
+            for key in [k for k in self._cache if k[0] == owner_id and k[1] == dataset_id]:
+                del self._cache[key]
@@ -0,0 +1,97 @@
+# ========================================================================
+# File: app/document_cache.py
+# Deskripsi: Cache persisten berbasis hash konten untuk dokumen yang
+#            diunggah ke manajemen sitasi. Menyimpan teks hasil ekstraksi
+#            dan metadata sitasi dari Gemini agar unggahan ulang file yang
+#            sama tidak perlu di-parse dan dianalisis ulang.
+# ========================================================================
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+def fingerprint(data):
+    """Mengembalikan sidik jari SHA-256 (hex) dari isi file."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class DocumentCache:
+    """
+    Penyimpanan SQLite kecil dengan eviksi LRU berdasarkan jumlah entri.
+    Setiap entri berisi teks hasil ekstraksi dan (jika sudah ada) daftar
+    referensi hasil analisis AI.
+    """
+
+    def __init__(self, path, max_entries=2000):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                " digest TEXT PRIMARY KEY,"
+                " text TEXT NOT NULL,"
+                " references_json TEXT,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON documents (last_access)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5)
+
+    def get(self, digest):
+        """Mengembalikan dict {'text', 'references'} atau None jika tidak ada."""
+        try:
+            with self._lock, self._connect() as conn:
+                row = conn.execute(
+                    "SELECT text, references_json FROM documents WHERE digest = ?", (digest,)
+                ).fetchone()
+                if row is None:
+                    return None
+                conn.execute("UPDATE documents SET last_access = ? WHERE digest = ?", (time.time(), digest))
+        except sqlite3.Error as e:
+            print(f"Peringatan: Gagal membaca cache dokumen: {e}")
+            return None
+        text, references_json = row
+        return {
+            'text': text,
+            'references': json.loads(references_json) if references_json else None
+        }
+
+    def put_text(self, digest, text):
+        """Menyimpan teks hasil ekstraksi tanpa menimpa referensi yang sudah ada."""
+        self._write(
+            "INSERT INTO documents (digest, text, references_json, last_access) VALUES (?, ?, NULL, ?) "
+            "ON CONFLICT(digest) DO UPDATE SET text = excluded.text, last_access = excluded.last_access",
+            (digest, text, time.time())
+        )
+
+    def put_references(self, digest, text, references):
+        """Menyimpan teks beserta metadata sitasi hasil analisis."""
+        self._write(
+            "INSERT OR REPLACE INTO documents (digest, text, references_json, last_access) VALUES (?, ?, ?, ?)",
+            (digest, text, json.dumps(references, ensure_ascii=False), time.time())
+        )
+
+    def _write(self, sql, params):
+        try:
+            with self._lock, self._connect() as conn:
+                conn.execute(sql, params)
+                self._evict(conn)
+        except sqlite3.Error as e:
+            print(f"Peringatan: Gagal menulis cache dokumen: {e}")
+
+    def _evict(self, conn):
+        (count,) = conn.execute("SELECT COUNT(*) FROM documents").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM documents WHERE digest IN ("
+                " SELECT digest FROM documents ORDER BY last_access ASC LIMIT ?)",
+                (excess,)
+            )
@@ -0,0 +1,180 @@
+# ========================================================================
+# File: app/document_extract.py
+# Deskripsi: Fungsi ekstraksi teks dokumen (PDF/DOCX) yang dapat dijalankan
+#            di dalam process pool untuk impor sitasi massal.
+# ========================================================================
+
+import io
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from app.lazy import LazyModule
+
+# Diimpor saat dokumen pertama diekstraksi (di worker process pool atau inline)
+PyPDF2 = LazyModule('PyPDF2')
+etree = LazyModule('lxml.etree')
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx')
+MAX_BULK_DOCUMENTS = 50
+MAX_DOCUMENT_BYTES = 25 * 1024 * 1024
+# Batas total byte dokumen (setelah dekompresi ZIP) dalam satu unggahan massal
+MAX_BULK_TOTAL_BYTES = int(os.getenv('MAX_BULK_TOTAL_MB', '100')) * 1024 * 1024
+# Batas ukuran body request unggahan massal (ZIP tidak lebih besar dari isinya, plus overhead multipart)
+MAX_BULK_REQUEST_BYTES = MAX_BULK_TOTAL_BYTES + 1024 * 1024
+
+_extraction_pool = None
+
+_W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_W_P = _W_NS + 'p'
+_W_TC = _W_NS + 'tc'
+_W_T = _W_NS + 't'
+_W_TAB = _W_NS + 'tab'
+_W_BR = _W_NS + 'br'
+_W_CR = _W_NS + 'cr'
+
+
+def read_pdf(file_stream):
+    reader = PyPDF2.PdfReader(file_stream)
+    text = ""
+    for page in reader.pages:
+        text += page.extract_text() or ""
+    return text
+
+def _paragraph_text(paragraph):
+    parts = []
+    for node in paragraph.iter(_W_T, _W_TAB, _W_BR, _W_CR):
+        if node.tag == _W_T:
+            parts.append(node.text or "")
+        elif node.tag == _W_TAB:
+            parts.append("\t")
+        else:
+            parts.append("\n")
+    return "".join(parts)
+
+def iter_docx_blocks(file_stream, max_chars=None):
+    """
+    Membaca word/document.xml langsung dari arsip DOCX dengan iterparse
+    dan menghasilkan teks paragraf serta sel tabel sesuai urutan dokumen.
+    Elemen yang sudah diproses langsung dibuang sehingga memori tetap
+    terbatas. Jika max_chars diberikan, pembacaan berhenti setelah jumlah
+    karakter tersebut tercapai.
+    """
+    total_chars = 0
+    with zipfile.ZipFile(file_stream) as archive, archive.open('word/document.xml') as xml_file:
+        cell_stack = []
+        for event, elem in etree.iterparse(xml_file, events=('start', 'end'), tag=(_W_P, _W_TC)):
+            if elem.tag == _W_TC:
+                if event == 'start':
+                    cell_stack.append([])
+                    continue
+                block = "\n".join(cell_stack.pop())
+                if cell_stack:
+                    # Tabel bersarang: teks sel ikut menjadi bagian sel induknya
+                    cell_stack[-1].append(block)
+                    block = None
+            elif event == 'end':
+                block = _paragraph_text(elem)
+                if cell_stack:
+                    cell_stack[-1].append(block)
+                    block = None
+            else:
+                continue
+
+            if event == 'end':
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+            if block is None:
+                continue
+            yield block
+            total_chars += len(block) + 1
+            if max_chars is not None and total_chars >= max_chars:
+                return
+
+def read_docx(file_stream, max_chars=None):
+    text = "\n".join(iter_docx_blocks(file_stream, max_chars=max_chars))
+    return text if max_chars is None else text[:max_chars]
+
+def extract_text(filename, data, max_chars=None):
+    """Mengekstrak teks dari isi file berdasarkan ekstensinya."""
+    if filename.lower().endswith('.pdf'):
+        return read_pdf(io.BytesIO(data))
+    if filename.lower().endswith('.docx'):
+        return read_docx(io.BytesIO(data), max_chars=max_chars)
+    raise ValueError('Format file tidak didukung. Harap unggah PDF atau DOCX.')
+
+def _read_member(archive, info):
+    """Isi anggota ZIP, dibaca paling banyak MAX_DOCUMENT_BYTES + 1 byte (ukuran di header ZIP bisa tidak jujur)."""
+    with archive.open(info) as member:
+        return member.read(MAX_DOCUMENT_BYTES + 1)
+
+def expand_uploads(uploads):
+    """
+    Mengubah daftar (nama_file, stream) menjadi daftar dokumen PDF/DOCX.
+    File ZIP dibuka langsung dari stream-nya dan setiap anggotanya yang
+    didukung ikut dimasukkan. Setiap item hasil berupa (nama_file, bytes, pesan_error).
+
+    Setiap stream dibaca paling banyak MAX_DOCUMENT_BYTES + 1 byte, dan tidak
+    ada lagi yang dibaca setelah MAX_BULK_DOCUMENTS dokumen terkumpul atau
+    total MAX_BULK_TOTAL_BYTES tercapai; file yang dilewati atau melebihi
+    batas tetap dilaporkan sebagai item error.
+    """
+    documents = []
+    collected = 0
+    total_bytes = 0
+    skipped = 0
+    over_budget = f'Dilewati: total ukuran unggahan melebihi {MAX_BULK_TOTAL_BYTES // (1024 * 1024)} MB.'
+
+    def add(name, data):
+        nonlocal collected, total_bytes
+        if len(data) > MAX_DOCUMENT_BYTES:
+            documents.append((name, None, 'Ukuran file melebihi batas 25 MB.'))
+        elif total_bytes + len(data) > MAX_BULK_TOTAL_BYTES:
+            documents.append((name, None, over_budget))
+        else:
+            documents.append((name, data, None))
+            collected += 1
+            total_bytes += len(data)
+
+    for filename, stream in uploads:
+        if filename.lower().endswith('.zip'):
+            if collected >= MAX_BULK_DOCUMENTS or total_bytes >= MAX_BULK_TOTAL_BYTES:
+                documents.append((filename, None, 'Dilewati: batas dokumen atau ukuran unggahan sudah tercapai.'))
+                continue
+            try:
+                with zipfile.ZipFile(stream) as archive:
+                    for info in archive.infolist():
+                        name = info.filename
+                        if info.is_dir() or name.startswith('__MACOSX/') or not name.lower().endswith(SUPPORTED_EXTENSIONS):
+                            continue
+                        if collected >= MAX_BULK_DOCUMENTS:
+                            skipped += 1
+                        elif info.file_size > MAX_DOCUMENT_BYTES:
+                            documents.append((name, None, 'Ukuran file melebihi batas 25 MB.'))
+                        elif total_bytes + info.file_size > MAX_BULK_TOTAL_BYTES:
+                            documents.append((name, None, over_budget))
+                        else:
+                            add(name, _read_member(archive, info))
+            except (zipfile.BadZipFile, zipfile.LargeZipFile, NotImplementedError):
+                documents.append((filename, None, 'File ZIP rusak atau tidak valid.'))
+        elif filename.lower().endswith(SUPPORTED_EXTENSIONS):
+            if collected >= MAX_BULK_DOCUMENTS:
+                skipped += 1
+            elif total_bytes >= MAX_BULK_TOTAL_BYTES:
+                documents.append((filename, None, over_budget))
+            else:
+                add(filename, stream.read(MAX_DOCUMENT_BYTES + 1))
+        else:
+            documents.append((filename, None, 'Format file tidak didukung. Harap unggah PDF, DOCX, atau ZIP.'))
+
+    if skipped:
+        documents.append(('(lainnya)', None, f'{skipped} dokumen dilewati: batas {MAX_BULK_DOCUMENTS} dokumen per unggahan tercapai.'))
+    return documents
+
+def get_extraction_pool():
+    """Process pool ekstraksi, dibuat sekali per proses saat pertama kali dibutuhkan."""
+    global _extraction_pool
+    if _extraction_pool is None:
+        _extraction_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 2)
+    return _extraction_pool
@@ -0,0 +1,460 @@
+# ========================================================================
+# File: app/export_engine.py
+# Deskripsi: Mesin ekspor dokumen (PDF/Word). Menyimpan stylesheet, template
+#            docx, dan aset logo di cache tingkat proses, serta mengubah HTML
+#            dari editor menjadi blok paragraf/heading/list dalam satu kali
+#            proses sebelum dirender ke ReportLab atau python-docx.
+# ========================================================================
+
+import io
+import os
+import re
+from functools import lru_cache
+from html import escape
+from html.parser import HTMLParser
+
+from app.lazy import LazyModule, module_available
+
+PDF_EXPORT_ENABLED = module_available('reportlab')
+WORD_EXPORT_ENABLED = module_available('docx')
+
+# ReportLab dan python-docx baru diimpor saat ekspor pertama (lihat app/lazy.py)
+platypus = LazyModule('reportlab.platypus')
+tableofcontents = LazyModule('reportlab.platypus.tableofcontents')
+rl_styles = LazyModule('reportlab.lib.styles')
+rl_units = LazyModule('reportlab.lib.units')
+rl_pagesizes = LazyModule('reportlab.lib.pagesizes')
+docx = LazyModule('docx')
+docx_shared = LazyModule('docx.shared')
+
+if not (PDF_EXPORT_ENABLED and WORD_EXPORT_ENABLED):
+    print("PERINGATAN: Library 'reportlab' atau 'python-docx' tidak terinstal. Fitur ekspor tidak akan berfungsi.")
+
+LOGO_PATH = os.path.join(os.path.dirname(__file__), 'static', 'images', 'logo.png')
+
+_BLOCK_TAGS = {'p', 'div', 'blockquote', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+_HEADING_TAGS = {'h1': 2, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 4, 'h6': 4}
+_INLINE_FORMATS = {'b': 'bold', 'strong': 'bold', 'i': 'italic', 'em': 'italic', 'u': 'underline'}
+
+
+# =========================================================================
+# CACHE ASET TINGKAT PROSES
+# =========================================================================
+@lru_cache(maxsize=1)
+def get_pdf_styles():
+    """Stylesheet ReportLab, dibuat sekali per proses."""
+    styles = rl_styles.getSampleStyleSheet()
+    styles['BodyText'].spaceAfter = 8
+    styles['BodyText'].leading = 15
+    styles.add(rl_styles.ParagraphStyle('ListItem', parent=styles['BodyText'], leftIndent=18, bulletIndent=6, spaceAfter=4))
+    return styles
+
+@lru_cache(maxsize=1)
+def get_logo_bytes():
+    """Isi file logo (atau None jika tidak ada), dibaca dari disk sekali saja."""
+    if not os.path.exists(LOGO_PATH):
+        return None
+    with open(LOGO_PATH, 'rb') as f:
+        return f.read()
+
+@lru_cache(maxsize=1)
+def get_docx_template_bytes():
+    """Template default python-docx, dibaca dari paket sekali saja."""
+    template_path = os.path.join(os.path.dirname(docx.__file__), 'templates', 'default.docx')
+    with open(template_path, 'rb') as f:
+        return f.read()
+
+
+# =========================================================================
+# KONVERSI HTML -> BLOK
+# =========================================================================
+class Block:
+    """Satu blok konten: paragraf, heading, atau item list."""
+    __slots__ = ('kind', 'level', 'ordered', 'number', 'runs')
+
+    def __init__(self, kind, level=0, ordered=False, number=0):
+        self.kind = kind
+        self.level = level
+        self.ordered = ordered
+        self.number = number
+        self.runs = []
+
+    @property
+    def text(self):
+        return "".join(run[0] for run in self.runs)
+
+
+class _BlockParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks = []
+        self.current = None
+        self.formats = {'bold': 0, 'italic': 0, 'underline': 0}
+        self.lists = []
+
+    def _close_block(self):
+        if self.current is not None and self.current.text.strip():
+            self.blocks.append(self.current)
+        self.current = None
+
+    def _open_block(self, tag):
+        if tag in ('p', 'div') and self.current is not None and self.current.kind == 'list_item' and not self.current.text.strip():
+            # <li><p>...</p></li>: paragraf dalam item list tetap menjadi item list
+            return
+        self._close_block()
+        if tag in _HEADING_TAGS:
+            self.current = Block('heading', level=_HEADING_TAGS[tag])
+        elif tag == 'li':
+            ordered = bool(self.lists) and self.lists[-1][0]
+            number = 0
+            if self.lists:
+                self.lists[-1][1] += 1
+                number = self.lists[-1][1]
+            self.current = Block('list_item', level=max(len(self.lists), 1), ordered=ordered, number=number)
+        else:
+            self.current = Block('paragraph')
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ('ul', 'ol'):
+            self._close_block()
+            self.lists.append([tag == 'ol', 0])
+        elif tag in _BLOCK_TAGS:
+            self._open_block(tag)
+        elif tag in _INLINE_FORMATS:
+            self.formats[_INLINE_FORMATS[tag]] += 1
+        elif tag == 'br':
+            self.handle_data("\n")
+
+    def handle_endtag(self, tag):
+        if tag in ('ul', 'ol'):
+            self._close_block()
+            if self.lists:
+                self.lists.pop()
+        elif tag in _BLOCK_TAGS:
+            self._close_block()
+        elif tag in _INLINE_FORMATS:
+            key = _INLINE_FORMATS[tag]
+            self.formats[key] = max(self.formats[key] - 1, 0)
+
+    def handle_data(self, data):
+        if self.current is None:
+            if not data.strip():
+                return
+            self.current = Block('paragraph')
+        if data != "\n":
+            data = re.sub(r'\s+', ' ', data)
+        self.current.runs.append((data, self.formats['bold'] > 0, self.formats['italic'] > 0, self.formats['underline'] > 0))
+
+
+def html_to_blocks(html_content):
+    """Mengubah HTML editor menjadi daftar Block dalam satu kali parsing."""
+    parser = _BlockParser()
+    parser.feed(html_content)
+    parser.close()
+    parser._close_block()
+    return parser.blocks
+
+
+# =========================================================================
+# RENDER PDF (REPORTLAB)
+# =========================================================================
+def _runs_to_markup(runs):
+    parts = []
+    for text, bold, italic, underline in runs:
+        if text == "\n":
+            parts.append("<br/>")
+            continue
+        piece = escape(text, quote=False)
+        if underline: piece = f"<u>{piece}</u>"
+        if italic: piece = f"<i>{piece}</i>"
+        if bold: piece = f"<b>{piece}</b>"
+        parts.append(piece)
+    return "".join(parts).strip()
+
+def block_to_flowable(block, styles):
+    markup = _runs_to_markup(block.runs)
+    if block.kind == 'heading':
+        return platypus.Paragraph(markup, styles[f'h{block.level}'])
+    if block.kind == 'list_item':
+        bullet = f"{block.number}." if block.ordered else "•"
+        style = styles['ListItem']
+        if block.level > 1:
+            style = rl_styles.ParagraphStyle(f'ListItem{block.level}', parent=style, leftIndent=18 * block.level, bulletIndent=6 + 18 * (block.level - 1))
+        return platypus.Paragraph(markup, style, bulletText=bullet)
+    return platypus.Paragraph(markup, styles['BodyText'])
+
+def logo_flowable():
+    logo_bytes = get_logo_bytes()
+    if logo_bytes is None:
+        return None
+    img = platypus.Image(io.BytesIO(logo_bytes), width=1.5*rl_units.inch, height=0.5*rl_units.inch)
+    img.hAlign = 'RIGHT'
+    return img
+
+def render_pdf(buffer, title, html_content):
+    styles = get_pdf_styles()
+    doc = platypus.SimpleDocTemplate(buffer, pagesize=rl_pagesizes.letter, title=title)
+    story = []
+
+    img = logo_flowable()
+    if img is not None:
+        story.append(img)
+        story.append(platypus.Spacer(1, 0.25*rl_units.inch))
+
+    story.append(platypus.Paragraph(escape(title, quote=False), styles['h1']))
+    story.append(platypus.Spacer(1, 0.2*rl_units.inch))
+    story.extend(block_to_flowable(block, styles) for block in html_to_blocks(html_content))
+    doc.build(story)
+
+
+# =========================================================================
+# RENDER WORD (PYTHON-DOCX)
+# =========================================================================
+def new_docx_document():
+    return docx.Document(io.BytesIO(get_docx_template_bytes()))
+
+def add_block_to_docx(document, block):
+    if block.kind == 'heading':
+        paragraph = document.add_heading(level=block.level)
+    elif block.kind == 'list_item':
+        style = 'List Number' if block.ordered else 'List Bullet'
+        if block.level > 1:
+            style = f"{style} {min(block.level, 3)}"
+        paragraph = document.add_paragraph(style=style)
+    else:
+        paragraph = document.add_paragraph()
+    for text, bold, italic, underline in block.runs:
+        if text == "\n":
+            paragraph.add_run().add_break()
+            continue
+        run = paragraph.add_run(text)
+        run.bold = bold or None
+        run.italic = italic or None
+        run.underline = underline or None
+    return paragraph
+
+def render_docx(buffer, title, html_content):
+    document = new_docx_document()
+    logo_bytes = get_logo_bytes()
+    if logo_bytes is not None:
+        document.add_picture(io.BytesIO(logo_bytes), width=docx_shared.Inches(1.5))
+
+    document.add_heading(title, level=1)
+    for block in html_to_blocks(html_content):
+        add_block_to_docx(document, block)
+    document.save(buffer)
+
+
+# =========================================================================
+# KOMPILASI SKRIPSI UTUH (BANYAK BAB)
+# =========================================================================
+BIBLIOGRAPHY_HEADINGS = {'daftar pustaka', 'referensi', 'references', 'bibliography', 'daftar referensi'}
+_LEADING_NUMBER = re.compile(r'^\s*(\[\d+\]|\d+[.)])\s*')
+
+
+def normalize_chapters(chapters):
+    """
+    Menyeragamkan struktur bab. Setiap bab boleh berupa item outline
+    ({'sub_bab', 'content'}) atau bab dengan daftar sub-bab
+    ({'title', 'content', 'sections': [{'sub_bab', 'content'}]}).
+    """
+    normalized = []
+    for chapter in chapters:
+        sections = [
+            {'title': section.get('sub_bab') or section.get('title') or '', 'content': section.get('content') or ''}
+            for section in chapter.get('sections') or []
+        ]
+        normalized.append({
+            'title': chapter.get('title') or chapter.get('sub_bab') or '',
+            'content': chapter.get('content') or '',
+            'sections': sections
+        })
+    return normalized
+
+def _content_to_html(content, content_type):
+    if content_type == 'markdown':
+        import markdown
+        return markdown.markdown(content)
+    return content
+
+def _bibliography_key(block):
+    return " ".join(_LEADING_NUMBER.sub('', block.text).lower().split())
+
+def iter_thesis_items(chapters, content_type='html'):
+    """
+    Menghasilkan item kompilasi secara berurutan:
+    ('chapter', judul, indeks), ('section', judul, indeks), ('block', Block)
+    dan terakhir ('bibliography', [Block, ...]) berisi daftar pustaka gabungan
+    tanpa duplikat. Bagian 'Daftar Pustaka' di tiap bab tidak ikut dicetak di
+    dalam bab.
+    """
+    bibliography = {}
+
+    def content_blocks(content):
+        in_bibliography = False
+        for block in html_to_blocks(_content_to_html(content, content_type)):
+            if block.kind == 'heading':
+                in_bibliography = block.text.strip().lower().rstrip(':') in BIBLIOGRAPHY_HEADINGS
+                if in_bibliography:
+                    continue
+            if in_bibliography:
+                key = _bibliography_key(block)
+                if key and key not in bibliography:
+                    block.kind, block.ordered, block.level = 'bibliography', False, 0
+                    if block.runs:
+                        text, *formats = block.runs[0]
+                        block.runs[0] = (_LEADING_NUMBER.sub('', text), *formats)
+                    bibliography[key] = block
+                continue
+            yield ('block', block)
+
+    for chapter_index, chapter in enumerate(chapters):
+        yield ('chapter', chapter['title'], chapter_index)
+        yield from content_blocks(chapter['content'])
+        for section_index, section in enumerate(chapter['sections']):
+            yield ('section', section['title'], (chapter_index, section_index))
+            yield from content_blocks(section['content'])
+
+    yield ('bibliography', [bibliography[key] for key in sorted(bibliography)])
+
+
+@lru_cache(maxsize=1)
+def _thesis_doc_template():
+    """Kelas DocTemplate tesis; dibuat saat pertama dipakai karena mewarisi kelas ReportLab."""
+    class _ThesisDocTemplate(platypus.SimpleDocTemplate):
+        """
+        Menambahkan bookmark/outline PDF untuk setiap judul bab dan sub-bab,
+        dan melaporkan nomor halamannya ke TableOfContents (lewat multiBuild).
+        """
+        def afterFlowable(self, flowable):
+            key = getattr(flowable, '_bookmark_key', None)
+            if key:
+                self.canv.bookmarkPage(key)
+                self.canv.addOutlineEntry(flowable._bookmark_title, key, level=flowable._bookmark_level, closed=False)
+                self.notify('TOCEntry', (flowable._bookmark_level, escape(flowable._bookmark_title, quote=False), self.page, key))
+    return _ThesisDocTemplate
+
+
+def _bookmarked(paragraph, key, title, level):
+    paragraph._bookmark_key = key
+    paragraph._bookmark_title = title
+    paragraph._bookmark_level = level
+    return paragraph
+
+def _draw_page_number(canvas, doc):
+    canvas.saveState()
+    canvas.setFont('Helvetica', 9)
+    canvas.drawCentredString(doc.pagesize[0] / 2, 0.5 * rl_units.inch, str(doc.page))
+    canvas.restoreState()
+
+def _thesis_pdf_flowables(title, chapters, meta, content_type):
+    styles = get_pdf_styles()
+
+    img = logo_flowable()
+    if img is not None:
+        yield img
+    yield platypus.Spacer(1, 2 * rl_units.inch)
+    yield platypus.Paragraph(escape(title, quote=False), rl_styles.ParagraphStyle('ThesisTitle', parent=styles['Title'], fontSize=22, leading=28))
+    for key in ('author', 'institution', 'year'):
+        if meta.get(key):
+            yield platypus.Paragraph(escape(str(meta[key]), quote=False), styles['Title'] if key == 'author' else styles['Heading3'])
+    yield platypus.PageBreak()
+
+    # Entri dan nomor halaman daftar isi diisi oleh multiBuild dari judul ber-bookmark
+    yield platypus.Paragraph('DAFTAR ISI', styles['h1'])
+    toc = tableofcontents.TableOfContents()
+    toc.levelStyles = [
+        rl_styles.ParagraphStyle('TOCLevel0', parent=styles['BodyText'], spaceAfter=2),
+        rl_styles.ParagraphStyle('TOCLevel1', parent=styles['BodyText'], leftIndent=18, spaceAfter=2),
+    ]
+    yield toc
+
+    for item in iter_thesis_items(chapters, content_type):
+        kind = item[0]
+        if kind == 'block':
+            yield block_to_flowable(item[1], styles)
+        elif kind == 'chapter':
+            _, chapter_title, index = item
+            yield platypus.PageBreak()
+            yield _bookmarked(platypus.Paragraph(escape(chapter_title, quote=False), styles['h1']), f'bab-{index}', chapter_title, 0)
+        elif kind == 'section':
+            _, section_title, (chapter_index, section_index) = item
+            yield _bookmarked(platypus.Paragraph(escape(section_title, quote=False), styles['h2']), f'bab-{chapter_index}-{section_index}', section_title, 1)
+        elif kind == 'bibliography':
+            yield platypus.PageBreak()
+            yield _bookmarked(platypus.Paragraph('DAFTAR PUSTAKA', styles['h1']), 'daftar-pustaka', 'DAFTAR PUSTAKA', 0)
+            bibliography_style = rl_styles.ParagraphStyle('Bibliography', parent=styles['BodyText'], leftIndent=24, firstLineIndent=-24)
+            for block in item[1]:
+                yield platypus.Paragraph(_runs_to_markup(block.runs), bibliography_style)
+
+def compile_thesis_pdf(buffer, title, chapters, meta=None, content_type='html'):
+    """
+    Merender seluruh bab menjadi satu PDF dengan daftar isi bernomor halaman.
+    multiBuild menata dokumen minimal dua kali (sampai nomor halaman daftar
+    isi stabil), sehingga seluruh flowable disimpan sebagai list selama
+    render: memori sebanding dengan panjang naskah, bukan konstan.
+    """
+    chapters = normalize_chapters(chapters)
+    doc = _thesis_doc_template()(buffer, pagesize=rl_pagesizes.letter, title=title, author=(meta or {}).get('author', ''))
+    story = list(_thesis_pdf_flowables(title, chapters, meta or {}, content_type))
+    doc.multiBuild(story, onLaterPages=_draw_page_number)
+
+def _add_docx_toc(document):
+    from docx.oxml import OxmlElement
+    from docx.oxml.ns import qn
+
+    run = document.add_paragraph().add_run()
+    parts = [('w:fldChar', 'begin'), ('w:instrText', 'TOC \\o "1-2" \\h \\z \\u'), ('w:fldChar', 'separate'),
+             ('w:t', 'Klik kanan lalu pilih "Update Field" untuk memperbarui daftar isi.'), ('w:fldChar', 'end')]
+    for tag, value in parts:
+        element = OxmlElement(tag)
+        if tag == 'w:fldChar':
+            element.set(qn('w:fldCharType'), value)
+        else:
+            element.set(qn('xml:space'), 'preserve')
+            element.text = value
+        run._r.append(element)
+
+    # Minta Word memperbarui field (termasuk nomor halaman daftar isi) saat dokumen dibuka
+    update_fields = OxmlElement('w:updateFields')
+    update_fields.set(qn('w:val'), 'true')
+    document.settings.element.append(update_fields)
+
+def compile_thesis_docx(buffer, title, chapters, meta=None, content_type='html'):
+    """Merender seluruh bab menjadi satu dokumen Word dengan field daftar isi."""
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+    chapters = normalize_chapters(chapters)
+    meta = meta or {}
+    document = new_docx_document()
+
+    logo_bytes = get_logo_bytes()
+    if logo_bytes is not None:
+        document.add_picture(io.BytesIO(logo_bytes), width=docx_shared.Inches(1.5))
+    document.add_heading(title, level=0).alignment = WD_ALIGN_PARAGRAPH.CENTER
+    for key in ('author', 'institution', 'year'):
+        if meta.get(key):
+            document.add_paragraph(str(meta[key])).alignment = WD_ALIGN_PARAGRAPH.CENTER
+    document.add_page_break()
+
+    # Judul daftar isi sengaja bukan heading agar tidak ikut tercantum di daftar isi
+    document.add_paragraph().add_run('DAFTAR ISI').bold = True
+    _add_docx_toc(document)
+
+    for item in iter_thesis_items(chapters, content_type):
+        kind = item[0]
+        if kind == 'block':
+            add_block_to_docx(document, item[1])
+        elif kind == 'chapter':
+            document.add_page_break()
+            document.add_heading(item[1], level=1)
+        elif kind == 'section':
+            document.add_heading(item[1], level=2)
+        elif kind == 'bibliography':
+            document.add_page_break()
+            document.add_heading('DAFTAR PUSTAKA', level=1)
+            for block in item[1]:
+                paragraph = add_block_to_docx(document, block)
+                paragraph.paragraph_format.left_indent = docx_shared.Inches(0.5)
+                paragraph.paragraph_format.first_line_indent = docx_shared.Inches(-0.5)
+    document.save(buffer)
@@ -0,0 +1,490 @@
+# ========================================================================
+# File: app/ingest.py
+# Deskripsi: Lapisan ingesti file dataset (CSV/Excel) untuk endpoint
+#            analisis. Hanya kolom yang diminta yang dibaca (usecols),
+#            kolom grup langsung menjadi categorical, dan jumlah baris
+#            dibatasi sehingga memori dan waktu parsing sebanding dengan
+#            kolom yang dipakai, bukan ukuran file. File XLSX dibaca
+#            secara streaming (lxml.iterparse per baris) dengan pilihan sheet dan
+#            deteksi baris header; preview_table() membaca sebagian baris
+#            saja untuk mengisi pilihan variabel di halaman analisis.
+# ========================================================================
+
+import json
+import os
+import re
+import zipfile
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from app.lazy import LazyModule, module_available
+
+# CSV dibaca dengan pembaca streaming pyarrow.csv jika tersedia (lihat _read_csv_arrow)
+PYARROW_AVAILABLE = module_available('pyarrow')
+pa = LazyModule('pyarrow')
+pa_csv = LazyModule('pyarrow.csv')
+LXML_AVAILABLE = module_available('lxml')
+etree = LazyModule('lxml.etree')
+
+MAX_DATASET_ROWS = int(os.getenv('MAX_DATASET_ROWS', '1000000'))
+CSV_CHUNK_ROWS = 100_000
+# Ukuran blok pembaca CSV pyarrow; tipe kolom diinferensi dari blok pertama
+CSV_BLOCK_BYTES = 4 * 1024 * 1024
+PREVIEW_ROWS_DEFAULT = 20
+PREVIEW_ROWS_MAX = 200
+# Baris teratas yang diperiksa untuk mencari header (judul/baris kosong di atas tabel)
+HEADER_SNIFF_ROWS = 20
+
+CSV_EXTENSIONS = ('.csv',)
+EXCEL_EXTENSIONS = ('.xls', '.xlsx')
+XLSX_EXTENSIONS = ('.xlsx', '.xlsm')
+
+_X_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_X_SHEET = _X_NS + 'sheet'
+_X_WORKBOOK_PR = _X_NS + 'workbookPr'
+_X_SI = _X_NS + 'si'
+_X_T = _X_NS + 't'
+_X_R = _X_NS + 'r'
+_X_NUM_FMT = _X_NS + 'numFmt'
+_X_CELL_XFS = _X_NS + 'cellXfs'
+_X_ROW = _X_NS + 'row'
+_X_C = _X_NS + 'c'
+_X_V = _X_NS + 'v'
+_X_IS = _X_NS + 'is'
+_R_ID = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id'
+
+_EPOCH_1900 = datetime(1899, 12, 30)
+_EPOCH_1904 = datetime(1904, 1, 1)
+# numFmtId bawaan Excel yang berupa tanggal/waktu
+_BUILTIN_DATE_FORMATS = frozenset(range(14, 23)) | {45, 46, 47}
+_QUOTED_OR_BRACKETED = re.compile(r'"[^"]*"|\\.|\[[^\]]*\]')
+_DATE_TOKENS = re.compile(r'[dmyhs]', re.IGNORECASE)
+
+
+def is_supported(filename):
+    return filename.lower().endswith(CSV_EXTENSIONS + EXCEL_EXTENSIONS)
+
+def _check_columns(available, requested):
+    missing = [c for c in requested if c not in available]
+    if missing:
+        raise ValueError(f"Kolom berikut tidak ditemukan di file: {', '.join(missing)}.")
+
+def _finalize(df, numeric_columns, categorical_columns):
+    for col in numeric_columns:
+        df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+    for col in categorical_columns:
+        if not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    return df
+
+def _read_csv_arrow(file, max_rows, columns=None, string_columns=()):
+    """
+    Membaca CSV per blok dengan pyarrow.csv.open_csv (hanya kolom `columns`
+    jika diberikan) dan berhenti begitu max_rows tercapai, sehingga memori
+    dan waktu parsing mengikuti batas baris, bukan ukuran file. Mengembalikan
+    None jika blok berikutnya tidak cocok dengan tipe hasil inferensi blok
+    pertama (mis. teks di kolom angka); pemanggil lalu memakai jalur pandas.
+    """
+    convert_options = pa_csv.ConvertOptions(
+        include_columns=columns or [], strings_can_be_null=True,
+        column_types={col: pa.string() for col in string_columns}
+    )
+    try:
+        reader = pa_csv.open_csv(file, read_options=pa_csv.ReadOptions(block_size=CSV_BLOCK_BYTES), convert_options=convert_options)
+        batches = []
+        rows = 0
+        for batch in reader:
+            batches.append(batch.slice(0, max_rows - rows))
+            rows += batches[-1].num_rows
+            if rows >= max_rows:
+                break
+    except pa.ArrowInvalid:
+        file.seek(0)
+        return None
+    return pa.Table.from_batches(batches, schema=reader.schema).to_pandas()
+
+def _read_csv_chunked(file, max_rows, **kwargs):
+    chunks = []
+    rows = 0
+    for chunk in pd.read_csv(file, chunksize=CSV_CHUNK_ROWS, **kwargs):
+        chunks.append(chunk.iloc[:max_rows - rows])
+        rows += len(chunks[-1])
+        if rows >= max_rows:
+            break
+    if not chunks:
+        return pd.DataFrame(columns=kwargs.get('usecols'))
+    # concat chunk dengan kategori berbeda menghasilkan object; _finalize mengembalikannya ke categorical
+    return pd.concat(chunks, ignore_index=True)
+
+def _read_csv(file, columns, categorical_columns, max_rows):
+    header = pd.read_csv(file, nrows=0).columns
+    _check_columns(header, columns)
+    file.seek(0)
+
+    if PYARROW_AVAILABLE:
+        # Kolom grup dibaca sebagai teks; _finalize menjadikannya categorical
+        df = _read_csv_arrow(file, max_rows, columns, categorical_columns)
+        if df is not None:
+            return df
+    dtype = {col: 'category' for col in categorical_columns}
+    return _read_csv_chunked(file, max_rows, usecols=columns, dtype=dtype)
+
+def _use_streaming_xlsx(name):
+    return LXML_AVAILABLE and name.endswith(XLSX_EXTENSIONS)
+
+def _is_blank(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+def _sniff_header(rows):
+    """
+    Indeks baris header di antara baris teratas: baris pertama yang seluruh
+    sel terisinya teks dan mengisi minimal separuh lebar tabel. Baris judul
+    (satu sel) dan baris kosong di atas tabel dilewati. Default baris 0.
+    """
+    widths = [sum(not _is_blank(v) for v in row.values()) for row in rows]
+    widest = max(widths, default=0)
+    for i, (row, width) in enumerate(zip(rows, widths)):
+        if width and width * 2 >= widest and all(isinstance(v, str) for v in row.values() if not _is_blank(v)):
+            return i
+    return 0
+
+def _header_names(row):
+    """Nama kolom dari baris header; sel kosong menjadi 'Unnamed: i' dan nama ganda diberi akhiran .1, .2 (seperti pandas)."""
+    while row and _is_blank(row[-1]):
+        row = row[:-1]
+    names = []
+    seen = {}
+    for i, value in enumerate(row):
+        name = f'Unnamed: {i}' if _is_blank(value) else str(value).strip()
+        if name in seen:
+            seen[name] += 1
+            name = f'{name}.{seen[name]}'
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+def _header_index(header_row):
+    """header_row dari form/JSON -> int >= 0, atau None (deteksi otomatis)."""
+    if header_row is None or header_row == '':
+        return None
+    try:
+        index = int(header_row)
+    except (TypeError, ValueError):
+        index = -1
+    if index < 0:
+        raise ValueError('Baris header harus berupa bilangan bulat tidak negatif.')
+    return index
+
+def _cell_text(value):
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+def _column_index(ref):
+    """'AB12' -> 27 (0-based)."""
+    index = 0
+    for char in ref:
+        if char.isdigit():
+            break
+        index = index * 26 + (ord(char.upper()) - 64)
+    return index - 1
+
+def _is_date_format(code):
+    code = _QUOTED_OR_BRACKETED.sub('', code)
+    return bool(_DATE_TOKENS.search(code))
+
+def _xml_text(elem):
+    """Teks sel inline/shared string: gabungan <t> langsung dan <r><t>, tanpa teks fonetik <rPh>."""
+    if elem is None:
+        return None
+    parts = [t.text or '' for t in elem.iterchildren(_X_T)]
+    parts.extend(t.text or '' for run in elem.iterchildren(_X_R) for t in run.iterchildren(_X_T))
+    return ''.join(parts)
+
+
+class _XlsxReader:
+    """
+    Pembaca XLSX streaming: sheet dibaca langsung dari arsip dengan
+    lxml.iterparse per elemen <row> (pola yang sama dengan pembacaan DOCX
+    di document_extract), dan hanya sel pada kolom yang diminta yang
+    dikonversi. Pembacaan berhenti begitu max_rows tercapai sehingga
+    preview tidak menyentuh sisa file. header_row None berarti header
+    dideteksi dari HEADER_SNIFF_ROWS baris teratas.
+    """
+    def __init__(self, file, sheet=None, header_row=None):
+        header_row = _header_index(header_row)
+        try:
+            self.archive = zipfile.ZipFile(file)
+        except zipfile.BadZipFile:
+            raise ValueError('File XLSX tidak valid atau rusak.')
+        self._xml = None
+        try:
+            self._read_workbook(sheet)
+            self._shared_strings = self._read_shared_strings()
+            self._date_styles = self._read_date_styles()
+            self._xml = self.archive.open(self._sheet_path)
+            self._wanted = None
+            self._rows = self._iter_raw_rows()
+            head = []
+            head_rows = HEADER_SNIFF_ROWS if header_row is None else header_row + 1
+            for row in self._rows:
+                head.append(row)
+                if len(head) >= head_rows:
+                    break
+            self.header_row = _sniff_header(head) if header_row is None else header_row
+            if head and self.header_row >= len(head):
+                raise ValueError(f"Baris header melebihi jumlah baris sheet ({len(head)}).")
+            header = head[self.header_row] if head else {}
+            self.columns = _header_names([header.get(i) for i in range(max(header, default=-1) + 1)])
+            self._buffered = head[self.header_row + 1:]
+        except (KeyError, zipfile.BadZipFile, etree.XMLSyntaxError):
+            self.close()
+            raise ValueError('File XLSX tidak valid atau rusak.')
+        except Exception:
+            self.close()
+            raise
+
+    def _read_workbook(self, sheet):
+        root = etree.fromstring(self.archive.read('xl/workbook.xml'))
+        rels = etree.fromstring(self.archive.read('xl/_rels/workbook.xml.rels'))
+        targets = {rel.get('Id'): rel.get('Target') for rel in rels}
+        sheets = [(s.get('name'), targets[s.get(_R_ID)]) for s in root.iter(_X_SHEET)]
+        if not sheets:
+            raise ValueError('File XLSX tidak berisi sheet.')
+        self.sheet_names = [name for name, _ in sheets]
+        workbook_pr = root.find(_X_WORKBOOK_PR)
+        self._epoch = _EPOCH_1904 if workbook_pr is not None and workbook_pr.get('date1904') in ('1', 'true') else _EPOCH_1900
+
+        if sheet is None or sheet == '':
+            position = 0
+        elif sheet in self.sheet_names:
+            position = self.sheet_names.index(sheet)
+        elif str(sheet).isdigit() and int(sheet) < len(sheets):
+            position = int(sheet)
+        else:
+            raise ValueError(f"Sheet '{sheet}' tidak ditemukan. Sheet yang tersedia: {', '.join(self.sheet_names)}.")
+        self.sheet, target = sheets[position]
+        self._sheet_path = target.lstrip('/') if target.startswith('/') else 'xl/' + target
+
+    def _read_shared_strings(self):
+        if 'xl/sharedStrings.xml' not in self.archive.namelist():
+            return []
+        strings = []
+        with self.archive.open('xl/sharedStrings.xml') as xml_file:
+            for _, elem in etree.iterparse(xml_file, tag=_X_SI):
+                strings.append(_xml_text(elem))
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+        return strings
+
+    def _read_date_styles(self):
+        """Indeks style sel (atribut s) yang format angkanya berupa tanggal/waktu."""
+        if 'xl/styles.xml' not in self.archive.namelist():
+            return frozenset()
+        root = etree.fromstring(self.archive.read('xl/styles.xml'))
+        custom = {int(fmt.get('numFmtId')): fmt.get('formatCode', '') for fmt in root.iter(_X_NUM_FMT)}
+        cell_xfs = root.find(_X_CELL_XFS)
+        dates = set()
+        for index, xf in enumerate(cell_xfs if cell_xfs is not None else ()):
+            fmt_id = int(xf.get('numFmtId', 0))
+            if fmt_id in _BUILTIN_DATE_FORMATS or (fmt_id in custom and _is_date_format(custom[fmt_id])):
+                dates.add(str(index))
+        return frozenset(dates)
+
+    def _iter_raw_rows(self):
+        """
+        Dict {indeks_kolom: nilai} per baris sheet; baris yang tidak ditulis di
+        XML menjadi dict kosong. Jika self._wanted diisi, hanya sel pada kolom
+        tersebut yang dikonversi.
+        """
+        expected = 1
+        letter_index = {}
+        for _, row in etree.iterparse(self._xml, tag=_X_ROW):
+            number = row.get('r')
+            if number is not None:
+                for _ in range(int(number) - expected):
+                    yield {}
+                expected = int(number) + 1
+            else:
+                expected += 1
+            values = {}
+            column = -1
+            wanted = self._wanted
+            for cell in row.iterchildren(_X_C):
+                ref = cell.get('r')
+                if ref is None:
+                    column += 1
+                else:
+                    letters = ref.rstrip('0123456789')
+                    column = letter_index.get(letters)
+                    if column is None:
+                        column = letter_index[letters] = _column_index(letters)
+                if wanted is None or column in wanted:
+                    values[column] = self._cell_value(cell)
+            row.clear()
+            while row.getprevious() is not None:
+                del row.getparent()[0]
+            yield values
+
+    def _cell_value(self, cell):
+        kind = cell.get('t')
+        if kind == 'inlineStr':
+            return _xml_text(cell.find(_X_IS))
+        text = cell.findtext(_X_V)
+        if not text:
+            return None
+        if kind is None or kind == 'n':
+            number = int(text) if text.lstrip('-').isdigit() else float(text)
+            if cell.get('s') in self._date_styles:
+                if self._epoch is _EPOCH_1900 and number < 60:
+                    number += 1  # Excel menganggap 1900 tahun kabisat
+                return self._epoch + timedelta(days=number)
+            return number
+        if kind == 's':
+            return self._shared_strings[int(text)]
+        if kind == 'b':
+            return text == '1'
+        if kind == 'e':
+            return None
+        return text  # 'str' (hasil formula) dan 'd' (tanggal ISO)
+
+    def iter_rows(self, indices, max_rows):
+        """Tuple nilai pada kolom indices untuk setiap baris data; baris yang kosong di semua kolom tersebut dilewati."""
+        self._wanted = frozenset(indices)
+        count = 0
+        for source in (self._buffered, self._rows):
+            for row in source:
+                if count >= max_rows:
+                    return
+                values = tuple(row.get(i) for i in indices)
+                if all(_is_blank(v) for v in values):
+                    continue
+                count += 1
+                yield values
+
+    def read(self, columns, categorical_columns, max_rows):
+        _check_columns(self.columns, columns)
+        indices = [self.columns.index(col) for col in columns]
+        data = {col: [] for col in columns}
+        for values in self.iter_rows(indices, max_rows):
+            for col, value in zip(columns, values):
+                data[col].append(value)
+        for col in categorical_columns:
+            data[col] = [_cell_text(v) for v in data[col]]
+        return pd.DataFrame(data, columns=columns)
+
+    def close(self):
+        if self._xml is not None:
+            self._xml.close()
+        self.archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _read_excel(file, sheet=None, header_row=None, **kwargs):
+    """pd.read_excel (file .xls, atau XLSX tanpa lxml) dengan sheet berupa nama atau indeks."""
+    sheet_name = 0 if sheet in (None, '') else (int(sheet) if str(sheet).isdigit() else sheet)
+    header = _header_index(header_row) or 0
+    try:
+        return pd.read_excel(file, sheet_name=sheet_name, header=header, **kwargs)
+    except (KeyError, IndexError):
+        raise ValueError(f"Sheet '{sheet}' tidak ditemukan.")
+
+def _read_excel_columns(file, columns, categorical_columns, max_rows, sheet=None, header_row=None):
+    _check_columns(_read_excel(file, sheet, header_row, nrows=0).columns, columns)
+    file.seek(0)
+    dtype = {col: str for col in categorical_columns}
+    return _read_excel(file, sheet, header_row, usecols=columns, dtype=dtype, nrows=max_rows)
+
+def read_table(file, filename, numeric_columns=(), categorical_columns=(), max_rows=None, sheet=None, header_row=None):
+    """
+    Membaca hanya kolom numerik dan kolom grup yang diminta dari file CSV/Excel.
+    Kolom numerik dikonversi ke float64 (nilai tidak valid menjadi NaN),
+    kolom grup menjadi categorical. sheet/header_row hanya berlaku untuk
+    Excel; tanpa header_row, header XLSX dideteksi otomatis. Melempar
+    ValueError untuk format, sheet, atau kolom yang tidak valid.
+    """
+    columns = list(dict.fromkeys(list(numeric_columns) + list(categorical_columns)))
+    if not columns or not all(columns):
+        raise ValueError('Nama kolom yang akan dianalisis harus diisi.')
+    max_rows = max_rows or MAX_DATASET_ROWS
+    name = filename.lower()
+    if name.endswith(CSV_EXTENSIONS):
+        df = _read_csv(file, columns, categorical_columns, max_rows)
+    elif _use_streaming_xlsx(name):
+        with _XlsxReader(file, sheet, header_row) as reader:
+            df = reader.read(columns, categorical_columns, max_rows)
+    elif name.endswith(EXCEL_EXTENSIONS):
+        df = _read_excel_columns(file, columns, categorical_columns, max_rows, sheet, header_row)
+    else:
+        raise ValueError('Format file tidak didukung.')
+    return _finalize(df, numeric_columns, categorical_columns)
+
+def read_full_table(file, filename, max_rows=None, sheet=None, header_row=None):
+    """Membaca seluruh kolom file CSV/Excel (dibatasi max_rows), dipakai saat menyimpan dataset."""
+    max_rows = max_rows or MAX_DATASET_ROWS
+    name = filename.lower()
+    if name.endswith(CSV_EXTENSIONS):
+        df = _read_csv_arrow(file, max_rows) if PYARROW_AVAILABLE else None
+        return df if df is not None else _read_csv_chunked(file, max_rows)
+    if _use_streaming_xlsx(name):
+        with _XlsxReader(file, sheet, header_row) as reader:
+            return reader.read(reader.columns, (), max_rows)
+    if name.endswith(EXCEL_EXTENSIONS):
+        return _read_excel(file, sheet, header_row, nrows=max_rows)
+    raise ValueError('Format file tidak didukung.')
+
+
+def _column_type(series):
+    """Tipe kolom dari sampel preview: numeric, datetime, categorical, atau empty."""
+    values = series.dropna()
+    if isinstance(values.dtype, pd.StringDtype) or values.dtype == object:
+        values = values[~values.astype(str).str.strip().eq('')]
+    if values.empty:
+        return 'empty'
+    if pd.api.types.is_bool_dtype(values):
+        return 'categorical'
+    if pd.api.types.is_datetime64_any_dtype(values) or all(hasattr(v, 'isoformat') for v in values):
+        return 'datetime'
+    if pd.api.types.is_numeric_dtype(values) or pd.to_numeric(values, errors='coerce').notna().all():
+        return 'numeric'
+    return 'categorical'
+
+def preview_table(file, filename, sheet=None, rows=PREVIEW_ROWS_DEFAULT, header_row=None):
+    """
+    Header, tipe kolom (dari sampel), dan beberapa baris pertama file tanpa
+    membaca seluruh isi. Untuk XLSX juga mengembalikan daftar sheet dan
+    baris header yang terdeteksi.
+    """
+    rows = max(1, min(int(rows), PREVIEW_ROWS_MAX))
+    name = filename.lower()
+    sheets = None
+    if name.endswith(CSV_EXTENSIONS):
+        df = pd.read_csv(file, nrows=rows)
+        header_row = 0
+    elif _use_streaming_xlsx(name):
+        with _XlsxReader(file, sheet, header_row) as reader:
+            df = reader.read(reader.columns, (), rows)
+            sheets, sheet, header_row = reader.sheet_names, reader.sheet, reader.header_row
+    elif name.endswith(EXCEL_EXTENSIONS):
+        df = _read_excel(file, sheet, header_row, nrows=rows)
+        header_row = _header_index(header_row) or 0
+    else:
+        raise ValueError('Format file tidak didukung.')
+
+    return {
+        'sheets': sheets,
+        'sheet': sheet,
+        'header_row': header_row,
+        'columns': [{'name': str(col), 'type': _column_type(df[col])} for col in df.columns],
+        'rows': json.loads(df.to_json(orient='records', date_format='iso')),
+        'n_preview_rows': int(len(df))
+    }
@@ -0,0 +1,93 @@
+# ========================================================================
+# File: app/lazy.py
+# Deskripsi: Impor malas (lazy import) untuk pustaka berat (scipy,
+#            statsmodels, PyPDF2, reportlab, python-docx, WeasyPrint,
+#            Gemini, Midtrans, pyarrow). Modul baru benar-benar diimpor
+#            saat atributnya pertama kali dipakai, atau sekaligus lewat
+#            warm_up() dari hook gunicorn, sehingga impor aplikasi (CLI,
+#            tes, worker yang hanya merender template) tidak menanggung
+#            biayanya.
+# ========================================================================
+
+import importlib
+import importlib.util
+import os
+import threading
+import time
+
+_registry = []
+
+
+class LazyModule:
+    """
+    Pengganti modul: `stats = LazyModule('scipy.stats')` lalu `stats.norm`
+    mengimpor scipy.stats pada akses pertama. on_load(module) dijalankan
+    sekali setelah impor (mis. konfigurasi API key).
+    """
+    def __init__(self, name, on_load=None):
+        self._name = name
+        self._on_load = on_load
+        self._module = None
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    @property
+    def loaded(self):
+        return self._module is not None
+
+    def load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    module = importlib.import_module(self._name)
+                    if self._on_load is not None:
+                        self._on_load(module)
+                    self._module = module
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+    def __repr__(self):
+        state = 'dimuat' if self.loaded else 'belum dimuat'
+        return f"<LazyModule '{self._name}' ({state})>"
+
+
+def module_available(name):
+    """True jika modul dapat diimpor, tanpa mengimpornya (pengganti try-import untuk flag *_ENABLED)."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def warm_up(names=None):
+    """
+    Mengimpor modul malas yang terdaftar (semua, atau yang namanya diawali
+    salah satu prefix di names). Mengembalikan {nama_modul: detik} untuk log;
+    modul yang gagal diimpor dilewati dengan nilai None.
+    """
+    timings = {}
+    for lazy in list(_registry):
+        if lazy.loaded or (names and not any(lazy._name.startswith(n) for n in names)):
+            continue
+        start = time.perf_counter()
+        try:
+            lazy.load()
+            timings[lazy._name] = time.perf_counter() - start
+        except Exception:
+            timings[lazy._name] = None
+    return timings
+
+
+def warm_up_from_env():
+    """
+    warm_up() sesuai env LAZY_WARM_UP: 'all' (default), 'none', atau daftar
+    prefix modul dipisah koma (mis. 'scipy,statsmodels').
+    """
+    setting = os.getenv('LAZY_WARM_UP', 'all').strip()
+    if setting.lower() == 'none':
+        return {}
+    if setting.lower() == 'all':
+        return warm_up()
+    return warm_up([name.strip() for name in setting.split(',') if name.strip()])
@@ -0,0 +1,161 @@
+# ========================================================================
+# File: app/plot_renderer.py
+# Deskripsi: Renderer grafik server (matplotlib/seaborn) di process pool
+#            terpisah. Setiap worker mengimpor dan mengatur gaya pustaka
+#            sekali, memakai ulang satu objek Figure tanpa state pyplot,
+#            dan hasilnya (PNG/WebP/SVG) di-cache berdasarkan hash data
+#            dan spesifikasi grafik.
+# ========================================================================
+
+import base64
+import hashlib
+import io
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from cachetools import LRUCache
+
+PLOT_KINDS = ('histogram', 'boxplot', 'pie')
+PLOT_FORMATS = {'png': 'image/png', 'webp': 'image/webp', 'svg': 'image/svg+xml'}
+PLOT_WORKERS = int(os.getenv('PLOT_WORKERS', '2'))
+# Total ukuran gambar (byte) yang disimpan di cache per proses web
+PLOT_CACHE_BYTES = int(os.getenv('PLOT_CACHE_BYTES', str(64 * 1024 * 1024)))
+PIE_MAX_CATEGORIES = 10
+
+_plot_pool = None
+_plot_pool_lock = threading.Lock()
+_plot_cache = LRUCache(maxsize=PLOT_CACHE_BYTES, getsizeof=len)
+_plot_cache_lock = threading.Lock()
+
+# State per worker, diisi oleh _init_worker
+_figure = None
+_sns = None
+
+
+def _init_worker():
+    """Dijalankan sekali per worker: backend Agg, gaya seaborn, dan satu Figure yang dipakai ulang."""
+    global _figure, _sns
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib.figure import Figure
+    import seaborn as sns
+    sns.set_style('whitegrid')
+    matplotlib.rcParams.update({
+        'font.family': 'sans-serif',
+        'font.sans-serif': ['Arial', 'DejaVu Sans'],
+        'axes.titleweight': 'bold',
+        'axes.titlesize': 14,
+        'axes.labelsize': 12,
+        'xtick.labelsize': 10,
+        'ytick.labelsize': 10,
+        'figure.figsize': (8, 5),
+    })
+    _sns = sns
+    _figure = Figure()
+
+def get_plot_pool():
+    global _plot_pool
+    with _plot_pool_lock:
+        if _plot_pool is None:
+            _plot_pool = ProcessPoolExecutor(max_workers=PLOT_WORKERS, initializer=_init_worker)
+        return _plot_pool
+
+def _save_kwargs(fmt, optimize):
+    if fmt == 'png':
+        # compress_level 0-9; optimize=True meminta Pillow mencari encoding terkecil
+        return {'pil_kwargs': {'compress_level': 9 if optimize else 6, 'optimize': bool(optimize)}}
+    if fmt == 'webp':
+        return {'pil_kwargs': {'quality': 80, 'method': 6 if optimize else 4}}
+    return {'metadata': {'Date': None}}
+
+def render_in_worker(kind, values, title, fmt, optimize, size):
+    """Dijalankan di worker: menggambar satu grafik pada Figure bersama dan mengembalikan byte gambar."""
+    if _figure is None:
+        _init_worker()
+    fig = _figure
+    fig.clf()
+    fig.set_size_inches(*size)
+    ax = fig.add_subplot()
+
+    if kind == 'histogram':
+        _sns.histplot(values, kde=True, ax=ax, color='#0284c7')
+    elif kind == 'boxplot':
+        _sns.boxplot(x=values, ax=ax, color='#0284c7')
+    else:
+        labels, counts = np.unique(values, return_counts=True)
+        ax.pie(counts, labels=[f'{l:g}' for l in labels], autopct='%1.1f%%', startangle=90)
+        ax.axis('equal')
+    ax.set_title(title)
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt, bbox_inches='tight', **_save_kwargs(fmt, optimize))
+    return buf.getvalue()
+
+def plot_key(kind, values, title, fmt, optimize, size):
+    digest = hashlib.sha256(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+    digest.update(json.dumps([kind, title, fmt, bool(optimize), list(size)]).encode('utf-8'))
+    return digest.hexdigest()
+
+def can_render(kind, values):
+    if kind == 'pie':
+        n_unique = np.unique(values).size
+        return 1 < n_unique <= PIE_MAX_CATEGORIES
+    return values.size >= 2
+
+
+class PlotRequest:
+    """Satu grafik yang akan dirender: jenis, nilai (tanpa NaN), judul, dan format output."""
+    def __init__(self, kind, values, title, fmt='png', optimize=False, size=(6.4, 4.8)):
+        if kind not in PLOT_KINDS:
+            raise ValueError(f"Jenis grafik tidak dikenal: {kind}")
+        if fmt not in PLOT_FORMATS:
+            raise ValueError(f"Format gambar tidak didukung: {fmt}")
+        self.kind = kind
+        self.values = np.asarray(values, dtype=np.float64)
+        self.title = title
+        self.fmt = fmt
+        self.optimize = optimize
+        self.size = tuple(size)
+
+    def args(self):
+        return self.kind, self.values, self.title, self.fmt, self.optimize, self.size
+
+    def data_uri(self, image):
+        return f"data:{PLOT_FORMATS[self.fmt]};base64," + base64.b64encode(image).decode('ascii')
+
+
+def render_plots(requests):
+    """
+    Merender daftar PlotRequest dan mengembalikan list data URI dengan urutan
+    yang sama (None untuk grafik yang tidak dapat dibuat). Gambar yang sudah
+    ada di cache tidak dirender ulang; sisanya dirender paralel di pool.
+    """
+    results = [None] * len(requests)
+    pending = {}
+    for i, plot in enumerate(requests):
+        if not can_render(plot.kind, plot.values):
+            continue
+        key = plot_key(*plot.args())
+        with _plot_cache_lock:
+            image = _plot_cache.get(key)
+        if image is not None:
+            results[i] = plot.data_uri(image)
+        else:
+            pending[i] = (key, get_plot_pool().submit(render_in_worker, *plot.args()))
+
+    for i, (key, future) in pending.items():
+        try:
+            image = future.result()
+        except Exception as e:
+            print(f"Gagal merender grafik '{requests[i].title}': {e}")
+            continue
+        with _plot_cache_lock:
+            try:
+                _plot_cache[key] = image
+            except ValueError:
+                pass  # gambar lebih besar dari seluruh kapasitas cache
+        results[i] = requests[i].data_uri(image)
+    return results
@@ -0,0 +1,167 @@
+# ========================================================================
+# File: app/resampling.py
+# Deskripsi: Uji berbasis resampling (bootstrap dan permutasi) untuk uji T
+#            dan ANOVA. Resampling dilakukan per blok sebagai matriks indeks
+#            atau permutasi NumPy, bukan loop Python per iterasi. Iterasi
+#            dibagi ke blok berukuran tetap dengan seed turunan
+#            (SeedSequence.spawn), sehingga hasil dengan seed yang sama
+#            identik baik dihitung inline maupun di process pool.
+# ========================================================================
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+RESAMPLING_TESTS = ('independent', 'paired', 'anova')
+DEFAULT_ITERATIONS = 10_000
+MAX_ITERATIONS = 100_000
+# Ukuran blok: maksimal iterasi dan elemen (iterasi x n) per blok. Pembagian blok
+# hanya bergantung pada iterasi dan n sehingga seed yang sama memberi hasil yang sama.
+BLOCK_ITERATIONS = 1000
+BLOCK_ELEMENTS = 4_000_000
+# Di bawah total elemen (iterasi x n) ini, blok dihitung langsung di proses web
+INLINE_MAX_ELEMENTS = 2_000_000
+
+_resampling_pool = None
+
+
+def get_resampling_pool():
+    global _resampling_pool
+    if _resampling_pool is None:
+        _resampling_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 2)
+    return _resampling_pool
+
+
+def _mean_diff_independent(a, b):
+    return a.mean(axis=-1) - b.mean(axis=-1)
+
+def _f_statistic(values, onehot, counts):
+    """F one-way untuk setiap baris matriks nilai (baris = resample), grup via matriks one-hot."""
+    n, k = values.shape[-1], counts.size
+    grand = values.mean(axis=-1, keepdims=True)
+    group_means = (values @ onehot) / counts
+    ssb = ((group_means - grand) ** 2 * counts).sum(axis=-1)
+    sst = ((values - grand) ** 2).sum(axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (ssb / (k - 1)) / ((sst - ssb) / (n - k))
+
+
+def run_block(test, arrays, iterations, seed_seq):
+    """
+    Dijalankan di worker: satu blok bootstrap dan permutasi.
+    Mengembalikan (statistik_bootstrap, statistik_permutasi).
+    """
+    rng = np.random.default_rng(seed_seq)
+    if test == 'independent':
+        a, b = arrays
+        boot = _mean_diff_independent(
+            a[rng.integers(0, a.size, (iterations, a.size), dtype=np.int32)],
+            b[rng.integers(0, b.size, (iterations, b.size), dtype=np.int32)]
+        )
+        pooled = np.concatenate([a, b])
+        permuted = rng.permuted(np.broadcast_to(pooled, (iterations, pooled.size)), axis=1)
+        perm = _mean_diff_independent(permuted[:, :a.size], permuted[:, a.size:])
+        return boot, perm
+
+    if test == 'paired':
+        (d,) = arrays
+        boot = d[rng.integers(0, d.size, (iterations, d.size), dtype=np.int32)].mean(axis=1)
+        # Di bawah H0 tanda selisih tiap pasangan dapat ditukar
+        signs = rng.choice(np.array([-1.0, 1.0]), (iterations, d.size))
+        perm = (signs * d).mean(axis=1)
+        return boot, perm
+
+    groups = arrays
+    counts = np.array([g.size for g in groups], dtype=np.float64)
+    boot = np.column_stack([g[rng.integers(0, g.size, (iterations, g.size), dtype=np.int32)].mean(axis=1) for g in groups])
+    pooled = np.concatenate(groups)
+    onehot = np.repeat(np.eye(len(groups)), counts.astype(np.intp), axis=0)
+    permuted = rng.permuted(np.broadcast_to(pooled, (iterations, pooled.size)), axis=1)
+    perm = _f_statistic(permuted, onehot, counts)
+    return boot, perm
+
+
+def _percentile_ci(samples, confidence):
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(samples, [alpha, 1 - alpha], axis=0)
+    return low, high
+
+def _run_blocks(test, arrays, iterations, seed):
+    n_values = sum(a.size for a in arrays)
+    block = max(1, min(BLOCK_ITERATIONS, BLOCK_ELEMENTS // n_values))
+    n_blocks = -(-iterations // block)
+    sizes = [block] * (n_blocks - 1) + [iterations - block * (n_blocks - 1)]
+    seeds = np.random.SeedSequence(seed).spawn(n_blocks)
+
+    if iterations * n_values <= INLINE_MAX_ELEMENTS or n_blocks == 1:
+        results = [run_block(test, arrays, size, s) for size, s in zip(sizes, seeds)]
+    else:
+        pool = get_resampling_pool()
+        results = list(pool.map(run_block, [test] * n_blocks, [arrays] * n_blocks, sizes, seeds))
+    boot = np.concatenate([r[0] for r in results])
+    perm = np.concatenate([r[1] for r in results])
+    return boot, perm
+
+def resample(test, arrays, iterations=DEFAULT_ITERATIONS, seed=None, confidence=0.95):
+    """
+    Bootstrap (CI persentil) dan uji permutasi.
+      - 'independent': arrays = (a, b); statistik = selisih mean a - b
+      - 'paired'     : arrays = (a, b); statistik = mean selisih berpasangan (permutasi tanda)
+      - 'anova'      : arrays = list grup; statistik = F one-way, CI bootstrap per mean grup
+    Seed None memakai entropi acak; seed yang dipakai selalu dikembalikan.
+    """
+    if test not in RESAMPLING_TESTS:
+        raise ValueError(f"Jenis uji resampling tidak dikenal: {test}")
+    iterations = int(iterations)
+    if not 1 <= iterations <= MAX_ITERATIONS:
+        raise ValueError(f"Jumlah iterasi harus antara 1 dan {MAX_ITERATIONS}.")
+    if seed is None:
+        seed = int(np.random.SeedSequence().entropy % (2 ** 32))
+    arrays = [np.ascontiguousarray(a, dtype=np.float64) for a in arrays]
+    arrays = [a[~np.isnan(a)] for a in arrays] if test != 'paired' else arrays
+
+    if test == 'paired':
+        a, b = arrays
+        if a.shape != b.shape:
+            raise ValueError('Kedua set data harus memiliki jumlah yang sama.')
+        mask = ~(np.isnan(a) | np.isnan(b))
+        arrays = [a[mask] - b[mask]]
+    if any(a.size < 2 for a in arrays):
+        raise ValueError('Setiap grup minimal punya 2 data')
+    if test == 'anova' and len(arrays) < 2:
+        raise ValueError('Analisis ANOVA membutuhkan minimal 2 kelompok data.')
+
+    boot, perm = _run_blocks(test, arrays, iterations, seed)
+    result = {'test': test, 'iterations': iterations, 'seed': seed, 'confidence': confidence}
+
+    if test == 'anova':
+        counts = np.array([g.size for g in arrays], dtype=np.float64)
+        pooled = np.concatenate(arrays)
+        onehot = np.repeat(np.eye(len(arrays)), counts.astype(np.intp), axis=0)
+        observed = float(_f_statistic(pooled, onehot, counts))
+        p = (np.count_nonzero(perm >= observed * (1 - 1e-9)) + 1) / (iterations + 1)
+        low, high = _percentile_ci(boot, confidence)
+        result.update({
+            'statistic': 'F',
+            'observed': observed,
+            'permutation_p': float(p),
+            'group_means': [
+                {'mean': float(g.mean()), 'bootstrap_se': float(se), 'ci': [float(l), float(h)]}
+                for g, se, l, h in zip(arrays, boot.std(axis=0, ddof=1), low, high)
+            ]
+        })
+        return result
+
+    observed = float(arrays[0].mean() - arrays[1].mean()) if test == 'independent' else float(arrays[0].mean())
+    # Dua sisi: proporsi statistik permutasi yang setidaknya seekstrem statistik teramati
+    p = (np.count_nonzero(np.abs(perm) >= abs(observed) * (1 - 1e-9)) + 1) / (iterations + 1)
+    low, high = _percentile_ci(boot, confidence)
+    result.update({
+        'statistic': 'mean_difference',
+        'observed': observed,
+        'bootstrap_se': float(boot.std(ddof=1)),
+        'ci': [float(low), float(high)],
+        'permutation_p': float(p)
+    })
+    return result
@@ -0,0 +1,145 @@
+# ========================================================================
+# File: app/result_cache.py
+# Deskripsi: Cache hasil endpoint analisis statistik. Kunci cache adalah
+#            hash kanonik dari input (nilai numerik sebagai float64, file
+#            unggahan, body MessagePack/Arrow, atau dataset_id + kolom)
+#            beserta parameter uji, nama endpoint, dan ID pengguna (hasil
+#            tidak pernah dibagi antar pengguna). Cache dipasang sebelum
+#            pengecekan kuota trial sehingga klik "Analisis" berulang pada
+#            data yang sama tidak menghitung ulang dan tidak memakai kuota;
+#            status PRO/kuota tetap diperiksa ulang (tanpa menambah hitungan)
+#            sebelum respons tersimpan dikirim. Ukuran dibatasi dengan LRU
+#            berdasarkan jumlah byte respons (per proses worker).
+# ========================================================================
+
+import hashlib
+import numbers
+import threading
+from functools import wraps
+
+import numpy as np
+from cachetools import LRUCache
+from flask import Response, make_response, request
+from flask_login import current_user
+
+from app.binary_payload import PayloadError, is_binary_request, read_request_data
+
+_HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def _is_number(value):
+    return isinstance(value, numbers.Number) and not isinstance(value, bool)
+
+def _update_digest(digest, obj):
+    """
+    Memasukkan objek JSON ke hash secara kanonik: key dict diurutkan dan
+    list angka di-hash sebagai array float64 sehingga [1, 2] dan [1.0, 2.0]
+    menghasilkan kunci yang sama.
+    """
+    if isinstance(obj, dict):
+        digest.update(b'{')
+        for key in sorted(obj, key=str):
+            digest.update(str(key).encode('utf-8') + b':')
+            _update_digest(digest, obj[key])
+        digest.update(b'}')
+    elif isinstance(obj, list):
+        if obj and all(_is_number(v) or v is None for v in obj):
+            digest.update(b'#')
+            digest.update(np.asarray(obj, dtype=np.float64).tobytes())
+        else:
+            digest.update(b'[')
+            for item in obj:
+                _update_digest(digest, item)
+            digest.update(b']')
+    elif _is_number(obj):
+        digest.update(b'n' + np.float64(obj).tobytes())
+    else:
+        digest.update(b's' + repr(obj).encode('utf-8'))
+    digest.update(b';')
+
+def request_key(endpoint):
+    """
+    Kunci cache untuk request saat ini, atau None jika request tidak boleh
+    di-cache (body tidak valid, atau meminta efek samping seperti menyimpan dataset).
+    """
+    digest = hashlib.sha256(endpoint.encode('utf-8') + b'\0')
+    # Hasil hanya dibagikan ke pengguna yang sama (dataset dan kuota trial bersifat per pengguna)
+    digest.update(b'owner=' + str(current_user.id).encode('utf-8') + b'\0')
+    if is_binary_request():
+        # Body MessagePack/Arrow di-hash apa adanya; parameter didekode untuk pengecekan di bawah
+        try:
+            params = read_request_data()
+        except PayloadError:
+            return None
+        digest.update(request.mimetype.encode('utf-8') + b'\0')
+        digest.update(request.get_data(cache=True))
+    elif request.is_json:
+        data = request.get_json(silent=True)
+        if data is None:
+            return None
+        _update_digest(digest, data)
+        params = data if isinstance(data, dict) else {}
+    else:
+        params = request.form
+        _update_digest(digest, {key: params.getlist(key) for key in params})
+        for name in sorted(request.files):
+            stream = request.files[name].stream
+            digest.update(name.encode('utf-8') + b'=')
+            for chunk in iter(lambda: stream.read(_HASH_CHUNK_BYTES), b''):
+                digest.update(chunk)
+            stream.seek(0)
+
+    if str(params.get('keep_dataset', '')).lower() in ('1', 'true'):
+        return None
+    return digest.hexdigest()
+
+
+class ResultCache:
+    def __init__(self, max_bytes):
+        self._cache = LRUCache(maxsize=max_bytes, getsizeof=lambda entry: len(entry[0]))
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            return self._cache.get(key)
+
+    def put(self, key, body, mimetype):
+        with self._lock:
+            try:
+                self._cache[key] = (body, mimetype)
+            except ValueError:
+                pass  # respons lebih besar dari seluruh kapasitas cache
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+def cached_response(cache, gate=None):
+    """
+    Decorator endpoint analisis (dipasang di bawah @login_required). Respons
+    JSON berstatus 200 disimpan; request berikutnya dengan input yang sama
+    langsung mendapat respons tersimpan tanpa menjalankan fungsi endpoint.
+    `gate` (opsional) dipanggil sebelum respons tersimpan dikirim; jika ia
+    mengembalikan respons (mis. kuota trial habis), respons itu yang dikirim.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = request_key(request.endpoint)
+            if key is not None:
+                hit = cache.get(key)
+                if hit is not None:
+                    denied = gate() if gate is not None else None
+                    if denied is not None:
+                        return denied
+                    body, mimetype = hit
+                    return Response(body, status=200, mimetype=mimetype, headers={'X-Cache': 'HIT'})
+
+            response = make_response(view(*args, **kwargs))
+            if key is not None and response.status_code == 200 and not response.is_streamed and response.mimetype == 'application/json':
+                cache.put(key, response.get_data(), response.mimetype)
+                response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
@@ -12,36 +12,36 @@ import os
 import json
 import re
 import requests
-import google.generativeai as genai
 import time
-import midtransclient
 from datetime import date, datetime, timedelta
 from werkzeug.utils import secure_filename
 import uuid
 import io
 import base64
-from concurrent.futures import ThreadPoolExecutor
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from cachetools import TTLCache
 
 # --- Impor untuk Analisis Statistik ---
-from scipy import stats
 import numpy as np
 import pandas as pd
-import matplotlib
-matplotlib.use('Agg')  # non-interactive backend
-import matplotlib.pyplot as plt
-import seaborn as sns
-# --- Impor tambahan untuk ANOVA Profesional ---
-from statsmodels.stats.multicomp import pairwise_tukeyhsd
-import statsmodels.api as sm
-from statsmodels.formula.api import ols
-import pingouin as pg
 
 
 # --- Impor dari __init__.py ---
 from app import app, db, login_manager
+from app.document_cache import DocumentCache, fingerprint
+from app import stats_engine
+from app.ingest import PREVIEW_ROWS_DEFAULT, read_table, is_supported, preview_table
+from app.dataset_store import DatasetStore, DatasetNotFound
+from app.batch_analysis import plan_batch, run_batch, MAX_BATCH_SPECS
+from app.plot_renderer import PLOT_FORMATS, PlotRequest, render_plots
+from app.resampling import RESAMPLING_TESTS, DEFAULT_ITERATIONS, resample
+from app.result_cache import ResultCache, cached_response
+from app.binary_payload import PayloadError, negotiated_response, read_request_data
+from app.document_extract import MAX_BULK_REQUEST_BYTES, extract_text, expand_uploads, get_extraction_pool
 
 # Impor untuk framework Flask dan ekstensi
-from flask import render_template, jsonify, request, redirect, url_for, flash, send_file
+from flask import render_template, jsonify, request, redirect, url_for, flash, send_file, Response, stream_with_context
 from flask_cors import CORS
 from flask_login import (
     UserMixin,
@@ -53,79 +53,77 @@ from flask_login import (
 from werkzeug.security import generate_password_hash, check_password_hash
 from firebase_admin import auth, firestore
 
-# Impor untuk analisis dokumen
-import PyPDF2
-import docx
-
 # --- Impor untuk Ekspor Dokumen ---
-try:
-    from reportlab.lib.pagesizes import letter
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image
-    from reportlab.lib.styles import getSampleStyleSheet
-    from reportlab.lib.units import inch
-    from docx import Document
-    from docx.shared import Inches
-    PDF_EXPORT_ENABLED = True
-    WORD_EXPORT_ENABLED = True
-except ImportError:
-    print("PERINGATAN: Library 'reportlab' atau 'python-docx' tidak terinstal. Fitur ekspor tidak akan berfungsi.")
-    PDF_EXPORT_ENABLED = False
-    WORD_EXPORT_ENABLED = False
+from app.export_engine import PDF_EXPORT_ENABLED, WORD_EXPORT_ENABLED, render_pdf, render_docx, compile_thesis_pdf, compile_thesis_docx
+from app.weasy_engine import WEASYPRINT_ENABLED, render_weasy_pdf
+from app.artifact_store import ArtifactStore
+from app.lazy import LazyModule
 
 
 # --- Konfigurasi Tambahan ---
-try:
-    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-except Exception as e:
-    print(f"Peringatan: Gagal mengkonfigurasi Gemini API. Error: {e}")
-
-try:
-    server_key = os.getenv('MIDTRANS_SERVER_KEY')
-    client_key = os.getenv('MIDTRANS_CLIENT_KEY')
-    midtrans_snap = midtransclient.Snap(
-        is_production=False,
-        server_key=server_key,
-        client_key=client_key
-    )
-except Exception as e:
-    print(f"Peringatan: Gagal mengkonfigurasi Midtrans. Error: {e}")
-    midtrans_snap = None
+# Gemini dan Midtrans diimpor saat pertama dipakai (atau saat warm-up worker, lihat app/lazy.py)
+def _configure_gemini(module):
+    try:
+        module.configure(api_key=os.getenv("GEMINI_API_KEY"))
+    except Exception as e:
+        print(f"Peringatan: Gagal mengkonfigurasi Gemini API. Error: {e}")
+
+genai = LazyModule('google.generativeai', on_load=_configure_gemini)
+midtransclient = LazyModule('midtransclient')
+_midtrans_snap = None
+_midtrans_lock = threading.Lock()
+
+def get_midtrans_snap():
+    """Klien Snap Midtrans, dibuat sekali saat transaksi pertama; None jika gagal dikonfigurasi."""
+    global _midtrans_snap
+    with _midtrans_lock:
+        if _midtrans_snap is None:
+            try:
+                _midtrans_snap = midtransclient.Snap(
+                    is_production=False,
+                    server_key=os.getenv('MIDTRANS_SERVER_KEY'),
+                    client_key=os.getenv('MIDTRANS_CLIENT_KEY')
+                )
+            except Exception as e:
+                print(f"Peringatan: Gagal mengkonfigurasi Midtrans. Error: {e}")
+                return None
+        return _midtrans_snap
 
-OUTPUT_DIR = os.path.join(app.static_folder, 'outputs')
+# Di luar folder static: artefak hanya dapat diunduh lewat download_export (butuh login)
+OUTPUT_DIR = os.getenv('EXPORT_ARTIFACT_DIR', os.path.join(app.instance_path, 'exports'))
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-sns.set_style('whitegrid')
-plt.rcParams['font.family'] = 'sans-serif'
-plt.rcParams['font.sans-serif'] = ['Arial', 'DejaVu Sans']
-plt.rcParams['axes.titleweight'] = 'bold'
-plt.rcParams['axes.titlesize'] = 14
-plt.rcParams['axes.labelsize'] = 12
-plt.rcParams['xtick.labelsize'] = 10
-plt.rcParams['ytick.labelsize'] = 10
-plt.rcParams['figure.figsize'] = (8,5)
+# Artefak ekspor disimpan di OUTPUT_DIR dengan nama berdasarkan hash konten
+export_store = ArtifactStore(
+    OUTPUT_DIR,
+    max_age_seconds=int(os.getenv('EXPORT_ARTIFACT_MAX_AGE_HOURS', '24')) * 3600,
+    max_total_bytes=int(os.getenv('EXPORT_ARTIFACT_MAX_MB', '500')) * 1024 * 1024
+)
+export_executor = ThreadPoolExecutor(max_workers=int(os.getenv('EXPORT_WORKERS', '2')))
+# Job ekspor async yang masih berjalan; dihapus begitu selesai (add_done_callback).
+# Job yang gagal hanya menyisakan pesan error (tanpa future/traceback/closure render)
+# selama EXPORT_JOB_ERROR_TTL_SECONDS agar dapat dibaca export_status.
+export_jobs = {}
+export_job_errors = {}
+export_jobs_lock = threading.Lock()
+EXPORT_JOB_ERROR_TTL_SECONDS = 3600
+
+# Dataset yang diunggah sekali lalu dianalisis berkali-kali lewat dataset_id
+dataset_store = DatasetStore(os.getenv('DATASET_STORE_DIR', os.path.join(app.instance_path, 'datasets')))
+
+# Cache respons endpoint analisis berdasarkan hash input (LRU berbasis ukuran byte)
+result_cache = ResultCache(max_bytes=int(os.getenv('RESULT_CACHE_MB', '64')) * 1024 * 1024)
+
+# Cache hasil ekstraksi dokumen (teks + metadata sitasi) berdasarkan hash konten
+document_cache = DocumentCache(
+    os.getenv('DOCUMENT_CACHE_PATH', os.path.join(app.instance_path, 'document_cache.sqlite3')),
+    max_entries=int(os.getenv('DOCUMENT_CACHE_MAX_ENTRIES', '2000'))
+)
 
 
 # =========================================================================
 # FUNGSI HELPER
 # =========================================================================
-def read_pdf(file_stream):
-    reader = PyPDF2.PdfReader(file_stream)
-    text = ""
-    for page in reader.pages:
-        text += page.extract_text() or ""
-    return text
-
-def read_docx(file_stream):
-    doc = docx.Document(file_stream)
-    text = "\n".join([para.text for para in doc.paragraphs])
-    return text
-
-def create_plot_as_base64(fig):
-    buf = io.BytesIO()
-    fig.savefig(buf, format='png', bbox_inches='tight')
-    plt.close(fig)
-    return "data:image/png;base64," + base64.b64encode(buf.getvalue()).decode('utf-8')
-
 def make_api_request_with_retry(url, headers, params=None, timeout=25, retries=3, backoff_factor=2):
     for attempt in range(retries):
         try:
@@ -191,27 +189,64 @@ class User(UserMixin):
         if self.password_hash is None: return False
         return check_password_hash(self.password_hash, password)
 
+# Cache objek User per proses worker agar load_user tidak membaca Firestore di
+# setiap request. Setiap penulisan data pengguna wajib memanggil invalidate_user,
+# tetapi itu hanya mengosongkan cache di worker yang menangani penulisan tersebut
+# (mis. webhook pembayaran). Worker lain baru melihat perubahan setelah TTL, kecuali
+# jalur yang membaca dokumen pengguna (cek kuota, status pemakaian, halaman sukses
+# pembayaran) yang memperbarui cache lewat _refresh_if_pro / invalidate_user.
+user_cache = TTLCache(
+    maxsize=int(os.getenv('USER_CACHE_MAX_ENTRIES', '2048')),
+    ttl=int(os.getenv('USER_CACHE_TTL_SECONDS', '30'))
+)
+user_cache_lock = threading.Lock()
+
+def invalidate_user(user_id):
+    with user_cache_lock:
+        user_cache.pop(user_id, None)
+
+def _user_from_doc(user_id, user_data):
+    return User(
+        id=user_id,
+        displayName=user_data.get('displayName'),
+        email=user_data.get('email'),
+        password_hash=user_data.get('password_hash'),
+        picture=user_data.get('picture'),
+        pro_expiry_date=user_data.get('proExpiryDate'),
+        legacy_is_pro=user_data.get('isPro', False)
+    )
+
 @login_manager.user_loader
 def load_user(user_id):
     if not db: return None
+    with user_cache_lock:
+        user = user_cache.get(user_id)
+    if user is not None:
+        return user
     try:
         user_doc = db.collection('users').document(user_id).get()
         if user_doc.exists:
-            user_data = user_doc.to_dict()
-            return User(
-                id=user_id, 
-                displayName=user_data.get('displayName'), 
-                email=user_data.get('email'), 
-                password_hash=user_data.get('password_hash'), 
-                picture=user_data.get('picture'),
-                pro_expiry_date=user_data.get('proExpiryDate'),
-                legacy_is_pro=user_data.get('isPro', False)
-            )
+            user = _user_from_doc(user_id, user_doc.to_dict())
+            # Hanya pengguna yang ditemukan yang di-cache; None/error selalu dibaca ulang
+            with user_cache_lock:
+                user_cache[user_id] = user
+            return user
         return None
     except Exception as e:
         print(f"Error saat memuat pengguna dari Firestore: {e}")
         return None
 
+def _refresh_if_pro(user_id, user_data):
+    """
+    True jika dokumen pengguna menunjukkan PRO aktif. Dipakai di pengecekan kuota
+    (yang hanya dipanggil untuk pengguna non-PRO) sehingga User di cache yang
+    belum melihat pembayaran terbaru dari worker lain langsung diperbarui.
+    """
+    if not _user_from_doc(user_id, user_data).is_pro:
+        return False
+    invalidate_user(user_id)
+    return True
+
 # =========================================================================
 # FUNGSI HELPER UNTUK PEMBATASAN FITUR
 # =========================================================================
@@ -224,8 +259,10 @@ def check_and_update_usage(user_id, feature_name):
     user_ref = db.collection('users').document(user_id)
     user_doc = user_ref.get()
     if not user_doc.exists: return False, "Pengguna tidak ditemukan."
+    user_data = user_doc.to_dict()
+    if _refresh_if_pro(user_id, user_data): return True, "OK"
     today_str = date.today().isoformat()
-    usage_data = user_doc.to_dict().get('usage_limits', {})
+    usage_data = user_data.get('usage_limits', {})
     last_reset = usage_data.get('last_reset_date')
     if last_reset != today_str:
         citation_total = usage_data.get('citation_count', 0)
@@ -245,21 +282,40 @@ def check_and_update_usage(user_id, feature_name):
     user_ref.update({f'usage_limits.{count_key}': firestore.Increment(1)})
     return True, "OK"
 
-def check_and_update_pro_trial(user_id, feature_name):
+def check_and_update_pro_trial(user_id, feature_name, consume=True):
     PRO_TRIAL_LIMITS = {'writing_assistant': 3, 'data_analysis': 3, 'export_doc': 1, 'generate_theory': 2}
     limit = PRO_TRIAL_LIMITS.get(feature_name)
     if limit is None: return True, "OK"
     user_ref = db.collection('users').document(user_id)
     user_doc = user_ref.get()
     if not user_doc.exists: return False, "Pengguna tidak ditemukan."
-    usage_data = user_doc.to_dict().get('usage_limits', {})
+    user_data = user_doc.to_dict()
+    if _refresh_if_pro(user_id, user_data): return True, "OK"
+    usage_data = user_data.get('usage_limits', {})
     count_key = f"{feature_name}_count"
     current_count = usage_data.get(count_key, 0)
     if current_count >= limit:
         return False, "UPGRADE_REQUIRED"
-    user_ref.update({f'usage_limits.{count_key}': firestore.Increment(1)})
+    if consume:
+        user_ref.update({f'usage_limits.{count_key}': firestore.Increment(1)})
     return True, "OK"
 
+def _data_analysis_cache_gate():
+    """Gate untuk cache hit endpoint analisis: cek ulang PRO/kuota tanpa memakai kuota."""
+    if current_user.is_pro: return None
+    is_allowed, message = check_and_update_pro_trial(current_user.id, 'data_analysis', consume=False)
+    if is_allowed: return None
+    if message == "UPGRADE_REQUIRED":
+        return jsonify({'error': "Batas percobaan tercapai.", 'redirect': url_for('upgrade_page')}), 429
+    return jsonify({'error': message}), 429
+
+def _anova_cache_gate():
+    """Seperti _data_analysis_cache_gate, dengan format respons endpoint ANOVA."""
+    if current_user.is_pro: return None
+    is_allowed, _ = check_and_update_pro_trial(current_user.id, 'data_analysis', consume=False)
+    if is_allowed: return None
+    return jsonify({'success': False, 'message': "Batas percobaan tercapai. Upgrade ke PRO."}), 429
+
 # =========================================================================
 # RUTE-RUTE OTENTIKASI DAN HALAMAN
 # =========================================================================
@@ -290,7 +346,11 @@ def logout():
 @app.route('/')
 @app.route('/dashboard')
 @login_required
-def dashboard(): return render_template('dashboard.html')
+def dashboard():
+    if request.args.get('status') == 'payment-success':
+        # Webhook pembayaran mungkin ditangani worker lain; muat ulang pengguna di request berikutnya
+        invalidate_user(current_user.id)
+    return render_template('dashboard.html')
 
 @app.route('/projects')
 @login_required
@@ -370,6 +430,7 @@ def user_profile():
                 return redirect(url_for('user_profile'))
             user_id = current_user.id
             db.collection('users').document(user_id).update({'displayName': new_name})
+            invalidate_user(user_id)
             auth.update_user(user_id, display_name=new_name)
             flash('Profil berhasil diperbarui!', 'success')
         except Exception as e:
@@ -397,6 +458,7 @@ def verify_google_token():
         user_doc = user_ref.get()
 
         if user_doc.exists:
+            invalidate_user(uid)  # login selalu memakai data terbaru
             user = load_user(uid)
         else:
             user_data = {
@@ -408,6 +470,7 @@ def verify_google_token():
                 'proExpiryDate': None
             }
             user_ref.set(user_data)
+            invalidate_user(uid)
             user = load_user(uid)
         
         login_user(user)
@@ -426,6 +489,7 @@ def verify_email_token():
         decoded_token = auth.verify_id_token(token)
         uid = decoded_token['uid']
         
+        invalidate_user(uid)  # login selalu memakai data terbaru
         user = load_user(uid)
         if user:
             login_user(user)
@@ -920,6 +984,68 @@ def generate_subchapter_content():
 # API LAINNYA
 # =========================================================================
 
+# format -> (ekstensi, mimetype, fungsi render, tersedia, pesan jika tidak tersedia)
+EXPORT_FORMATS = {
+    'pdf': ('pdf', 'application/pdf', render_pdf, PDF_EXPORT_ENABLED, 'Fungsi ekspor PDF tidak tersedia di server.'),
+    'word': ('docx', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document', render_docx, WORD_EXPORT_ENABLED, 'Fungsi ekspor Word tidak tersedia di server.'),
+    'pdf_html': ('pdf', 'application/pdf', render_weasy_pdf, WEASYPRINT_ENABLED, 'Fungsi ekspor PDF (HTML/CSS) tidak tersedia di server.'),
+}
+EXPORT_MIMETYPES = {spec[0]: spec[1] for spec in EXPORT_FORMATS.values()}
+
+COMPILE_RENDERERS = {'pdf': compile_thesis_pdf, 'word': compile_thesis_docx}
+
+def render_export_artifact(key, extension, render):
+    """Merender dokumen ke OUTPUT_DIR, atau memakai artefak yang sudah ada."""
+    path, _ = export_store.find(key, [extension])
+    if path:
+        return path
+    return export_store.write(key, extension, render)
+
+def _export_download_url(key, title):
+    return url_for('download_export', artifact_id=key, name=secure_filename(title) or 'Dokumen-OnThesis')
+
+def _prune_export_job_errors():
+    """Dipanggil dengan export_jobs_lock dipegang."""
+    cutoff = time.time() - EXPORT_JOB_ERROR_TTL_SECONDS
+    for key in [k for k, (_, failed_at) in export_job_errors.items() if failed_at < cutoff]:
+        del export_job_errors[key]
+
+def _finish_export_job(key, future):
+    error = future.exception()
+    if error is not None:
+        print(f"Error saat membuat ekspor {key}: {error}")
+    with export_jobs_lock:
+        if export_jobs.get(key) is future:
+            del export_jobs[key]
+        if error is not None:
+            export_job_errors[key] = (str(error), time.time())
+
+def _export_response(key, extension, mimetype, title, render, run_async):
+    """Mengirim artefak secara langsung, atau menjadwalkannya di background jika run_async."""
+    if not run_async:
+        path = render_export_artifact(key, extension, render)
+        return send_file(path, as_attachment=True, download_name=f'{secure_filename(title)}.{extension}', mimetype=mimetype)
+
+    download_url = _export_download_url(key, title)
+    if export_store.find(key, [extension])[0]:
+        return jsonify({'status': 'ready', 'job_id': key, 'download_url': download_url})
+    with export_jobs_lock:
+        _prune_export_job_errors()
+        future = export_jobs.get(key)
+        started = future is None
+        if started:
+            export_job_errors.pop(key, None)
+            future = export_jobs[key] = export_executor.submit(render_export_artifact, key, extension, render)
+    if started:
+        # Di luar lock: callback langsung dijalankan di thread ini jika job sudah selesai
+        future.add_done_callback(lambda f: _finish_export_job(key, f))
+    return jsonify({
+        'status': 'pending',
+        'job_id': key,
+        'status_url': url_for('export_status', job_id=key),
+        'download_url': download_url
+    }), 202
+
 @app.route('/api/export-document', methods=['POST'])
 @login_required
 def export_document():
@@ -938,64 +1064,83 @@ def export_document():
 
         if not html_content or not export_format:
             return jsonify({'error': 'Konten dan format ekspor diperlukan.'}), 400
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({'error': 'Format tidak didukung.'}), 400
 
-        text_content = html_content.replace('<br>', '\n').replace('</p>', '\n\n').replace('<h3>', '').replace('</h3>', '\n')
-        text_content = re.sub('<[^<]+?>', '', text_content) 
+        extension, mimetype, render, enabled, unavailable_message = EXPORT_FORMATS[export_format]
+        if not enabled:
+            return jsonify({'error': unavailable_message}), 501
 
-        buffer = io.BytesIO()
-        
-        logo_path = os.path.join(app.static_folder, 'images', 'logo.png')
+        key = ArtifactStore.make_key(html_content, export_format, title)
+        return _export_response(key, extension, mimetype, title, lambda f: render(f, title, html_content), bool(data.get('async', False)))
 
-        if export_format == 'pdf':
-            if not PDF_EXPORT_ENABLED:
-                return jsonify({'error': 'Fungsi ekspor PDF tidak tersedia di server.'}), 501
-            
-            doc = SimpleDocTemplate(buffer, pagesize=letter)
-            styles = getSampleStyleSheet()
-            story = []
-
-            if os.path.exists(logo_path):
-                img = Image(logo_path, width=1.5*inch, height=0.5*inch)
-                img.hAlign = 'RIGHT'
-                story.append(img)
-                story.append(Spacer(1, 0.25*inch))
-
-            story.append(Paragraph(title, styles['h1']))
-            story.append(Spacer(1, 0.2*inch))
-
-            for line in text_content.split('\n'):
-                p = Paragraph(line, styles['BodyText'])
-                story.append(p)
-                story.append(Spacer(1, 0.1*inch))
-            
-            doc.build(story)
-            mimetype = 'application/pdf'
-            filename = f'{secure_filename(title)}.pdf'
+    except Exception as e:
+        print(f"Error saat ekspor dokumen: {e}")
+        return jsonify({'error': str(e)}), 500
 
-        elif export_format == 'word':
-            if not WORD_EXPORT_ENABLED:
-                return jsonify({'error': 'Fungsi ekspor Word tidak tersedia di server.'}), 501
+@app.route('/api/compile-thesis', methods=['POST'])
+@login_required
+def compile_thesis():
+    if not current_user.is_pro:
+        is_allowed, message = check_and_update_pro_trial(current_user.id, 'export_doc')
+        if not is_allowed:
+            if message == "UPGRADE_REQUIRED":
+                return jsonify({'error': "Batas percobaan tercapai.", 'redirect': url_for('upgrade_page')}), 429
+            return jsonify({'error': message}), 429
 
-            document = Document()
-            if os.path.exists(logo_path):
-                document.add_picture(logo_path, width=Inches(1.5))
-            
-            document.add_heading(title, level=1)
-            document.add_paragraph(text_content)
-            document.save(buffer)
-            mimetype = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-            filename = f'{secure_filename(title)}.docx'
-        
-        else:
+    try:
+        data = request.get_json()
+        chapters = data.get('chapters')
+        export_format = data.get('format')
+        title = data.get('title', 'Skripsi-OnThesis')
+        content_type = data.get('content_type', 'html')
+        meta = {key: data.get(key) for key in ('author', 'institution', 'year') if data.get(key)}
+
+        if not chapters or not isinstance(chapters, list) or not export_format:
+            return jsonify({'error': 'Daftar bab dan format ekspor diperlukan.'}), 400
+        if export_format not in COMPILE_RENDERERS:
             return jsonify({'error': 'Format tidak didukung.'}), 400
+        if content_type not in ('html', 'markdown'):
+            return jsonify({'error': 'content_type harus html atau markdown.'}), 400
+
+        extension, mimetype, _, enabled, unavailable_message = EXPORT_FORMATS[export_format]
+        if not enabled:
+            return jsonify({'error': unavailable_message}), 501
 
-        buffer.seek(0)
-        return send_file(buffer, as_attachment=True, download_name=filename, mimetype=mimetype)
+        render = COMPILE_RENDERERS[export_format]
+        key = ArtifactStore.make_key('compile-thesis', chapters, export_format, title, meta, content_type)
+        return _export_response(key, extension, mimetype, title, lambda f: render(f, title, chapters, meta, content_type), bool(data.get('async', False)))
 
     except Exception as e:
-        print(f"Error saat ekspor dokumen: {e}")
+        print(f"Error saat kompilasi skripsi: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/export-status/<job_id>')
+@login_required
+def export_status(job_id):
+    if not ArtifactStore.is_valid_key(job_id):
+        return jsonify({'error': 'ID ekspor tidak valid.'}), 400
+    with export_jobs_lock:
+        future = export_jobs.get(job_id)
+        failed = export_job_errors.get(job_id)
+    if future is not None and not future.done():
+        return jsonify({'status': 'pending', 'job_id': job_id})
+    if failed is not None:
+        return jsonify({'status': 'error', 'job_id': job_id, 'error': failed[0]}), 500
+    path, _ = export_store.find(job_id, EXPORT_MIMETYPES.keys())
+    if not path:
+        return jsonify({'status': 'missing', 'job_id': job_id, 'error': 'File ekspor tidak ditemukan atau sudah kedaluwarsa.'}), 404
+    return jsonify({'status': 'ready', 'job_id': job_id})
+
+@app.route('/api/exports/<artifact_id>')
+@login_required
+def download_export(artifact_id):
+    path, extension = export_store.find(artifact_id, EXPORT_MIMETYPES.keys())
+    if not path:
+        return jsonify({'error': 'File ekspor tidak ditemukan atau sudah kedaluwarsa.'}), 404
+    name = secure_filename(request.args.get('name', '')) or 'Dokumen-OnThesis'
+    return send_file(path, as_attachment=True, download_name=f'{name}.{extension}', mimetype=EXPORT_MIMETYPES[extension])
+
 
 @app.route('/interpret-analysis', methods=['POST'])
 @login_required
@@ -1111,6 +1256,135 @@ def chat_with_ai():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Hanya bagian awal dokumen yang dikirim ke AI untuk ekstraksi sitasi
+CITATION_TEXT_CHARS = 8000
+
+# Instruksi bersama untuk ekstraksi sitasi tunggal maupun batch
+CITATION_METADATA_INSTRUCTIONS = (
+    'Identifikasi informasi sitasi untuk dokumen itu sendiri: penulis utama, judul utama, '
+    'tahun publikasi, dan nama jurnal atau konferensi tempat dokumen itu diterbitkan. '
+    'Gunakan kunci JSON "title", "author", "year", dan "journal".'
+)
+
+def extract_citation_metadata(content):
+    """Meminta Gemini mengekstrak metadata sitasi dari teks awal dokumen."""
+    model = genai.GenerativeModel('gemini-1.5-flash')
+    prompt = f"""
+    Berikut adalah teks awal sebuah dokumen akademis. {CITATION_METADATA_INSTRUCTIONS}
+    Berikan hasilnya sebagai array JSON yang hanya berisi SATU objek.
+
+    Teks Dokumen (ambil dari bagian awal untuk efisiensi):
+    ---
+    {content[:CITATION_TEXT_CHARS]} 
+    ---
+    """
+    response = model.generate_content(prompt)
+    clean_json_string = re.sub(r'```json\s*|\s*```', '', response.text.strip(), flags=re.DOTALL)
+    if not clean_json_string.strip().startswith('['):
+        clean_json_string = f"[{clean_json_string}]"
+    return json.loads(clean_json_string)
+
+BULK_METADATA_BATCH_SIZE = 5
+
+def extract_citation_metadata_batch(contents):
+    """
+    Mengekstrak metadata sitasi untuk beberapa dokumen sekaligus dalam satu
+    panggilan Gemini. Mengembalikan list dengan urutan yang sama seperti input.
+    """
+    model = genai.GenerativeModel('gemini-1.5-flash')
+    documents_text = ""
+    for i, content in enumerate(contents):
+        documents_text += f"\n=== DOKUMEN {i} ===\n{content[:4000]}\n"
+    prompt = f"""
+    Berikut adalah bagian awal dari beberapa dokumen akademis. Untuk SETIAP dokumen: {CITATION_METADATA_INSTRUCTIONS}
+    Berikan hasilnya sebagai array JSON dengan tepat {len(contents)} objek, satu per dokumen,
+    masing-masing dengan tambahan kunci "index" (nomor dokumen).
+    {documents_text}
+    """
+    response = model.generate_content(prompt)
+    clean_json_string = re.sub(r'```json\s*|\s*```', '', response.text.strip(), flags=re.DOTALL)
+    items = json.loads(clean_json_string)
+    results = [None] * len(contents)
+    for item in items:
+        index = item.pop('index', None)
+        if isinstance(index, int) and 0 <= index < len(contents):
+            results[index] = [item]
+    return results
+
+@app.route('/api/analyze-documents-bulk', methods=['POST'])
+@login_required
+def analyze_documents_bulk():
+    # Ditolak sebelum body multipart diurai; stream file dibaca terbatas di expand_uploads
+    if request.content_length is not None and request.content_length > MAX_BULK_REQUEST_BYTES:
+        return jsonify({'error': f'Ukuran unggahan melebihi batas {MAX_BULK_REQUEST_BYTES // (1024 * 1024)} MB.'}), 413
+    uploads = [(secure_filename(f.filename), f.stream) for f in request.files.getlist('documents') if f.filename]
+    if not uploads:
+        return jsonify({'error': 'Tidak ada file yang diunggah.'}), 400
+    documents = expand_uploads(uploads)
+
+    def generate():
+        pending = []
+
+        def flush():
+            contents = [content for _, _, content in pending]
+            try:
+                batch_references = extract_citation_metadata_batch(contents)
+            except Exception as e:
+                print(f"Error saat menganalisis batch dokumen: {e}")
+                batch_references = [None] * len(pending)
+            for (name, digest, content), references in zip(pending, batch_references):
+                if references is None:
+                    # Jatuh kembali ke analisis per dokumen jika batch gagal
+                    try:
+                        references = extract_citation_metadata(content)
+                    except Exception as e:
+                        yield {'filename': name, 'status': 'error', 'error': f'Gagal menganalisis dokumen: {e}'}
+                        continue
+                document_cache.put_references(digest, content, references)
+                yield {'filename': name, 'status': 'success', 'references': references}
+            pending.clear()
+
+        futures = {}
+        pool = get_extraction_pool()
+        for name, data, error in documents:
+            if error:
+                yield {'filename': name, 'status': 'error', 'error': error}
+                continue
+            digest = fingerprint(data)
+            cached = document_cache.get(digest)
+            if cached and cached['references'] is not None:
+                yield {'filename': name, 'status': 'success', 'references': cached['references'], 'cached': True}
+            elif cached:
+                pending.append((name, digest, cached['text']))
+                if len(pending) >= BULK_METADATA_BATCH_SIZE:
+                    yield from flush()
+            else:
+                futures[pool.submit(extract_text, name, data, CITATION_TEXT_CHARS)] = (name, digest)
+
+        for future in as_completed(futures):
+            name, digest = futures[future]
+            try:
+                content = future.result()
+            except Exception as e:
+                yield {'filename': name, 'status': 'error', 'error': f'Gagal mengekstrak teks: {e}'}
+                continue
+            document_cache.put_text(digest, content)
+            if not content.strip():
+                yield {'filename': name, 'status': 'error', 'error': 'Tidak ada teks yang dapat diekstrak dari file ini.'}
+                continue
+            pending.append((name, digest, content))
+            if len(pending) >= BULK_METADATA_BATCH_SIZE:
+                yield from flush()
+        if pending:
+            yield from flush()
+        yield {'status': 'done', 'total': len(documents)}
+
+    def stream():
+        for item in generate():
+            yield json.dumps(item, ensure_ascii=False) + "\n"
+
+    return Response(stream_with_context(stream()), mimetype='application/x-ndjson')
+
 @app.route('/api/analyze-document', methods=['POST'])
 @login_required
 def analyze_document():
@@ -1121,31 +1395,25 @@ def analyze_document():
         return jsonify({'error': 'Nama file kosong.'}), 400
     try:
         filename = secure_filename(file.filename).lower()
-        content = ""
-        if filename.endswith('.pdf'):
-            content = read_pdf(file.stream)
-        elif filename.endswith('.docx'):
-            content = read_docx(file.stream)
-        else:
+        if not filename.endswith(('.pdf', '.docx')):
             return jsonify({'error': 'Format file tidak didukung. Harap unggah PDF atau DOCX.'}), 400
+
+        file_bytes = file.read()
+        digest = fingerprint(file_bytes)
+        cached = document_cache.get(digest)
+        if cached and cached['references'] is not None:
+            return jsonify({'references': cached['references'], 'cached': True})
+
+        if cached:
+            content = cached['text']
+        else:
+            content = extract_text(filename, file_bytes, max_chars=CITATION_TEXT_CHARS)
+            document_cache.put_text(digest, content)
         if not content.strip():
             return jsonify({'error': 'Tidak ada teks yang dapat diekstrak dari file ini.'}), 400
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        prompt = f"""
-        Dari teks dokumen akademis berikut, identifikasi informasi sitasi untuk dokumen itu sendiri.
-        Ekstrak penulis utama, judul utama, tahun publikasi, dan nama jurnal atau konferensi tempat dokumen itu diterbitkan.
-        Berikan hasilnya sebagai array JSON yang hanya berisi SATU objek dengan kunci: "title", "author", "year", dan "journal".
 
-        Teks Dokumen (ambil dari bagian awal untuk efisiensi):
-        ---
-        {content[:8000]} 
-        ---
-        """
-        response = model.generate_content(prompt)
-        clean_json_string = re.sub(r'```json\s*|\s*```', '', response.text.strip(), flags=re.DOTALL)
-        if not clean_json_string.strip().startswith('['):
-            clean_json_string = f"[{clean_json_string}]"
-        references = json.loads(clean_json_string)
+        references = extract_citation_metadata(content)
+        document_cache.put_references(digest, content, references)
         return jsonify({'references': references})
     except json.JSONDecodeError:
         return jsonify({'error': 'AI tidak dapat memformat informasi sitasi dengan benar. Coba lagi.'}), 500
@@ -1153,9 +1421,191 @@ def analyze_document():
         print(f"Error saat menganalisis dokumen: {e}")
         return jsonify({'error': f'Terjadi kesalahan internal: {str(e)}'}), 500
 
+@app.route('/api/datasets', methods=['POST'])
+@login_required
+def upload_dataset():
+    if 'file' not in request.files:
+        return jsonify({'error': 'File tidak ditemukan.'}), 400
+    file = request.files['file']
+    filename = secure_filename(file.filename)
+    if not is_supported(filename):
+        return jsonify({'error': 'Format file tidak didukung. Harap unggah CSV atau XLSX.'}), 400
+    try:
+        metadata = dataset_store.create(current_user.id, file.stream, filename,
+                                        sheet=request.form.get('sheet'), header_row=request.form.get('header_row'))
+        return jsonify(sanitize_nan(metadata)), 201
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error saat menyimpan dataset: {e}")
+        return jsonify({'error': f'Gagal memproses dataset: {str(e)}'}), 500
+
+@app.route('/api/datasets/preview', methods=['POST'])
+@login_required
+def preview_dataset():
+    """
+    Header, tipe kolom, dan beberapa baris pertama file (serta daftar sheet
+    untuk XLSX) tanpa membaca seluruh file, untuk mengisi pilihan variabel.
+    Form: file, sheet (opsional), header_row (opsional), rows.
+    """
+    if 'file' not in request.files:
+        return jsonify({'error': 'File tidak ditemukan.'}), 400
+    file = request.files['file']
+    filename = secure_filename(file.filename)
+    if not is_supported(filename):
+        return jsonify({'error': 'Format file tidak didukung. Harap unggah CSV atau XLSX.'}), 400
+    try:
+        preview = preview_table(file.stream, filename, sheet=request.form.get('sheet'),
+                                rows=int(request.form.get('rows', PREVIEW_ROWS_DEFAULT)),
+                                header_row=request.form.get('header_row'))
+        return jsonify(sanitize_nan(preview))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error saat membaca preview dataset: {e}")
+        return jsonify({'error': f'Gagal membaca file: {str(e)}'}), 500
+
+@app.route('/api/datasets/<dataset_id>', methods=['GET', 'DELETE'])
+@login_required
+def dataset_detail(dataset_id):
+    try:
+        if request.method == 'DELETE':
+            dataset_store.delete(current_user.id, dataset_id)
+            return jsonify({'status': 'success'})
+        return jsonify(sanitize_nan(dataset_store.metadata(current_user.id, dataset_id)))
+    except DatasetNotFound as e:
+        return jsonify({'error': str(e)}), 404
+
+# Ukuran halaman baris mentah dataset
+DATASET_ROWS_PAGE_DEFAULT = 500
+DATASET_ROWS_PAGE_MAX = 5000
+
+@app.route('/api/datasets/<dataset_id>/rows', methods=['GET'])
+@login_required
+def dataset_rows(dataset_id):
+    """Baris mentah dataset per halaman: ?offset=0&limit=500&columns=a,b"""
+    try:
+        offset = max(int(request.args.get('offset', 0)), 0)
+        limit = min(max(int(request.args.get('limit', DATASET_ROWS_PAGE_DEFAULT)), 1), DATASET_ROWS_PAGE_MAX)
+    except ValueError:
+        return jsonify({'error': "'offset' dan 'limit' harus berupa bilangan bulat."}), 400
+    columns = [c for c in request.args.get('columns', '').split(',') if c]
+    try:
+        page, total = dataset_store.read_rows(current_user.id, dataset_id, columns, offset, limit)
+    except DatasetNotFound as e:
+        return jsonify({'error': str(e)}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    next_offset = offset + len(page)
+    return jsonify({
+        'offset': offset,
+        'limit': limit,
+        'total': total,
+        'next_offset': next_offset if next_offset < total else None,
+        'rows': json.loads(page.to_json(orient='records'))
+    })
+
+def _numeric_column(df, column):
+    return pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+
+def load_analysis_request():
+    """
+    Membaca body endpoint analisis (JSON, MessagePack, atau Arrow IPC; lihat
+    app/binary_payload.py). Jika berisi 'dataset_id', data
+    diambil dari dataset tersimpan milik pengguna:
+      - 'column'                 -> 'values'
+      - 'column' + 'group_column'-> 'groups' (satu array per kategori) dan 'group_names'
+      - 'columns'                -> 'groups' dan 'pairs' (satu array per kolom)
+    Mengembalikan (data, None) atau (None, (respons_error, status)).
+    """
+    try:
+        data = read_request_data()
+    except PayloadError as e:
+        return None, (jsonify({'error': str(e)}), 400)
+    if data is None:
+        return None, (jsonify({'error': 'Format request tidak valid, harus JSON.'}), 400)
+    dataset_id = data.get('dataset_id')
+    if not dataset_id:
+        return data, None
+
+    column = data.get('column')
+    group_column = data.get('group_column')
+    columns = data.get('columns') or []
+    needed = list(dict.fromkeys(c for c in [column, group_column, *columns] if c))
+    if not needed:
+        return None, (jsonify({'error': 'Nama kolom dataset diperlukan.'}), 400)
+    try:
+        df = dataset_store.load_columns(current_user.id, dataset_id, needed)
+    except DatasetNotFound as e:
+        return None, (jsonify({'error': str(e)}), 404)
+    except ValueError as e:
+        return None, (jsonify({'error': str(e)}), 400)
+
+    resolved = dict(data)
+    if column:
+        values = _numeric_column(df, column)
+        resolved['values'] = values
+        if group_column:
+            codes, labels = pd.factorize(df[group_column], sort=True)
+            resolved['groups'] = [values[codes == i] for i in range(len(labels))]
+            resolved['group_names'] = [str(label) for label in labels]
+    if columns:
+        resolved['groups'] = resolved['pairs'] = [_numeric_column(df, c) for c in columns]
+        resolved['group_names'] = list(columns)
+    return resolved, None
+
+def _normality_response(result):
+    """Adapter JSON untuk hasil Shapiro-Wilk + Kolmogorov-Smirnov dari stats_engine.normality."""
+    n = result.stats.n
+    shapiro_p_rounded = round(result.shapiro_p, 3)
+    ks_p_rounded = round(result.ks_p, 3)
+    conclusion = "berdistribusi normal" if result.is_normal else "tidak berdistribusi normal"
+    summary = f"Hasil uji Shapiro-Wilk menunjukkan nilai signifikansi p = {shapiro_p_rounded}. Karena nilai p > 0.05, dapat disimpulkan bahwa data {conclusion}."
+    return {
+        "summary": summary,
+        "mode": "standard",
+        "mean": round(result.stats.mean, 3),
+        "std_dev": round(result.stats.std, 3),
+        "n": n,
+        "table": [
+            {"test": "Shapiro-Wilk", "statistic": result.shapiro_stat, "df": n, "p": shapiro_p_rounded},
+            {"test": "Kolmogorov-Smirnov", "statistic": result.ks_stat, "df": n, "p": ks_p_rounded}
+        ]
+    }
+
+def _large_normality_response(result, column=None):
+    """Adapter JSON untuk satu kolom hasil stats_engine.normality_columns."""
+    conclusion = "berdistribusi normal" if result['is_normal'] else "tidak berdistribusi normal"
+    subject = f"data '{column}'" if column is not None else "data"
+    summary = (
+        f"Dengan n = {result['n']}, uji D'Agostino-Pearson menunjukkan nilai signifikansi "
+        f"p = {round(result['tests'][0]['p'], 3)}, sehingga {subject} {conclusion}. Pada sampel besar, penyimpangan kecil pun "
+        f"dapat signifikan; perhatikan juga skewness ({result['skewness']:.3f}), kurtosis ({result['kurtosis']:.3f}), dan Q-Q plot."
+    )
+    return {
+        "summary": summary,
+        "mode": "large",
+        "mean": round(result['mean'], 3),
+        "std_dev": round(result['std'], 3),
+        "n": result['n'],
+        "skewness": result['skewness'],
+        "kurtosis": result['kurtosis'],
+        "table": [{**row, "p": round(row['p'], 3)} for row in result['tests']],
+        "qq": result['qq']
+    }
+
 @app.route('/api/normality', methods=['POST'])
 @login_required
+@negotiated_response
+@cached_response(result_cache, gate=_data_analysis_cache_gate)
 def api_normality():
+    """
+    Uji normalitas. 'values' untuk satu kolom atau 'groups' (+ 'group_names',
+    atau dataset_id + 'columns') untuk banyak kolom sekaligus. 'mode':
+    'auto' (default; n > 5000 memakai uji sampel besar), 'standard'
+    (Shapiro-Wilk + Kolmogorov-Smirnov), atau 'large' (D'Agostino-Pearson,
+    Anderson-Darling, Jarque-Bera, dengan Q-Q plot pada grid kuantil tetap).
+    """
     if not current_user.is_pro:
         is_allowed, message = check_and_update_pro_trial(current_user.id, 'data_analysis')
         if not is_allowed:
@@ -1163,53 +1613,75 @@ def api_normality():
                 return jsonify({'error': "Batas percobaan tercapai.", 'redirect': url_for('upgrade_page')}), 429
             return jsonify({'error': message}), 429
     try:
-        data = request.get_json()
-        values = data.get('values')
-        if not values or not isinstance(values, list):
-            return jsonify({'error': 'Data angka diperlukan dalam array'}), 400
-        
-        s = pd.Series(values, dtype=float).dropna()
-        
-        if len(s) < 3:
-            return jsonify({'error': 'Minimal 3 data untuk uji normalitas'}), 400
-        
-        n = len(s)
-        mean = s.mean()
-        sd = s.std(ddof=1)
+        data, error = load_analysis_request()
+        if error: return error
+        mode = data.get('mode', 'auto')
+        if mode not in ('auto', 'standard', 'large'):
+            return jsonify({'error': "'mode' harus 'auto', 'standard', atau 'large'."}), 400
 
-        shapiro_stat, shapiro_p = stats.shapiro(s)
-        ks_stat, ks_p = stats.kstest((s - mean) / sd, 'norm')
+        values = data.get('values')
+        groups = data.get('groups')
+        if values is None and isinstance(groups, list) and groups:
+            names = list(data.get('group_names') or [f'Kolom {i + 1}' for i in range(len(groups))])
+            names, matrix = stats_engine.column_matrix(dict(zip(names, groups)))
+            large = stats_engine.normality_columns(matrix)
+            results = []
+            for j, name in enumerate(names):
+                column = matrix[:, j]
+                n = int(np.count_nonzero(~np.isnan(column)))
+                if mode == 'standard' or (mode == 'auto' and n <= stats_engine.SHAPIRO_MAX_N):
+                    try:
+                        results.append({'column': name, **_normality_response(stats_engine.normality(column))})
+                    except ValueError as e:
+                        results.append({'column': name, 'error': str(e)})
+                elif large[j] is None:
+                    results.append({'column': name, 'error': 'Minimal 20 data bervariasi untuk uji normalitas sampel besar.'})
+                else:
+                    results.append({'column': name, **_large_normality_response(large[j], name)})
+            return jsonify(sanitize_nan({'results': results}))
 
-        shapiro_p_rounded = round(shapiro_p, 3)
-        ks_p_rounded = round(ks_p, 3)
+        if values is None or not isinstance(values, (list, np.ndarray)) or len(values) == 0:
+            return jsonify({'error': 'Data angka diperlukan dalam array'}), 400
 
-        if shapiro_p > 0.05:
-            conclusion = "berdistribusi normal"
-        else:
-            conclusion = "tidak berdistribusi normal"
-        
-        summary = f"Hasil uji Shapiro-Wilk menunjukkan nilai signifikansi p = {shapiro_p_rounded}. Karena nilai p > 0.05, dapat disimpulkan bahwa data {conclusion}."
+        column = stats_engine.to_float_column(values)
+        n = int(np.count_nonzero(~np.isnan(column)))
+        if mode == 'large' or (mode == 'auto' and n > stats_engine.SHAPIRO_MAX_N):
+            (result,) = stats_engine.normality_columns(column[:, None])
+            if result is None:
+                return jsonify({'error': 'Minimal 20 data bervariasi untuk uji normalitas sampel besar.'}), 400
+            return jsonify(sanitize_nan(_large_normality_response(result)))
 
-        df_table = pd.DataFrame({
-            "test": ["Shapiro-Wilk", "Kolmogorov-Smirnov"],
-            "statistic": [shapiro_stat, ks_stat],
-            "df": [n, n],
-            "p": [shapiro_p_rounded, ks_p_rounded]
-        })
-        table_json = df_table.to_dict(orient='records')
-
-        return jsonify({
-            "summary": summary, 
-            "mean": round(mean, 3), 
-            "std_dev": round(sd, 3), 
-            "n": n, 
-            "table": table_json
-        })
+        try:
+            result = stats_engine.normality(column)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify(_normality_response(result))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _homogeneity_response(result):
+    """Adapter JSON untuk hasil uji homogenitas dari stats_engine."""
+    p_string = f"{result.p:.3f}"
+    comparison = "> 0.05" if result.is_homogeneous else "<= 0.05"
+    conclusion = "homogen" if result.is_homogeneous else "tidak homogen"
+    test_label = "Levene’s Test" if result.test.startswith("Levene") else "Bartlett's Test"
+    summary = f"Hasil {test_label} menunjukkan nilai Sig. = {p_string} ({comparison}), sehingga dapat disimpulkan varians data antar kelompok adalah {conclusion}."
+    return {
+        "summary": summary,
+        "n_per_group": result.n_per_group,
+        "table": [{
+            "test": result.test,
+            "statistic": round(result.statistic, 4),
+            "df1": result.df1,
+            "df2": result.df2,
+            "p": round(result.p, 4)
+        }]
+    }
+
 @app.route('/api/levene', methods=['POST'])
 @login_required
+@negotiated_response
+@cached_response(result_cache, gate=_data_analysis_cache_gate)
 def api_levene():
     if not current_user.is_pro:
         is_allowed, message = check_and_update_pro_trial(current_user.id, 'data_analysis')
@@ -1218,39 +1690,17 @@ def api_levene():
                 return jsonify({'error': "Batas percobaan tercapai.", 'redirect': url_for('upgrade_page')}), 429
             return jsonify({'error': message}), 429
     try:
-        data = request.get_json()
+        data, error = load_analysis_request()
+        if error: return error
         groups = data.get('groups')
         if not groups or not isinstance(groups, list) or len(groups) < 2:
             return jsonify({'error': 'Minimal 2 grup data diperlukan'}), 400
 
-        cleaned_groups = [np.array(g, dtype=float)[~np.isnan(g)] for g in groups]
-        group_sizes = [len(g) for g in cleaned_groups]
-        if any(size < 2 for size in group_sizes):
-            return jsonify({'error': 'Setiap grup minimal punya 2 data'}), 400
-
-        stat, p_value = stats.levene(*cleaned_groups)
-        
-        p_string = f"{p_value:.3f}"
-        comparison = "> 0.05" if p_value > 0.05 else "<= 0.05"
-        conclusion = "homogen" if p_value > 0.05 else "tidak homogen"
-        summary = f"Hasil Levene’s Test menunjukkan nilai Sig. = {p_string} ({comparison}), sehingga dapat disimpulkan varians data antar kelompok adalah {conclusion}."
-
-        df_table = pd.DataFrame({
-            "test": ["Levene’s Test"],
-            "statistic": [stat],
-            "df1": [len(cleaned_groups) - 1],
-            "df2": [sum(group_sizes) - len(cleaned_groups)],
-            "p": [p_value]
-        })
-        df_table['statistic'] = df_table['statistic'].round(4)
-        df_table['p'] = df_table['p'].round(4)
-        table_json = df_table.to_dict(orient='records')
-
-        return jsonify({
-            "summary": summary,
-            "n_per_group": group_sizes,
-            "table": table_json
-        })
+        try:
+            result = stats_engine.levene(groups)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify(_homogeneity_response(result))
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1258,6 +1708,8 @@ def api_levene():
 
 @app.route('/api/bartlett', methods=['POST'])
 @login_required
+@negotiated_response
+@cached_response(result_cache, gate=_data_analysis_cache_gate)
 def api_bartlett():
     if not current_user.is_pro:
         is_allowed, message = check_and_update_pro_trial(current_user.id, 'data_analysis')
@@ -1266,44 +1718,81 @@ def api_bartlett():
                 return jsonify({'error': "Batas percobaan tercapai.", 'redirect': url_for('upgrade_page')}), 429
             return jsonify({'error': message}), 429
     try:
-        data = request.get_json()
+        data, error = load_analysis_request()
+        if error: return error
         groups = data.get('groups')
         if not groups or not isinstance(groups, list) or len(groups) < 2:
             return jsonify({'error': 'Minimal 2 grup data diperlukan'}), 400
 
-        cleaned_groups = [np.array(g, dtype=float)[~np.isnan(g)] for g in groups]
-        group_sizes = [len(g) for g in cleaned_groups]
-        if any(size < 2 for size in group_sizes):
-            return jsonify({'error': 'Setiap grup minimal punya 2 data'}), 400
-
-        stat, p_value = stats.bartlett(*cleaned_groups)
-
-        p_string = f"{p_value:.3f}"
-        comparison = "> 0.05" if p_value > 0.05 else "<= 0.05"
-        conclusion = "homogen" if p_value > 0.05 else "tidak homogen"
-        summary = f"Hasil Bartlett's Test menunjukkan nilai Sig. = {p_string} ({comparison}), sehingga dapat disimpulkan varians data antar kelompok adalah {conclusion}."
-
-        df_table = pd.DataFrame({
-            "test": ["Bartlett’s Test"],
-            "statistic": [stat],
-            "df1": [len(cleaned_groups) - 1],
-            "df2": [None],
-            "p": [p_value]
-        })
-        df_table['statistic'] = df_table['statistic'].round(4)
-        df_table['p'] = df_table['p'].round(4)
-        table_json = df_table.to_dict(orient='records')
-
-        return jsonify({
-            "summary": summary,
-            "n_per_group": group_sizes,
-            "table": table_json
-        })
+        try:
+            result = stats_engine.bartlett(groups)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify(_homogeneity_response(result))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
         
+# Key JSON yang merupakan opsi, bukan kolom data, pada /api/descriptive-analysis
+DESCRIPTIVE_OPTION_KEYS = {'dataset_id', 'columns', 'mode', 'quantiles'}
+# Dataset di atas jumlah baris ini diringkas per potongan (momen streaming)
+DESCRIPTIVE_STREAMING_ROWS = int(os.getenv('DESCRIPTIVE_STREAMING_ROWS', '500000'))
+
+def _streaming_descriptives(dataset_id, columns):
+    """
+    Statistik deskriptif satu lintasan atas dataset tersimpan, dibaca per
+    potongan baris. Median, modus, dan kuantil membutuhkan seluruh data
+    sehingga tidak tersedia dalam mode ini.
+    """
+    moments = stats_engine.OnlineMoments(len(columns))
+    for chunk in dataset_store.iter_column_chunks(current_user.id, dataset_id, columns):
+        moments.update(chunk)
+    results = {}
+    for col, column_stats in zip(columns, moments.results()):
+        if column_stats['n'] < 2: continue
+        results[col] = {**column_stats, 'median': None, 'mode': ['N/A']}
+    return sanitize_nan({'columns': columns, 'results': results, 'chart_data': {}, 'mode': 'streaming'})
+
+def _has_values(data):
+    """True jika ada minimal satu nilai tidak kosong (list/ndarray dicek panjangnya)."""
+    return any(np.size(v) if isinstance(v, (list, np.ndarray)) else v for v in data.values())
+
+def _column_input(data, option_keys, columns=None):
+    """
+    Menyusun matriks kolom untuk endpoint analisis kolom (deskriptif,
+    korelasi, regresi), dari dataset tersimpan ('dataset_id' + nama kolom)
+    atau dari body {nama_kolom: [nilai]} (key di option_keys diabaikan).
+    columns: nama kolom yang dipakai; default 'columns' di body (dataset)
+    atau semua kolom data di body.
+    Mengembalikan (nama_kolom, matriks, None) atau (None, None, (respons_error, status)).
+    """
+    columns = columns or data.get('columns') or []
+    if data.get('dataset_id'):
+        if not columns:
+            return None, None, (jsonify({'error': 'Nama kolom dataset diperlukan.'}), 400)
+        try:
+            df = dataset_store.load_columns(current_user.id, data['dataset_id'], columns)
+        except DatasetNotFound as e:
+            return None, None, (jsonify({'error': str(e)}), 404)
+        except ValueError as e:
+            return None, None, (jsonify({'error': str(e)}), 400)
+        all_cols, matrix = stats_engine.column_matrix({col: df[col] for col in columns})
+    else:
+        if columns:
+            missing = [col for col in columns if col not in data]
+            if missing:
+                return None, None, (jsonify({'error': f"Kolom berikut tidak ditemukan: {', '.join(missing)}."}), 400)
+            body_columns = {col: data[col] for col in columns}
+        else:
+            body_columns = {col: values for col, values in data.items() if col not in option_keys}
+        all_cols, matrix = stats_engine.column_matrix(body_columns)
+    if matrix.size == 0:
+        return None, None, (jsonify({'error': 'Data kosong setelah diproses.'}), 400)
+    return all_cols, matrix, None
+
 @app.route('/api/descriptive-analysis', methods=['POST'])
 @login_required
+@negotiated_response
+@cached_response(result_cache, gate=_data_analysis_cache_gate)
 def api_descriptive_analysis():
     if not current_user.is_pro:
         is_allowed, message = check_and_update_pro_trial(current_user.id, 'data_analysis')
@@ -1313,71 +1802,53 @@ def api_descriptive_analysis():
             return jsonify({'error': message}), 429
 
     try:
-        if not request.is_json:
+        try:
+            data = read_request_data()
+        except PayloadError as e:
+            return jsonify({'error': str(e)}), 400
+        if data is None:
             return jsonify({'error': 'Format request tidak valid, harus JSON.'}), 400
-
-        data = request.get_json()
-        if not data or not any(data.values()):
+        if not _has_values(data):
              return jsonify({'error': 'Tidak ada data yang dikirim untuk dianalisis.'}), 400
-        
-        df = pd.DataFrame.from_dict(data, orient='index').transpose()
-        
-        for col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-
-        if df.empty:
-            return jsonify({'error': 'Data kosong setelah diproses.'}), 400
 
-        all_cols = df.columns.tolist()
-        results = {}
-        plots = {}
-        
-        for col in all_cols:
-            series = df[col].dropna()
-            if len(series) < 2: continue
-
-            results[col] = {
-                'n': int(len(series)),
-                'mean': float(series.mean()),
-                'median': float(series.median()),
-                'mode': series.mode().tolist() if not series.mode().empty else ['N/A'],
-                'std': float(series.std()),
-                'variance': float(series.var()),
-                'range': float(series.max() - series.min()),
-                'min': float(series.min()),
-                'max': float(series.max()),
-            }
+        quantiles = data.get('quantiles')
+        if quantiles is not None and np.size(quantiles) == 0:
+            quantiles = None
+        if quantiles is not None:
+            try:
+                quantiles = [float(q) for q in quantiles]
+            except (TypeError, ValueError):
+                return jsonify({'error': "'quantiles' harus berupa daftar angka antara 0 dan 1."}), 400
+            if not all(0 <= q <= 1 for q in quantiles):
+                return jsonify({'error': "'quantiles' harus berupa daftar angka antara 0 dan 1."}), 400
 
-            sns.set_style("whitegrid")
-            
-            fig_hist, ax_hist = plt.subplots()
-            sns.histplot(series, kde=True, ax=ax_hist, color='#0284c7')
-            ax_hist.set_title(f'Histogram - {col}')
-            plots[f'{col}_histogram'] = create_plot_as_base64(fig_hist)
+        if data.get('dataset_id') and data.get('columns'):
+            try:
+                metadata = dataset_store.metadata(current_user.id, data['dataset_id'])
+                if data.get('mode') == 'streaming' or metadata['n_rows'] > DESCRIPTIVE_STREAMING_ROWS:
+                    return jsonify(_streaming_descriptives(data['dataset_id'], data['columns']))
+            except DatasetNotFound as e:
+                return jsonify({'error': str(e)}), 404
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
 
-            fig_box, ax_box = plt.subplots()
-            sns.boxplot(x=series, ax=ax_box, color='#0284c7')
-            ax_box.set_title(f'Box Plot - {col}')
-            plots[f'{col}_boxplot'] = create_plot_as_base64(fig_box)
+        all_cols, matrix, error = _column_input(data, DESCRIPTIVE_OPTION_KEYS)
+        if error: return error
 
-            try:
-                if series.nunique() > 1 and series.nunique() <= 10:
-                    pie_data = series.value_counts()
-                    fig_pie, ax_pie = plt.subplots()
-                    ax_pie.pie(pie_data, labels=pie_data.index.astype(str), autopct='%1.1f%%', startangle=90)
-                    ax_pie.axis('equal')
-                    ax_pie.set_title(f'Distribusi Proporsi - {col}')
-                    plots[f'{col}_piechart'] = create_plot_as_base64(fig_pie)
-                else:
-                    plots[f'{col}_piechart'] = None
-            except Exception as pie_e:
-                print(f"Tidak dapat membuat pie chart untuk {col}: {pie_e}")
-                plots[f'{col}_piechart'] = None
-        return jsonify({
+        results = {}
+        chart_data = {}
+        column_results = stats_engine.describe_columns(matrix, quantiles)
+        for j, (col, column_stats) in enumerate(zip(all_cols, column_results)):
+            if column_stats['n'] < 2: continue
+            if not column_stats['mode']:
+                column_stats['mode'] = ['N/A']
+            results[col] = column_stats
+            chart_data[col] = stats_engine.chart_data(matrix[:, j])
+        return jsonify(sanitize_nan({
             'columns': all_cols,
             'results': results,
-            'plots': plots
-        })
+            'chart_data': chart_data
+        }))
 
     except Exception as e:
         print(f"Error in descriptive_analysis API: {e}")
@@ -1385,6 +1856,218 @@ def api_descriptive_analysis():
         traceback.print_exc()
         return jsonify({'error': f'Terjadi kesalahan internal: {str(e)}'}), 500
 
+@app.route('/api/descriptive-plots', methods=['POST'])
+@login_required
+@negotiated_response
+def api_descriptive_plots():
+    """
+    Gambar server (histogram, box plot, pie chart) untuk kolom deskriptif
+    dalam format 'png' (default), 'webp', atau 'svg'.
+    Opsional: halaman merender grafik dari 'chart_data'; endpoint ini hanya
+    dipanggil bila gambar server memang dibutuhkan. Menerima input yang sama
+    dengan /api/descriptive-analysis.
+    """
+    if not current_user.is_pro:
+        is_allowed, message = check_and_update_pro_trial(current_user.id, 'data_analysis')
+        if not is_allowed:
+            if message == "UPGRADE_REQUIRED":
+                return jsonify({'error': "Batas percobaan tercapai.", 'redirect': url_for('upgrade_page')}), 429
+            return jsonify({'error': message}), 429
+
+    try:
+        try:
+            data = read_request_data()
+        except PayloadError as e:
+            return jsonify({'error': str(e)}), 400
+        if data is None or not _has_values(data):
+            return jsonify({'error': 'Tidak ada data yang dikirim untuk dianalisis.'}), 400
+        all_cols, matrix, error = _column_input(data, DESCRIPTIVE_OPTION_KEYS)
+        if error: return error
+
+        fmt = data.get('format', 'png')
+        if fmt not in PLOT_FORMATS:
+            return jsonify({'error': f"Format gambar tidak didukung. Pilihan: {', '.join(PLOT_FORMATS)}."}), 400
+        optimize = bool(data.get('optimize', False))
+
+        plot_keys, plot_requests = [], []
+        for j, col in enumerate(all_cols):
+            values = matrix[:, j]
+            values = values[~np.isnan(values)]
+            if values.size < 2: continue
+            plot_keys += [f'{col}_histogram', f'{col}_boxplot', f'{col}_piechart']
+            plot_requests += [
+                PlotRequest('histogram', values, f'Histogram - {col}', fmt, optimize),
+                PlotRequest('boxplot', values, f'Box Plot - {col}', fmt, optimize),
+                PlotRequest('pie', values, f'Distribusi Proporsi - {col}', fmt, optimize),
+            ]
+        plots = dict(zip(plot_keys, render_plots(plot_requests)))
+        return jsonify({'plots': plots})
+    except Exception as e:
+        print(f"Error in descriptive_plots API: {e}")
+        return jsonify({'error': f'Terjadi kesalahan internal: {str(e)}'}), 500
+
+
+# Key JSON yang merupakan opsi pada /api/correlation dan /api/regression
+CORRELATION_OPTION_KEYS = {'dataset_id', 'columns', 'method', 'missing'}
+REGRESSION_OPTION_KEYS = {'dataset_id', 'dependent', 'independents', 'confidence_level'}
+MAX_MATRIX_COLUMNS = int(os.getenv('MAX_MATRIX_COLUMNS', '500'))
+
+@app.route('/api/correlation', methods=['POST'])
+@login_required
+@negotiated_response
+@cached_response(result_cache, gate=_data_analysis_cache_gate)
+def api_correlation():
+    """
+    Matriks korelasi Pearson atau Spearman ('method') beserta p-value dan n
+    untuk semua pasangan kolom. Data dari dataset tersimpan ('dataset_id' +
+    'columns') atau body {nama_kolom: [nilai]}. 'missing': 'pairwise'
+    (default) atau 'listwise'.
+    """
+    if not current_user.is_pro:
+        is_allowed, message = check_and_update_pro_trial(current_user.id, 'data_analysis')
+        if not is_allowed:
+            if message == "UPGRADE_REQUIRED":
+                return jsonify({'error': "Batas percobaan tercapai.", 'redirect': url_for('upgrade_page')}), 429
+            return jsonify({'error': message}), 429
+    try:
+        try:
+            data = read_request_data()
+        except PayloadError as e:
+            return jsonify({'error': str(e)}), 400
+        if data is None:
+            return jsonify({'error': 'Format request tidak valid, harus JSON.'}), 400
+        method = data.get('method', 'pearson')
+        missing = data.get('missing', 'pairwise')
+        if method not in stats_engine.CORRELATION_METHODS:
+            return jsonify({'error': f"Metode korelasi tidak dikenal. Pilihan: {', '.join(stats_engine.CORRELATION_METHODS)}."}), 400
+        if missing not in ('pairwise', 'listwise'):
+            return jsonify({'error': "'missing' harus 'pairwise' atau 'listwise'."}), 400
+
+        all_cols, matrix, error = _column_input(data, CORRELATION_OPTION_KEYS)
+        if error: return error
+        if not 2 <= len(all_cols) <= MAX_MATRIX_COLUMNS:
+            return jsonify({'error': f'Jumlah kolom harus antara 2 dan {MAX_MATRIX_COLUMNS}.'}), 400
+
+        result = stats_engine.correlation_matrix(matrix, method, missing)
+        return jsonify(sanitize_nan({
+            'columns': all_cols,
+            'method': result['method'],
+            'missing': result['missing'],
+            'r': result['r'].tolist(),
+            'p': result['p'].tolist(),
+            'n': result['n'].tolist()
+        }))
+    except Exception as e:
+        print(f"Error di api_correlation: {e}")
+        return jsonify({'error': 'Terjadi kesalahan saat memproses data. Pastikan format data benar.'}), 500
+
+@app.route('/api/regression', methods=['POST'])
+@login_required
+@negotiated_response
+@cached_response(result_cache, gate=_data_analysis_cache_gate)
+def api_regression():
+    """
+    Regresi linear berganda (OLS) 'dependent' terhadap 'independents' dengan
+    diagnostik (VIF, Durbin-Watson, Jarque-Bera, Breusch-Pagan). Data dari
+    dataset tersimpan ('dataset_id') atau body {nama_kolom: [nilai]}.
+    """
+    if not current_user.is_pro:
+        is_allowed, message = check_and_update_pro_trial(current_user.id, 'data_analysis')
+        if not is_allowed:
+            if message == "UPGRADE_REQUIRED":
+                return jsonify({'error': "Batas percobaan tercapai.", 'redirect': url_for('upgrade_page')}), 429
+            return jsonify({'error': message}), 429
+    try:
+        try:
+            data = read_request_data()
+        except PayloadError as e:
+            return jsonify({'error': str(e)}), 400
+        if data is None:
+            return jsonify({'error': 'Format request tidak valid, harus JSON.'}), 400
+        dependent = data.get('dependent')
+        independents = list(dict.fromkeys(data.get('independents') or []))
+        if not dependent or not independents:
+            return jsonify({'error': 'Variabel dependen dan minimal satu variabel independen diperlukan.'}), 400
+        if dependent in independents:
+            return jsonify({'error': 'Variabel dependen tidak boleh juga menjadi variabel independen.'}), 400
+        if len(independents) >= MAX_MATRIX_COLUMNS:
+            return jsonify({'error': f'Jumlah variabel independen maksimal {MAX_MATRIX_COLUMNS - 1}.'}), 400
+
+        all_cols, matrix, error = _column_input(data, REGRESSION_OPTION_KEYS, [dependent, *independents])
+        if error: return error
+        try:
+            confidence_level = float(data.get('confidence_level', 95)) / 100.0
+            result = stats_engine.ols_regression(matrix[:, 0], matrix[:, 1:], independents, confidence_level)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        model = result['model']
+        conclusion = "berpengaruh signifikan" if model['p'] < 0.05 else "tidak berpengaruh signifikan"
+        result['summary'] = (
+            f"Hasil uji F (F = {model['F']:.3f}, p = {model['p']:.3f}) menunjukkan bahwa variabel independen secara simultan "
+            f"{conclusion} terhadap {dependent}, dengan R² = {model['r2']:.3f}."
+        )
+        result['dependent'] = dependent
+        return jsonify(sanitize_nan(result))
+    except Exception as e:
+        print(f"Error di api_regression: {e}")
+        return jsonify({'error': 'Terjadi kesalahan saat memproses data. Pastikan format data benar.'}), 500
+
+
+@app.route('/api/batch-analysis', methods=['POST'])
+@login_required
+def api_batch_analysis():
+    if not current_user.is_pro:
+        is_allowed, message = check_and_update_pro_trial(current_user.id, 'data_analysis')
+        if not is_allowed:
+            if message == "UPGRADE_REQUIRED":
+                return jsonify({'error': "Batas percobaan tercapai.", 'redirect': url_for('upgrade_page')}), 429
+            return jsonify({'error': message}), 429
+
+    data = request.get_json(silent=True) or {}
+    specs = data.get('specs')
+    if not specs or not isinstance(specs, list):
+        return jsonify({'error': 'Daftar spesifikasi uji (specs) diperlukan.'}), 400
+    if len(specs) > MAX_BATCH_SPECS:
+        return jsonify({'error': f'Maksimal {MAX_BATCH_SPECS} spesifikasi uji per batch.'}), 400
+
+    dataset_id = data.get('dataset_id')
+    if dataset_id:
+        def load_columns(columns):
+            return dataset_store.load_columns(current_user.id, dataset_id, columns)
+        def available_columns():
+            return [c['name'] for c in dataset_store.metadata(current_user.id, dataset_id)['columns']]
+    elif isinstance(data.get('data'), dict) and data['data']:
+        # Dibangun per kolom: panjang berbeda diisi NaN dan dtype diinferensi per kolom
+        inline_df = pd.DataFrame({name: pd.Series(values) for name, values in data['data'].items()})
+        def load_columns(columns):
+            return inline_df[columns]
+        def available_columns():
+            return inline_df.columns
+    else:
+        return jsonify({'error': 'dataset_id atau data diperlukan.'}), 400
+
+    try:
+        tasks, errors = plan_batch(specs, load_columns, available_columns())
+    except DatasetNotFound as e:
+        return jsonify({'error': str(e)}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if data.get('stream'):
+        def stream():
+            for item in errors:
+                yield json.dumps(item, ensure_ascii=False) + "\n"
+            for item in run_batch(tasks):
+                yield json.dumps(sanitize_nan(item), ensure_ascii=False) + "\n"
+        return Response(stream_with_context(stream()), mimetype='application/x-ndjson')
+
+    try:
+        results = errors + list(run_batch(tasks))
+        return jsonify(sanitize_nan({'results': results}))
+    except Exception as e:
+        print(f"Error di api_batch_analysis: {e}")
+        return jsonify({'error': f'Terjadi kesalahan internal: {str(e)}'}), 500
 
 @app.route('/api/get-usage-status')
 @login_required
@@ -1395,7 +2078,10 @@ def get_usage_status():
     user_ref = db.collection('users').document(current_user.id)
     user_doc = user_ref.get()
     if not user_doc.exists: return jsonify({'error': 'User not found'}), 404
-    usage_data = user_doc.to_dict().get('usage_limits', {})
+    user_data = user_doc.to_dict()
+    if _refresh_if_pro(current_user.id, user_data):
+        return jsonify({'status': 'pro', 'message': 'Akses Penuh Tanpa Batas'})
+    usage_data = user_data.get('usage_limits', {})
     today_str = date.today().isoformat()
     if usage_data.get('last_reset_date') != today_str:
         usage_data['paraphrase_count'] = 0
@@ -1439,6 +2125,7 @@ def submit_feedback():
 @login_required
 def create_transaction():
     try:
+        midtrans_snap = get_midtrans_snap()
         if not midtrans_snap:
             return jsonify({'status': 'error', 'message': 'Layanan pembayaran tidak terkonfigurasi.'}), 503
         data = request.get_json()
@@ -1482,6 +2169,7 @@ def payment_notification():
                         'proExpiryDate': expiry_date,
                         'lastSubscriptionPlan': plan
                     })
+                    invalidate_user(user_id)
                     print(f"Sukses: Pengguna {user_id} telah upgrade ke paket {plan}.")
         return jsonify({'status': 'ok'}), 200
     except Exception as e:
@@ -1491,6 +2179,8 @@ def payment_notification():
 # --- API UNTUK UJI T ---
 @app.route('/api/independent-ttest', methods=['POST'])
 @login_required
+@negotiated_response
+@cached_response(result_cache, gate=_data_analysis_cache_gate)
 def api_independent_ttest():
     if not current_user.is_pro:
         is_allowed, message = check_and_update_pro_trial(current_user.id, 'data_analysis')
@@ -1500,56 +2190,37 @@ def api_independent_ttest():
             return jsonify({'error': message}), 429
     
     try:
-        data = request.get_json()
+        data, error = load_analysis_request()
+        if error: return error
         groups = data.get('groups')
         confidence_level = float(data.get('confidence_level', 95)) / 100.0
 
         if not groups or len(groups) != 2:
             return jsonify({'error': 'Dibutuhkan tepat dua grup data.'}), 400
 
-        group1 = np.array(groups[0], dtype=float)
-        group2 = np.array(groups[1], dtype=float)
-
-        if len(group1) < 3 or len(group2) < 3:
-            return jsonify({'error': 'Setiap grup harus memiliki minimal 3 data poin.'}), 400
-
-        stats1 = {'N': len(group1), 'mean': np.mean(group1), 'std': np.std(group1, ddof=1)}
-        stats2 = {'N': len(group2), 'mean': np.mean(group2), 'std': np.std(group2, ddof=1)}
-        
-        levene_stat, levene_p = stats.levene(group1, group2)
-
-        t_stat_equal, p_equal = stats.ttest_ind(group1, group2, equal_var=True)
-        t_stat_unequal, p_unequal = stats.ttest_ind(group1, group2, equal_var=False)
-        
-        df_equal = len(group1) + len(group2) - 2
-        v1 = np.var(group1, ddof=1)
-        v2 = np.var(group2, ddof=1)
-        n1 = len(group1)
-        n2 = len(group2)
-        df_unequal = (v1/n1 + v2/n2)**2 / ( (v1/n1)**2/(n1-1) + (v2/n2)**2/(n2-1) )
-
-        mean_diff = np.mean(group1) - np.mean(group2)
-        
-        se_diff_equal = np.sqrt( ( (n1-1)*v1 + (n2-1)*v2 ) / df_equal * (1/n1 + 1/n2) )
-        ci_equal = stats.t.interval(confidence_level, df_equal, loc=mean_diff, scale=se_diff_equal)
+        try:
+            result = stats_engine.independent_ttest(groups[0], groups[1], confidence_level)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
 
-        se_diff_unequal = np.sqrt(v1/n1 + v2/n2)
-        ci_unequal = stats.t.interval(confidence_level, df_unequal, loc=mean_diff, scale=se_diff_unequal)
-        
-        p_to_check = levene_p > 0.05 and p_equal or p_unequal
+        p_to_check = result.selected.p
         conclusion = "terdapat perbedaan rata-rata yang signifikan" if p_to_check < 0.05 else "tidak terdapat perbedaan rata-rata yang signifikan"
         summary = f"Berdasarkan hasil uji T (p = {p_to_check:.3f}), dapat disimpulkan bahwa {conclusion} antara kedua kelompok."
 
+        def ttest_row(row):
+            return {'t': row.t, 'df': row.df, 'p': row.p, 'mean_diff': row.mean_diff, 'ci_lower': row.ci[0], 'ci_upper': row.ci[1]}
+
+        group_stats = []
+        for label, s, ci in (('Grup 1', result.group1, result.group_cis[0]), ('Grup 2', result.group2, result.group_cis[1])):
+            group_stats.append({'group': label, 'N': s.n, 'mean': s.mean, 'std': s.std, 'ci_lower': ci[0], 'ci_upper': ci[1]})
+
         result = {
             'summary': summary,
-            'group_stats': [
-                {'group': 'Grup 1', **stats1, 'ci_lower': stats.t.interval(confidence_level, len(group1)-1, loc=np.mean(group1), scale=stats.sem(group1))[0], 'ci_upper': stats.t.interval(confidence_level, len(group1)-1, loc=np.mean(group1), scale=stats.sem(group1))[1]},
-                {'group': 'Grup 2', **stats2, 'ci_lower': stats.t.interval(confidence_level, len(group2)-1, loc=np.mean(group2), scale=stats.sem(group2))[0], 'ci_upper': stats.t.interval(confidence_level, len(group2)-1, loc=np.mean(group2), scale=stats.sem(group2))[1]}
-            ],
+            'group_stats': group_stats,
             'independent_test': {
-                'levene': {'F': levene_stat, 'p': levene_p},
-                'ttest_equal_variances': {'t': t_stat_equal, 'df': df_equal, 'p': p_equal, 'mean_diff': mean_diff, 'ci_lower': ci_equal[0], 'ci_upper': ci_equal[1]},
-                'ttest_unequal_variances': {'t': t_stat_unequal, 'df': df_unequal, 'p': p_unequal, 'mean_diff': mean_diff, 'ci_lower': ci_unequal[0], 'ci_upper': ci_unequal[1]}
+                'levene': {'F': result.levene_stat, 'p': result.levene_p},
+                'ttest_equal_variances': ttest_row(result.equal_var),
+                'ttest_unequal_variances': ttest_row(result.unequal_var)
             }
         }
         return jsonify(sanitize_nan(result))
@@ -1560,6 +2231,8 @@ def api_independent_ttest():
 
 @app.route('/api/paired-ttest', methods=['POST'])
 @login_required
+@negotiated_response
+@cached_response(result_cache, gate=_data_analysis_cache_gate)
 def api_paired_ttest():
     if not current_user.is_pro:
         is_allowed, message = check_and_update_pro_trial(current_user.id, 'data_analysis')
@@ -1568,59 +2241,43 @@ def api_paired_ttest():
                 return jsonify({'error': "Batas percobaan tercapai.", 'redirect': url_for('upgrade_page')}), 429
             return jsonify({'error': message}), 429
     try:
-        data = request.get_json()
+        data, error = load_analysis_request()
+        if error: return error
         pairs = data.get('pairs')
         confidence_level = float(data.get('confidence_level', 95)) / 100.0
 
         if not pairs or len(pairs) != 2:
             return jsonify({'error': 'Dibutuhkan tepat dua set data berpasangan.'}), 400
 
-        pair1 = np.array(pairs[0], dtype=float)
-        pair2 = np.array(pairs[1], dtype=float)
-
-        if len(pair1) != len(pair2) or len(pair1) < 3:
-            return jsonify({'error': 'Kedua set data harus memiliki jumlah yang sama dan minimal 3 data poin.'}), 400
-
-        stats1 = {'N': len(pair1), 'mean': np.mean(pair1), 'std': np.std(pair1, ddof=1)}
-        stats2 = {'N': len(pair2), 'mean': np.mean(pair2), 'std': np.std(pair2, ddof=1)}
-        
-        corr_r, corr_p = stats.pearsonr(pair1, pair2)
-
-        t_stat, p_value = stats.ttest_rel(pair1, pair2)
-        
-        diff = pair1 - pair2
-        mean_diff = np.mean(diff)
-        std_diff = np.std(diff, ddof=1)
-        df = len(pair1) - 1
-        
-        if std_diff > 0:
-            ci = stats.t.interval(confidence_level, df, loc=mean_diff, scale=stats.sem(diff))
-        else:
-            ci = (mean_diff, mean_diff)
+        try:
+            result = stats_engine.paired_ttest(pairs[0], pairs[1], confidence_level)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
 
-        conclusion = "terdapat perbedaan rata-rata yang signifikan" if p_value < 0.05 else "tidak terdapat perbedaan rata-rata yang signifikan"
-        summary = f"Berdasarkan hasil uji T berpasangan (p = {p_value:.3f}), dapat disimpulkan bahwa {conclusion} antara kedua pengukuran."
+        test = result.test
+        conclusion = "terdapat perbedaan rata-rata yang signifikan" if test.p < 0.05 else "tidak terdapat perbedaan rata-rata yang signifikan"
+        summary = f"Berdasarkan hasil uji T berpasangan (p = {test.p:.3f}), dapat disimpulkan bahwa {conclusion} antara kedua pengukuran."
 
         result = {
             'summary': summary,
             'paired_stats': [
-                {'variable': 'Variabel 1', **stats1},
-                {'variable': 'Variabel 2', **stats2}
+                {'variable': 'Variabel 1', 'N': result.stats1.n, 'mean': result.stats1.mean, 'std': result.stats1.std},
+                {'variable': 'Variabel 2', 'N': result.stats2.n, 'mean': result.stats2.mean, 'std': result.stats2.std}
             ],
             'paired_correlation': {
                 'pair': 'Variabel 1 & Variabel 2',
-                'r': corr_r,
-                'p': corr_p
+                'r': result.r,
+                'p': result.r_p
             },
             'paired_test': {
                 'pair': 'Variabel 1 - Variabel 2',
-                'mean_diff': mean_diff,
-                'std_diff': std_diff,
-                't': t_stat,
-                'df': df,
-                'p': p_value,
-                'ci_lower': ci[0],
-                'ci_upper': ci[1]
+                'mean_diff': test.mean_diff,
+                'std_diff': result.diff.std,
+                't': test.t,
+                'df': test.df,
+                'p': test.p,
+                'ci_lower': test.ci[0],
+                'ci_upper': test.ci[1]
             }
         }
         return jsonify(sanitize_nan(result))
@@ -1629,43 +2286,122 @@ def api_paired_ttest():
         return jsonify({'error': 'Terjadi kesalahan saat memproses data. Pastikan format data benar.'}), 500
 
 
+@app.route('/api/resampling', methods=['POST'])
+@login_required
+@negotiated_response
+def api_resampling():
+    """
+    Bootstrap CI dan p-value permutasi. 'test': 'independent' (2 grup),
+    'paired' (2 kolom berpasangan), atau 'anova' (>= 2 grup); opsional
+    'iterations' (default 10000), 'seed', dan 'confidence_level'.
+    """
+    if not current_user.is_pro:
+        is_allowed, message = check_and_update_pro_trial(current_user.id, 'data_analysis')
+        if not is_allowed:
+            if message == "UPGRADE_REQUIRED":
+                return jsonify({'error': "Batas percobaan tercapai.", 'redirect': url_for('upgrade_page')}), 429
+            return jsonify({'error': message}), 429
+
+    try:
+        data, error = load_analysis_request()
+        if error: return error
+        test = data.get('test')
+        if test not in RESAMPLING_TESTS:
+            return jsonify({'error': f"Jenis uji tidak dikenal. Pilihan: {', '.join(RESAMPLING_TESTS)}."}), 400
+        arrays = data.get('pairs') if test == 'paired' else data.get('groups')
+        if not arrays or (test != 'anova' and len(arrays) != 2) or len(arrays) < 2:
+            return jsonify({'error': 'Uji T membutuhkan tepat dua grup data; ANOVA minimal dua grup.'}), 400
+
+        try:
+            iterations = int(data.get('iterations', DEFAULT_ITERATIONS))
+            seed = data.get('seed')
+            seed = int(seed) if seed is not None else None
+            confidence_level = float(data.get('confidence_level', 95)) / 100.0
+            result = resample(test, arrays, iterations, seed, confidence_level)
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': str(e)}), 400
+
+        if data.get('group_names'):
+            result['group_names'] = data['group_names']
+        return jsonify(sanitize_nan(result))
+    except Exception as e:
+        print(f"Error di api_resampling: {e}")
+        return jsonify({'error': 'Terjadi kesalahan saat memproses data. Pastikan format data benar.'}), 500
+
+
 # ========================================================================
 # FUNGSI-FUNGSI ANALISIS ANOVA (DIPERBARUI DENGAN HIGHLIGHTS & PLOT DATA)
 # ========================================================================
 
-def _perform_oneway_anova_analysis(df, dependent_var, independent_var):
-    """Fungsi helper khusus untuk One-Way ANOVA."""
-    df_cleaned = df[[dependent_var, independent_var]].copy()
-    df_cleaned[dependent_var] = pd.to_numeric(df_cleaned[dependent_var], errors='coerce')
-    df_cleaned.dropna(inplace=True)
+# Kebijakan payload grafik ANOVA: ringkasan box plot untuk semua data, ditambah
+# sampel acak bertingkat berukuran terbatas per grup. Baris lengkap tersedia
+# lewat /api/datasets/<id>/rows.
+ANOVA_SAMPLE_PER_GROUP = int(os.getenv('ANOVA_SAMPLE_PER_GROUP', '300'))
+MAX_ANOVA_SAMPLE_PER_GROUP = 5000
+# Baris post-hoc per halaman; semua pasangan selalu tersedia di matriks p-value ringkas
+POST_HOC_PAGE_DEFAULT = 100
+POST_HOC_PAGE_MAX = 1000
+POST_HOC_SUMMARY_PAIRS = 10
+
+def _anova_sample_size(params):
+    try:
+        size = int(params.get('sample_per_group', ANOVA_SAMPLE_PER_GROUP))
+    except (TypeError, ValueError):
+        size = ANOVA_SAMPLE_PER_GROUP
+    return min(max(size, 0), MAX_ANOVA_SAMPLE_PER_GROUP)
 
-    if df_cleaned[independent_var].nunique() < 2:
-        raise ValueError(f"Analisis ANOVA membutuhkan minimal 2 kelompok data. Kolom grup ('{independent_var}') Anda hanya memiliki {df_cleaned[independent_var].nunique()} kelompok unik.")
-    
-    group_counts = df_cleaned.groupby(independent_var)[dependent_var].count()
-    if (group_counts < 2).any():
-        invalid_groups = group_counts[group_counts < 2].index.tolist()
-        raise ValueError(f"Setiap kelompok harus memiliki minimal 2 data poin yang valid. Kelompok berikut tidak memenuhi syarat: {', '.join(invalid_groups)}.")
+def _post_hoc_page(params):
+    """(offset, limit) halaman baris post-hoc dari parameter request."""
+    try:
+        offset = max(int(params.get('post_hoc_offset', 0)), 0)
+        limit = int(params.get('post_hoc_limit', POST_HOC_PAGE_DEFAULT))
+    except (TypeError, ValueError):
+        offset, limit = 0, POST_HOC_PAGE_DEFAULT
+    return offset, min(max(limit, 1), POST_HOC_PAGE_MAX)
+
+def _box_trace(name, box):
+    """Trace box Plotly dengan kuartil yang sudah dihitung (tanpa mengirim seluruh nilai)."""
+    return {
+        'type': 'box', 'name': name, 'x': [name],
+        'q1': [box['q1']], 'median': [box['median']], 'q3': [box['q3']],
+        'lowerfence': [box['whisker_low']], 'upperfence': [box['whisker_high']]
+    }
 
-    df_cleaned[independent_var] = df_cleaned[independent_var].astype('category')
+def _perform_oneway_anova_analysis(df, dependent_var, independent_var, sample_per_group=ANOVA_SAMPLE_PER_GROUP, post_hoc_page=(0, POST_HOC_PAGE_DEFAULT)):
+    """
+    Fungsi helper khusus untuk One-Way ANOVA. Grup difaktorisasi sekali
+    (stats_engine.GroupIndex); semua uji dan statistik deskriptif memakai
+    statistik grup yang sama. Baris post-hoc diurutkan (pasangan signifikan
+    lebih dulu) dan dipotong per halaman post_hoc_page = (offset, limit).
+    """
+    values = pd.to_numeric(df[dependent_var], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    index = stats_engine.GroupIndex.from_factor(values, df[independent_var])
+
+    if index.k < 2:
+        raise ValueError(f"Analisis ANOVA membutuhkan minimal 2 kelompok data. Kolom grup ('{independent_var}') Anda hanya memiliki {index.k} kelompok unik.")
+    
+    if (index.counts < 2).any():
+        invalid_groups = [label for label, count in zip(index.labels, index.counts) if count < 2]
+        raise ValueError(f"Setiap kelompok harus memiliki minimal 2 data poin yang valid. Kelompok berikut tidak memenuhi syarat: {', '.join(map(str, invalid_groups))}.")
 
-    normality_results = pg.normality(data=df_cleaned, dv=dependent_var, group=independent_var)
+    normality_results = stats_engine.group_normality_table(index)
     is_all_normal = bool(all(normality_results['normal']))
     
-    homogeneity_result = pg.homoscedasticity(data=df_cleaned, dv=dependent_var, group=independent_var, method='levene')
+    homogeneity_result = stats_engine.group_levene_table(index)
     is_homogeneous = bool(homogeneity_result['equal_var'].iloc[0]) if not homogeneity_result.empty else False
 
     # Inisialisasi variabel hasil
     analysis_type = ""
     main_test_results = {}
     post_hoc_results = None
+    post_hoc_info = None
     summary_indonesia = ""
     summary_apa = ""
     p_value = 1.0
 
     if is_all_normal:
         analysis_type = "One-Way ANOVA"
-        aov = pg.anova(data=df_cleaned, dv=dependent_var, between=independent_var, detailed=True)
+        aov = stats_engine.oneway_anova_table(index, independent_var)
         main_test_results = json.loads(aov.round(4).to_json(orient='records'))[0]
         p_value = main_test_results['p-unc']
         f_stat = main_test_results['F']
@@ -1674,21 +2410,35 @@ def _perform_oneway_anova_analysis(df, dependent_var, independent_var):
 
         if p_value < 0.05:
             post_hoc_test_name = "Tukey HSD" if is_homogeneous else "Games-Howell"
-            post_hoc = pg.pairwise_tukey(data=df_cleaned, dv=dependent_var, between=independent_var) if is_homogeneous else pg.pairwise_gameshowell(data=df_cleaned, dv=dependent_var, between=independent_var)
-            post_hoc_results = json.loads(post_hoc.round(4).to_json(orient='records'))
+            post_hoc = stats_engine.tukey_table(index) if is_homogeneous else stats_engine.gameshowell_table(index)
+            p_key = 'p-tukey' if is_homogeneous else 'pval'
+            p_values = post_hoc[p_key].to_numpy()
+            # Urutan p naik: semua pasangan signifikan berada di awal
+            post_hoc = post_hoc.iloc[np.argsort(p_values, kind='stable')].reset_index(drop=True)
+            significant = post_hoc[post_hoc[p_key] < 0.05]
+            offset, limit = post_hoc_page
+            post_hoc_results = json.loads(post_hoc.iloc[offset:offset + limit].round(4).to_json(orient='records'))
+            post_hoc_info = {
+                'test': post_hoc_test_name,
+                'p_key': p_key,
+                'total_pairs': len(post_hoc),
+                'significant_pairs': len(significant),
+                'offset': offset,
+                'limit': limit,
+                'next_offset': offset + limit if offset + limit < len(post_hoc) else None,
+                # p-value semua pasangan dalam bentuk ringkas (condensed, urutan segitiga atas
+                # seperti scipy.spatial.distance.squareform) dengan urutan label 'labels'
+                'matrix': {'labels': [str(label) for label in index.labels], 'p': json.loads(pd.Series(p_values).round(4).to_json(orient='values'))}
+            }
             
             summary_indonesia = f"Hasil analisis One-Way ANOVA menunjukkan bahwa terdapat perbedaan yang signifikan secara statistik antara rata-rata kelompok (F({df_between}, {df_within}) = {f_stat:.2f}, p < .05). "
             summary_apa = f"A one-way ANOVA revealed a significant effect of {independent_var} on {dependent_var}, F({df_between}, {df_within}) = {f_stat:.2f}, p < .05. "
             
-            significant_pairs = []
-            p_key = next((key for key in post_hoc.keys() if key.startswith('p-')), None)
-            if p_key:
-                for index, row in post_hoc.iterrows():
-                    if row[p_key] < 0.05:
-                        pair_summary = f"antara kelompok '{row['A']}' dan '{row['B']}'"
-                        significant_pairs.append(pair_summary)
-            
-            if significant_pairs:
+            if len(significant):
+                shown = significant.head(POST_HOC_SUMMARY_PAIRS)
+                significant_pairs = [f"antara kelompok '{a}' dan '{b}'" for a, b in zip(shown['A'], shown['B'])]
+                if len(significant) > len(shown):
+                    significant_pairs.append(f"serta {len(significant) - len(shown)} pasangan lainnya")
                 post_hoc_summary = f"Uji post-hoc ({post_hoc_test_name}) menunjukkan perbedaan signifikan {', '.join(significant_pairs)}."
                 summary_indonesia += post_hoc_summary
                 summary_apa += f"Post hoc comparisons using the {post_hoc_test_name} test indicated that significant differences were found between specific groups."
@@ -1698,7 +2448,7 @@ def _perform_oneway_anova_analysis(df, dependent_var, independent_var):
             summary_apa = f"A one-way ANOVA did not reveal a significant effect of {independent_var} on {dependent_var}, F({df_between}, {df_within}) = {f_stat:.2f}, p > .05."
     else:
         analysis_type = "Kruskal-Wallis H Test"
-        kruskal = pg.kruskal(data=df_cleaned, dv=dependent_var, between=independent_var)
+        kruskal = stats_engine.kruskal_table(index, independent_var)
         main_test_results = json.loads(kruskal.round(4).to_json(orient='records'))[0]
         p_value = main_test_results['p-unc']
         h_stat = main_test_results['H']
@@ -1706,10 +2456,9 @@ def _perform_oneway_anova_analysis(df, dependent_var, independent_var):
         summary_indonesia = f"Karena data tidak berdistribusi normal, uji non-parametrik Kruskal-Wallis digunakan. Hasilnya menunjukkan tidak ada perbedaan peringkat (rank) yang signifikan secara statistik antar kelompok (H({df_kruskal}) = {h_stat:.2f}, p = {p_value:.3f})."
         summary_apa = f"A Kruskal-Wallis H test showed no statistically significant difference in ranks for {dependent_var} across {independent_var} groups, H({df_kruskal}) = {h_stat:.2f}, p > .05."
 
-    descriptive_stats = df_cleaned.groupby(independent_var)[dependent_var].describe().round(3)
+    desc_reset = stats_engine.group_describe_table(index, {independent_var: index.labels}).round(3)
     
     # MEMBUAT DATA HIGHLIGHTS
-    desc_reset = descriptive_stats.reset_index()
     highest_group = desc_reset.loc[desc_reset['mean'].idxmax()]
     lowest_group = desc_reset.loc[desc_reset['mean'].idxmin()]
     highlights = {
@@ -1722,11 +2471,16 @@ def _perform_oneway_anova_analysis(df, dependent_var, independent_var):
     }
 
     # MEMBUAT DATA UNTUK PLOTLY
-    groups = [df_cleaned[dependent_var][df_cleaned[independent_var] == g] for g in desc_reset[independent_var]]
+    boxes = index.box_summaries()
     plot_data = {
         'dv_name': dependent_var,
         'iv_name': independent_var,
-        'boxplot': [{'y': list(g), 'type': 'box', 'name': name} for g, name in zip(groups, desc_reset[independent_var])],
+        'boxplot': [_box_trace(str(name), box) for name, box in zip(index.labels, boxes)],
+        'samples': [
+            {'name': str(name), 'n': int(n), 'y': sample.tolist(), 'outliers': box['outliers']}
+            for name, n, sample, box in zip(index.labels, index.counts, index.samples(sample_per_group), boxes)
+        ],
+        'sampling': {'per_group': sample_per_group, 'n_total': index.n},
         'barplot': [{
             'x': list(desc_reset[independent_var]),
             'y': list(desc_reset['mean']),
@@ -1739,35 +2493,33 @@ def _perform_oneway_anova_analysis(df, dependent_var, independent_var):
         'success': True, 'analysis_type': analysis_type,
         'prerequisites': { 'normality': json.loads(normality_results.round(4).to_json(orient='records')), 'homogeneity': json.loads(homogeneity_result.round(4).to_json(orient='records')), 'is_all_normal': is_all_normal, 'is_homogeneous': is_homogeneous },
         'descriptive_stats': json.loads(desc_reset.to_json(orient='records')),
-        'main_test_results': main_test_results, 'post_hoc_results': post_hoc_results,
+        'main_test_results': main_test_results, 'post_hoc_results': post_hoc_results, 'post_hoc': post_hoc_info,
         'summary': {'apa': summary_apa, 'indonesia': summary_indonesia},
         'highlights': highlights,
         'plot_data': plot_data
     }
 
-def _perform_twoway_anova_analysis(df, dependent_var, independent_vars):
-    """Fungsi helper BARU khusus untuk Two-Way ANOVA."""
+def _perform_twoway_anova_analysis(df, dependent_var, independent_vars, sample_per_group=ANOVA_SAMPLE_PER_GROUP):
+    """
+    Fungsi helper BARU khusus untuk Two-Way ANOVA. Sel (kombinasi level
+    kedua faktor) difaktorisasi sekali; uji homogenitas, ANOVA tipe II, dan
+    statistik deskriptif dihitung dari statistik sel tersebut.
+    """
     iv1, iv2 = independent_vars[0], independent_vars[1]
     
-    df_cleaned = df[[dependent_var, iv1, iv2]].copy()
-    df_cleaned[dependent_var] = pd.to_numeric(df_cleaned[dependent_var], errors='coerce')
-    df_cleaned.dropna(inplace=True)
+    values = pd.to_numeric(df[dependent_var], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    aov, cells, level1, level2, labels1, labels2 = stats_engine.twoway_anova_table(values, df[iv1], df[iv2], iv1, iv2)
 
-    if df_cleaned[iv1].nunique() < 2 or df_cleaned[iv2].nunique() < 2:
+    if len(labels1) < 2 or len(labels2) < 2:
         raise ValueError("Setiap variabel independen pada Two-Way ANOVA harus memiliki minimal 2 level/kategori.")
 
-    interaction_col = f"{iv1}_{iv2}"
-    df_cleaned[interaction_col] = df_cleaned[iv1].astype(str) + "_" + df_cleaned[iv2].astype(str)
-
-    normality_results = pg.normality(data=df_cleaned, dv=dependent_var, group=iv1)
+    iv1_index = stats_engine.GroupIndex(cells.values, level1[cells.codes], labels1)
+    normality_results = stats_engine.group_normality_table(iv1_index)
     is_all_normal = bool(all(normality_results['normal']))
     
-    homogeneity_result = pg.homoscedasticity(data=df_cleaned, dv=dependent_var, group=interaction_col, method='levene')
+    homogeneity_result = stats_engine.group_levene_table(cells)
     is_homogeneous = bool(homogeneity_result['equal_var'].iloc[0]) if not homogeneity_result.empty else False
 
-    df_cleaned.drop(columns=[interaction_col], inplace=True)
-
-    aov = pg.anova(data=df_cleaned, dv=dependent_var, between=[iv1, iv2], detailed=True)
     main_test_results = json.loads(aov.round(4).to_json(orient='records'))
 
     p_interaction = aov[aov['Source'] == f'{iv1} * {iv2}']['p-unc'].iloc[0]
@@ -1785,7 +2537,9 @@ def _perform_twoway_anova_analysis(df, dependent_var, independent_vars):
         if p_iv1 < 0.05: summary_indonesia += f"Terdapat efek utama yang signifikan dari '{iv1}'. "
         if p_iv2 < 0.05: summary_indonesia += f"Terdapat efek utama yang signifikan dari '{iv2}'. "
 
-    descriptive_stats = df_cleaned.groupby([iv1, iv2])[dependent_var].describe().round(3).reset_index()
+    cell_labels1 = [labels1[i] for i in level1]
+    cell_labels2 = [labels2[i] for i in level2]
+    descriptive_stats = stats_engine.group_describe_table(cells, {iv1: cell_labels1, iv2: cell_labels2}).round(3)
     
     # MEMBUAT DATA HIGHLIGHTS
     highest_group = descriptive_stats.loc[descriptive_stats['mean'].idxmax()]
@@ -1806,14 +2560,18 @@ def _perform_twoway_anova_analysis(df, dependent_var, independent_vars):
         'iv_name': iv1,
         'iv2_name': iv2,
         'groups': json.loads(descriptive_stats.to_json(orient='records')),
-        'raw_data': json.loads(df_cleaned.to_json(orient='records'))
+        'cells': [
+            {iv1: str(l1), iv2: str(l2), 'n': int(n), 'box': box, 'sample': sample.tolist()}
+            for l1, l2, n, box, sample in zip(cell_labels1, cell_labels2, cells.counts, cells.box_summaries(), cells.samples(sample_per_group))
+        ],
+        'sampling': {'per_group': sample_per_group, 'n_total': cells.n}
     }
 
     return {
         'success': True, 'analysis_type': 'Two-Way ANOVA',
         'prerequisites': { 'normality': json.loads(normality_results.round(4).to_json(orient='records')), 'homogeneity': json.loads(homogeneity_result.round(4).to_json(orient='records')), 'is_all_normal': is_all_normal, 'is_homogeneous': is_homogeneous },
         'descriptive_stats': json.loads(descriptive_stats.to_json(orient='records')),
-        'main_test_results': main_test_results, 'post_hoc_results': None,
+        'main_test_results': main_test_results, 'post_hoc_results': None, 'post_hoc': None,
         'summary': {'apa': summary_apa, 'indonesia': summary_indonesia},
         'highlights': highlights,
         'plot_data': plot_data
@@ -1826,65 +2584,103 @@ def _perform_twoway_anova_analysis(df, dependent_var, independent_vars):
 # ========================================================================
 @app.route('/api/anova_test', methods=['POST'], endpoint='api_anova_test_file')
 @login_required
+@negotiated_response
+@cached_response(result_cache, gate=_anova_cache_gate)
 def api_anova_test_file():
     if not current_user.is_pro:
         is_allowed, message = check_and_update_pro_trial(current_user.id, 'data_analysis')
         if not is_allowed: return jsonify({'success': False, 'message': "Batas percobaan tercapai. Upgrade ke PRO."}), 429
             
-    if 'file' not in request.files: return jsonify({'success': False, 'message': 'File tidak ditemukan.'}), 400
+    # Data dapat berasal dari file yang diunggah (form) atau dataset tersimpan (JSON dengan dataset_id)
+    params = request.get_json(silent=True) if request.is_json else request.form
+    if not params or (not params.get('dataset_id') and 'file' not in request.files):
+        return jsonify({'success': False, 'message': 'File tidak ditemukan.'}), 400
 
     try:
-        file = request.files['file']
-        filename = secure_filename(file.filename)
-        if filename.endswith('.csv'): df = pd.read_csv(file)
-        elif filename.endswith(('.xls', '.xlsx')): df = pd.read_excel(file)
-        else: return jsonify({'success': False, 'message': 'Format file tidak didukung.'}), 400
-        
-        anova_type = request.form.get('anova_type')
-        dependent_var = request.form.get('dependent')
-        independent_var1 = request.form.get('independent1')
-        independent_var2 = request.form.get('independent2')
+        anova_type = params.get('anova_type')
+        dependent_var = params.get('dependent')
+        independent_var1 = params.get('independent1')
+        independent_var2 = params.get('independent2')
+
+        sample_per_group = _anova_sample_size(params)
+        dataset_id = params.get('dataset_id')
+        # Sheet dan baris header hasil preview (/api/datasets/preview); kosong = sheet pertama, header dideteksi
+        sheet = params.get('sheet') or None
+        header_row = params.get('header_row') or None
+
+        # Hanya kolom dependen dan kolom grup yang dibaca
+        group_columns = [independent_var1, independent_var2] if anova_type == 'two_way' and independent_var2 else [independent_var1]
+        if not dependent_var or not all(group_columns):
+            return jsonify({'success': False, 'message': 'Variabel dependen dan variabel grup harus dipilih.'}), 400
+        try:
+            if not dataset_id and str(params.get('keep_dataset', '')).lower() in ('1', 'true'):
+                # File disimpan sebagai dataset agar baris lengkap dapat diambil per halaman
+                file = request.files['file']
+                filename = secure_filename(file.filename)
+                if not is_supported(filename): return jsonify({'success': False, 'message': 'Format file tidak didukung.'}), 400
+                dataset_id = dataset_store.create(current_user.id, file.stream, filename, sheet=sheet, header_row=header_row)['dataset_id']
+            if dataset_id:
+                df = dataset_store.load_columns(current_user.id, dataset_id, [dependent_var, *group_columns])
+            else:
+                file = request.files['file']
+                filename = secure_filename(file.filename)
+                if not is_supported(filename): return jsonify({'success': False, 'message': 'Format file tidak didukung.'}), 400
+                df = read_table(file.stream, filename, numeric_columns=[dependent_var], categorical_columns=group_columns,
+                                sheet=sheet, header_row=header_row)
+        except DatasetNotFound as e:
+            return jsonify({'success': False, 'message': str(e)}), 404
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
 
         if anova_type == 'one_way':
-            result = _perform_oneway_anova_analysis(df, dependent_var, independent_var1)
+            result = _perform_oneway_anova_analysis(df, dependent_var, independent_var1, sample_per_group, _post_hoc_page(params))
         elif anova_type == 'two_way':
             if not independent_var2: return jsonify({'success': False, 'message': 'Variabel grup kedua diperlukan untuk Two-Way ANOVA.'}), 400
-            result = _perform_twoway_anova_analysis(df, dependent_var, [independent_var1, independent_var2])
+            result = _perform_twoway_anova_analysis(df, dependent_var, [independent_var1, independent_var2], sample_per_group)
         else:
             return jsonify({'success': False, 'message': 'Jenis ANOVA tidak valid.'}), 400
-        
+
+        if dataset_id:
+            result['dataset_id'] = dataset_id
+            result['rows_url'] = url_for('dataset_rows', dataset_id=dataset_id, columns=','.join([dependent_var, *group_columns]))
         return jsonify(result)
     except Exception as e:
         return jsonify({'success': False, 'message': f'Terjadi kesalahan saat analisis: {str(e)}'}), 500
 
 @app.route('/api/manual_anova_test', methods=['POST'], endpoint='api_anova_test_manual')
 @login_required
+@negotiated_response
+@cached_response(result_cache, gate=_anova_cache_gate)
 def api_manual_anova_test():
     if not current_user.is_pro:
         is_allowed, message = check_and_update_pro_trial(current_user.id, 'data_analysis')
         if not is_allowed: return jsonify({'success': False, 'message': "Batas percobaan tercapai. Upgrade ke PRO."}), 429
 
     try:
-        data = request.get_json()
+        try:
+            data = read_request_data()
+        except PayloadError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+        if data is None:
+            return jsonify({'success': False, 'message': 'Format request tidak valid, harus JSON.'}), 400
         anova_type = data.get('anova_type')
+        sample_per_group = _anova_sample_size(data)
 
         if anova_type == 'one_way':
-            groups_data = data.get('groups', [])
-            group_names = data.get('group_names', [])
-            all_values = []
-            for i, group_vals in enumerate(groups_data):
-                for val in group_vals:
-                    all_values.append({'Nilai': val, 'Kelompok': group_names[i]})
-            df = pd.DataFrame(all_values)
+            named_groups = [(name, stats_engine.to_float_column(vals)) for name, vals in zip(data.get('group_names', []), data.get('groups', []))]
+            df = pd.DataFrame({
+                'Nilai': np.concatenate([vals for _, vals in named_groups]) if named_groups else np.array([], dtype=np.float64),
+                'Kelompok': np.repeat(np.array([name for name, _ in named_groups], dtype=object), [vals.size for _, vals in named_groups])
+            })
             # PERBAIKAN: Memastikan nama fungsi yang dipanggil sudah benar
-            result = _perform_oneway_anova_analysis(df, 'Nilai', 'Kelompok')
+            result = _perform_oneway_anova_analysis(df, 'Nilai', 'Kelompok', sample_per_group, _post_hoc_page(data))
         elif anova_type == 'two_way':
             table_data = data.get('data', [])
             if not table_data:
                 return jsonify({'success': False, 'message': 'Data tabel manual tidak boleh kosong.'}), 400
             df = pd.DataFrame(table_data)
             col_names = list(table_data[0].keys())
-            result = _perform_twoway_anova_analysis(df, col_names[0], [col_names[1], col_names[2]])
+            result = _perform_twoway_anova_analysis(df, col_names[0], [col_names[1], col_names[2]], sample_per_group)
         else:
             return jsonify({'success': False, 'message': 'Jenis ANOVA tidak valid.'}), 400
 
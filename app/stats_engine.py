@@ -0,0 +1,946 @@
+# ========================================================================
+# File: app/stats_engine.py
+# Deskripsi: Mesin statistik terpadu di balik semua endpoint analisis.
+#            Statistik cukup (n, mean, varians) dihitung sekali per grup
+#            dengan NumPy, lalu dipakai ulang oleh semua uji. Modul ini
+#            tidak bergantung pada Flask sehingga dapat diuji dan
+#            di-benchmark secara terpisah.
+# ========================================================================
+
+from dataclasses import dataclass, fields, is_dataclass
+from typing import ClassVar, List, Optional, Tuple
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from app.lazy import LazyModule
+
+# SciPy dan statsmodels diimpor saat fungsi uji pertama dipanggil (lihat app/lazy.py)
+stats = LazyModule('scipy.stats')
+special = LazyModule('scipy.special')
+sm = LazyModule('statsmodels.api')
+sm_diagnostic = LazyModule('statsmodels.stats.diagnostic')
+sm_stattools = LazyModule('statsmodels.stats.stattools')
+
+
+def clean_array(values):
+    """Mengubah input menjadi array float64 dan membuang NaN."""
+    arr = np.asarray(values, dtype=np.float64).ravel()
+    return arr[~np.isnan(arr)]
+
+def clean_pairs(a, b):
+    """Membuang pasangan yang salah satu nilainya NaN."""
+    a = np.asarray(a, dtype=np.float64).ravel()
+    b = np.asarray(b, dtype=np.float64).ravel()
+    if a.shape != b.shape:
+        raise ValueError('Kedua set data harus memiliki jumlah yang sama.')
+    mask = ~(np.isnan(a) | np.isnan(b))
+    return a[mask], b[mask]
+
+def _t_half_width(confidence, df, se):
+    """Setengah lebar interval kepercayaan t; satu panggilan ppf untuk satu df."""
+    return stats.t.ppf((1 + confidence) / 2, df) * se
+
+
+# =========================================================================
+# STATISTIK CUKUP PER GRUP
+# =========================================================================
+@dataclass(frozen=True)
+class GroupStats:
+    n: int
+    mean: float
+    var: float
+
+    # Properti turunan yang ikut disertakan oleh to_dict()
+    derived: ClassVar[Tuple[str, ...]] = ('std', 'sem')
+
+    @classmethod
+    def from_array(cls, values):
+        n = int(values.size)
+        mean = float(values.mean()) if n else float('nan')
+        var = float(np.dot(values - mean, values - mean) / (n - 1)) if n > 1 else float('nan')
+        return cls(n=n, mean=mean, var=var)
+
+    @property
+    def std(self):
+        return float(np.sqrt(self.var))
+
+    @property
+    def sem(self):
+        return float(np.sqrt(self.var / self.n))
+
+    def mean_ci(self, confidence):
+        half = _t_half_width(confidence, self.n - 1, self.sem)
+        return self.mean - half, self.mean + half
+
+
+# =========================================================================
+# OBJEK HASIL
+# =========================================================================
+@dataclass(frozen=True)
+class NormalityResult:
+    stats: GroupStats
+    shapiro_stat: float
+    shapiro_p: float
+    ks_stat: float
+    ks_p: float
+
+    @property
+    def is_normal(self):
+        return self.shapiro_p > 0.05
+
+
+@dataclass(frozen=True)
+class HomogeneityResult:
+    test: str
+    statistic: float
+    p: float
+    df1: int
+    df2: Optional[int]
+    n_per_group: List[int]
+
+    @property
+    def is_homogeneous(self):
+        return self.p > 0.05
+
+
+@dataclass(frozen=True)
+class TTestRow:
+    t: float
+    df: float
+    p: float
+    mean_diff: float
+    ci: Tuple[float, float]
+
+
+@dataclass(frozen=True)
+class IndependentTTestResult:
+    group1: GroupStats
+    group2: GroupStats
+    group_cis: Tuple[Tuple[float, float], Tuple[float, float]]
+    levene_stat: float
+    levene_p: float
+    equal_var: TTestRow
+    unequal_var: TTestRow
+
+    @property
+    def selected(self):
+        """Baris uji yang dipakai untuk kesimpulan, berdasarkan hasil Levene."""
+        return self.equal_var if self.levene_p > 0.05 else self.unequal_var
+
+
+@dataclass(frozen=True)
+class PairedTTestResult:
+    stats1: GroupStats
+    stats2: GroupStats
+    r: float
+    r_p: float
+    diff: GroupStats
+    test: TTestRow
+
+
+@dataclass(frozen=True)
+class DescriptiveResult:
+    n: int
+    mean: float
+    median: float
+    std: float
+    variance: float
+    min: float
+    max: float
+
+    derived: ClassVar[Tuple[str, ...]] = ('range',)
+
+    @property
+    def range(self):
+        return self.max - self.min
+
+
+class OnlineMoments:
+    """
+    Momen statistik yang diperbarui per chunk untuk banyak kolom sekaligus
+    (algoritma Welford/Chan versi batch). Dipakai untuk dataset yang terlalu
+    besar untuk dimuat utuh: setiap chunk cukup dilihat satu kali.
+    """
+    def __init__(self, k):
+        self.n = np.zeros(k, dtype=np.int64)
+        self.mean = np.zeros(k)
+        self.m2 = np.zeros(k)
+        self.min = np.full(k, np.inf)
+        self.max = np.full(k, -np.inf)
+
+    def update(self, chunk):
+        chunk = np.asarray(chunk, dtype=np.float64)
+        if chunk.ndim == 1:
+            chunk = chunk[:, None]
+        valid = ~np.isnan(chunk)
+        nb = valid.sum(axis=0)
+        if not nb.any():
+            return
+        with np.errstate(invalid='ignore', divide='ignore'):
+            chunk_mean = np.where(nb > 0, np.nansum(chunk, axis=0) / nb, 0.0)
+            centered = np.where(valid, chunk - chunk_mean, 0.0)
+            chunk_m2 = np.einsum('ij,ij->j', centered, centered)
+
+            n_new = self.n + nb
+            delta = chunk_mean - self.mean
+            safe_n = np.maximum(n_new, 1)
+            self.mean = np.where(nb > 0, self.mean + delta * nb / safe_n, self.mean)
+            self.m2 = self.m2 + chunk_m2 + delta * delta * self.n * nb / safe_n
+        self.n = n_new
+        self.min = np.fmin(self.min, np.where(valid, chunk, np.inf).min(axis=0))
+        self.max = np.fmax(self.max, np.where(valid, chunk, -np.inf).max(axis=0))
+
+    def results(self):
+        out = []
+        for j in range(self.n.size):
+            n = int(self.n[j])
+            variance = float(self.m2[j] / (n - 1)) if n > 1 else float('nan')
+            out.append({
+                'n': n,
+                'mean': float(self.mean[j]) if n else float('nan'),
+                'std': float(np.sqrt(variance)),
+                'variance': variance,
+                'min': float(self.min[j]) if n else float('nan'),
+                'max': float(self.max[j]) if n else float('nan'),
+                'range': float(self.max[j] - self.min[j]) if n else float('nan'),
+            })
+        return out
+
+
+def to_float_column(values):
+    """Mengubah list nilai menjadi array float64; nilai non-numerik menjadi NaN."""
+    try:
+        return np.asarray(values, dtype=np.float64).ravel()
+    except (TypeError, ValueError):
+        return pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+
+def column_matrix(columns):
+    """
+    Menyusun dict {nama: nilai} menjadi matriks float64 (baris x kolom) dengan
+    padding NaN untuk kolom yang lebih pendek.
+    """
+    arrays = [to_float_column(v) for v in columns.values()]
+    n_rows = max((a.size for a in arrays), default=0)
+    matrix = np.full((n_rows, len(arrays)), np.nan)
+    for j, a in enumerate(arrays):
+        matrix[:a.size, j] = a
+    return list(columns.keys()), matrix
+
+def _modes(column):
+    values, counts = np.unique(column, return_counts=True)
+    if counts.size == 0:
+        return []
+    return values[counts == counts.max()].tolist()
+
+def describe_columns(matrix, quantiles=None):
+    """
+    Statistik deskriptif untuk semua kolom matriks sekaligus dengan agregasi
+    NumPy per sumbu (satu lintasan per statistik untuk seluruh kolom).
+    Median dan kuantil memakai seleksi (np.partition) di dalam nanquantile,
+    bukan pengurutan penuh. Mengembalikan list dict per kolom.
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    valid = ~np.isnan(matrix)
+    n = valid.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'), warnings.catch_warnings():
+        # Kolom tanpa nilai valid menghasilkan NaN; peringatan "All-NaN slice" tidak relevan
+        warnings.simplefilter('ignore', RuntimeWarning)
+        mean = np.nansum(matrix, axis=0) / n
+        centered = np.where(valid, matrix - mean, 0.0)
+        variance = np.einsum('ij,ij->j', centered, centered) / (n - 1)
+        minimum = np.nanmin(matrix, axis=0)
+        maximum = np.nanmax(matrix, axis=0)
+        probs = [0.5] + list(quantiles or [])
+        q = np.nanquantile(matrix, probs, axis=0)
+
+    out = []
+    for j in range(matrix.shape[1]):
+        column = {
+            'n': int(n[j]),
+            'mean': float(mean[j]),
+            'median': float(q[0, j]),
+            'mode': _modes(matrix[valid[:, j], j]),
+            'std': float(np.sqrt(variance[j])),
+            'variance': float(variance[j]),
+            'range': float(maximum[j] - minimum[j]),
+            'min': float(minimum[j]),
+            'max': float(maximum[j]),
+        }
+        if quantiles:
+            column['quantiles'] = {str(p): float(q[i + 1, j]) for i, p in enumerate(quantiles)}
+        out.append(column)
+    return out
+
+
+def box_summary(values, max_outliers=200):
+    """Ringkasan lima angka + pagar Tukey (1.5 IQR) untuk box plot di sisi klien."""
+    arr = clean_array(values)
+    if arr.size == 0:
+        return None
+    q1, median, q3 = np.quantile(arr, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    lower_fence, upper_fence = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+    inside = arr[(arr >= lower_fence) & (arr <= upper_fence)]
+    outliers = arr[(arr < lower_fence) | (arr > upper_fence)]
+    return {
+        'min': float(arr.min()), 'q1': float(q1), 'median': float(median), 'q3': float(q3), 'max': float(arr.max()),
+        'lower_fence': float(lower_fence), 'upper_fence': float(upper_fence),
+        'whisker_low': float(inside.min()) if inside.size else float(q1),
+        'whisker_high': float(inside.max()) if inside.size else float(q3),
+        'n_outliers': int(outliers.size),
+        'outliers': np.sort(outliers)[:max_outliers].tolist(),
+    }
+
+def chart_data(values, max_bins=50, kde_points=128, kde_max_sample=5000, max_categories=10):
+    """
+    Data grafik siap-Plotly untuk satu kolom: bin histogram, kurva KDE
+    (dalam satuan frekuensi agar bisa ditumpuk di atas histogram), ringkasan
+    box plot, dan frekuensi nilai jika jumlah nilai uniknya kecil.
+    KDE dihitung dari sampel acak tetap jika data sangat besar.
+    """
+    arr = clean_array(values)
+    if arr.size == 0:
+        return None
+    edges = np.histogram_bin_edges(arr, bins='auto')
+    if edges.size - 1 > max_bins:
+        edges = np.histogram_bin_edges(arr, bins=max_bins)
+    counts, edges = np.histogram(arr, bins=edges)
+
+    kde = None
+    if arr.size > 1 and arr.min() < arr.max():
+        sample = arr
+        if arr.size > kde_max_sample:
+            sample = np.random.default_rng(0).choice(arr, kde_max_sample, replace=False)
+        grid = np.linspace(edges[0], edges[-1], kde_points)
+        bin_width = edges[1] - edges[0]
+        density = stats.gaussian_kde(sample)(grid)
+        kde = {'x': grid.tolist(), 'y': (density * arr.size * bin_width).tolist()}
+
+    labels, label_counts = np.unique(arr, return_counts=True)
+    value_counts = None
+    if 1 < labels.size <= max_categories:
+        value_counts = {'labels': labels.tolist(), 'counts': label_counts.tolist()}
+
+    return {
+        'histogram': {'edges': edges.tolist(), 'counts': counts.tolist()},
+        'kde': kde,
+        'box': box_summary(arr),
+        'value_counts': value_counts,
+    }
+
+
+def to_dict(obj):
+    """Mengubah objek hasil (dataclass bersarang) menjadi dict yang siap di-JSON-kan."""
+    if is_dataclass(obj):
+        result = {f.name: to_dict(getattr(obj, f.name)) for f in fields(obj)}
+        for name in getattr(obj, 'derived', ()):
+            result[name] = to_dict(getattr(obj, name))
+        return result
+    if isinstance(obj, (list, tuple)):
+        return [to_dict(v) for v in obj]
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return obj
+
+
+# =========================================================================
+# UJI STATISTIK
+# =========================================================================
+def describe(values):
+    x = clean_array(values)
+    if x.size < 2:
+        raise ValueError('Minimal 2 data untuk statistik deskriptif')
+    s = GroupStats.from_array(x)
+    return DescriptiveResult(s.n, s.mean, float(np.median(x)), s.std, s.var, float(x.min()), float(x.max()))
+
+def normality(values):
+    x = clean_array(values)
+    if x.size < 3:
+        raise ValueError('Minimal 3 data untuk uji normalitas')
+    s = GroupStats.from_array(x)
+    shapiro_stat, shapiro_p = stats.shapiro(x)
+    ks_stat, ks_p = stats.kstest((x - s.mean) / s.std, 'norm')
+    return NormalityResult(s, float(shapiro_stat), float(shapiro_p), float(ks_stat), float(ks_p))
+
+# Di atas jumlah data ini Shapiro-Wilk tidak lagi akurat (batas scipy); dipakai uji sampel besar
+SHAPIRO_MAX_N = 5000
+QQ_GRID_POINTS = 99
+
+def _dagostino_pearson(n, skew, kurt):
+    """Omnibus K² D'Agostino-Pearson dari skewness dan kurtosis (Pearson) per kolom, seperti stats.normaltest."""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        y = skew * np.sqrt((n + 1) * (n + 3) / (6.0 * (n - 2)))
+        beta2 = 3.0 * (n ** 2 + 27 * n - 70) * (n + 1) * (n + 3) / ((n - 2.0) * (n + 5) * (n + 7) * (n + 9))
+        w2 = -1 + np.sqrt(2 * (beta2 - 1))
+        delta = 1 / np.sqrt(0.5 * np.log(w2))
+        alpha = np.sqrt(2.0 / (w2 - 1))
+        y = np.where(y == 0, 1, y)
+        z_skew = delta * np.log(y / alpha + np.sqrt((y / alpha) ** 2 + 1))
+
+        expected = 3.0 * (n - 1) / (n + 1)
+        var_b2 = 24.0 * n * (n - 2) * (n - 3) / ((n + 1) * (n + 1.0) * (n + 3) * (n + 5))
+        x = (kurt - expected) / np.sqrt(var_b2)
+        sqrt_beta1 = 6.0 * (n * n - 5 * n + 2) / ((n + 7) * (n + 9)) * np.sqrt((6.0 * (n + 3) * (n + 5)) / (n * (n - 2) * (n - 3)))
+        a = 6.0 + 8.0 / sqrt_beta1 * (2.0 / sqrt_beta1 + np.sqrt(1 + 4.0 / sqrt_beta1 ** 2))
+        term1 = 1 - 2 / (9.0 * a)
+        denom = 1 + x * np.sqrt(2 / (a - 4.0))
+        term2 = np.sign(denom) * np.where(denom == 0.0, np.nan, ((1 - 2.0 / a) / np.abs(denom)) ** (1 / 3.0))
+        z_kurt = (term1 - term2) / np.sqrt(2 / (9.0 * a))
+    k2 = z_skew ** 2 + z_kurt ** 2
+    return k2, stats.chi2.sf(k2, 2)
+
+def _anderson_darling(sorted_values, mean, std):
+    """A² Anderson-Darling (parameter diestimasi) dan p-value pendekatan D'Agostino & Stephens (1986)."""
+    n = sorted_values.size
+    z = (sorted_values - mean) / std
+    i = np.arange(1, n + 1)
+    a2 = -n - np.sum((2 * i - 1) * (stats.norm.logcdf(z) + stats.norm.logsf(z[::-1]))) / n
+    a2_adj = a2 * (1 + 0.75 / n + 2.25 / n ** 2)
+    if a2_adj >= 153:
+        p = 0.0  # di atas titik ini polinomial pendekatan naik kembali; p sudah ~1e-190
+    elif a2_adj >= 0.6:
+        p = np.exp(1.2937 - 5.709 * a2_adj + 0.0186 * a2_adj ** 2)
+    elif a2_adj > 0.34:
+        p = np.exp(0.9177 - 4.279 * a2_adj - 1.38 * a2_adj ** 2)
+    elif a2_adj > 0.2:
+        p = 1 - np.exp(-8.318 + 42.796 * a2_adj - 59.938 * a2_adj ** 2)
+    else:
+        p = 1 - np.exp(-13.436 + 101.14 * a2_adj - 223.73 * a2_adj ** 2)
+    return float(a2), float(min(max(p, 0.0), 1.0))
+
+def qq_grid(sorted_values, mean, std, points=QQ_GRID_POINTS):
+    """Koordinat Q-Q plot pada grid peluang tetap (bukan semua titik): kuantil teoretis vs kuantil data."""
+    probs = (np.arange(1, points + 1) - 0.5) / points
+    sample = np.interp(probs * (sorted_values.size - 1), np.arange(sorted_values.size), sorted_values)
+    return {'theoretical': (mean + std * stats.norm.ppf(probs)).tolist(), 'sample': sample.tolist()}
+
+def normality_columns(matrix, qq_points=QQ_GRID_POINTS):
+    """
+    Uji normalitas sampel besar untuk setiap kolom matriks (NaN diabaikan):
+    D'Agostino-Pearson dan Jarque-Bera dari momen yang dihitung sekaligus
+    untuk semua kolom, Anderson-Darling, serta koordinat Q-Q pada grid tetap.
+    Kolom diurutkan sekali (NaN di akhir) untuk Anderson-Darling dan Q-Q.
+    Mengembalikan list dict per kolom (None untuk kolom dengan < 20 data).
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    valid = ~np.isnan(matrix)
+    n = valid.sum(axis=0).astype(np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.nansum(matrix, axis=0) / n
+        centered = np.where(valid, matrix - mean, 0.0)
+        sq = centered * centered
+        m2 = sq.sum(axis=0) / n
+        m3 = np.einsum('ij,ij->j', sq, centered) / n
+        m4 = np.einsum('ij,ij->j', sq, sq) / n
+        skew = m3 / m2 ** 1.5
+        kurt = m4 / m2 ** 2
+        std = np.sqrt(m2 * n / (n - 1))
+    k2, k2_p = _dagostino_pearson(n, skew, kurt)
+    jb = n / 6.0 * (skew ** 2 + (kurt - 3) ** 2 / 4)
+    jb_p = stats.chi2.sf(jb, 2)
+    ordered = np.sort(matrix, axis=0)
+
+    out = []
+    for j in range(matrix.shape[1]):
+        count = int(n[j])
+        if count < 20 or not std[j] > 0:
+            out.append(None)
+            continue
+        column = ordered[:count, j]
+        ad, ad_p = _anderson_darling(column, mean[j], std[j])
+        out.append({
+            'n': count, 'mean': float(mean[j]), 'std': float(std[j]),
+            'skewness': float(skew[j]), 'kurtosis': float(kurt[j] - 3),
+            'tests': [
+                {'test': "D'Agostino-Pearson", 'statistic': float(k2[j]), 'df': 2, 'p': float(k2_p[j])},
+                {'test': 'Anderson-Darling', 'statistic': ad, 'df': count, 'p': ad_p},
+                {'test': 'Jarque-Bera', 'statistic': float(jb[j]), 'df': 2, 'p': float(jb_p[j])},
+            ],
+            'is_normal': bool(k2_p[j] > 0.05),
+            'qq': qq_grid(column, mean[j], std[j], qq_points),
+        })
+    return out
+
+def _clean_groups(groups, min_size=2):
+    cleaned = [clean_array(g) for g in groups]
+    if any(g.size < min_size for g in cleaned):
+        raise ValueError(f'Setiap grup minimal punya {min_size} data')
+    return cleaned
+
+def levene(groups):
+    cleaned = _clean_groups(groups)
+    stat, p = stats.levene(*cleaned)
+    sizes = [int(g.size) for g in cleaned]
+    return HomogeneityResult('Levene’s Test', float(stat), float(p), len(cleaned) - 1, sum(sizes) - len(cleaned), sizes)
+
+def bartlett(groups):
+    cleaned = _clean_groups(groups)
+    stat, p = stats.bartlett(*cleaned)
+    sizes = [int(g.size) for g in cleaned]
+    return HomogeneityResult('Bartlett’s Test', float(stat), float(p), len(cleaned) - 1, None, sizes)
+
+def independent_ttest(group1, group2, confidence=0.95):
+    a, b = clean_array(group1), clean_array(group2)
+    if a.size < 3 or b.size < 3:
+        raise ValueError('Setiap grup harus memiliki minimal 3 data poin.')
+    s1, s2 = GroupStats.from_array(a), GroupStats.from_array(b)
+    levene_stat, levene_p = stats.levene(a, b)
+
+    mean_diff = s1.mean - s2.mean
+    v1n, v2n = s1.var / s1.n, s2.var / s2.n
+
+    df_equal = s1.n + s2.n - 2
+    se_equal = np.sqrt(((s1.n - 1) * s1.var + (s2.n - 1) * s2.var) / df_equal * (1 / s1.n + 1 / s2.n))
+    df_unequal = float((v1n + v2n) ** 2 / (v1n ** 2 / (s1.n - 1) + v2n ** 2 / (s2.n - 1)))
+    se_unequal = np.sqrt(v1n + v2n)
+
+    rows = []
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for df, se in ((df_equal, se_equal), (df_unequal, se_unequal)):
+            t = mean_diff / se
+            p = 2 * stats.t.sf(abs(t), df)
+            half = _t_half_width(confidence, df, se)
+            rows.append(TTestRow(float(t), df, float(p), float(mean_diff), (float(mean_diff - half), float(mean_diff + half))))
+
+    return IndependentTTestResult(
+        group1=s1, group2=s2,
+        group_cis=(s1.mean_ci(confidence), s2.mean_ci(confidence)),
+        levene_stat=float(levene_stat), levene_p=float(levene_p),
+        equal_var=rows[0], unequal_var=rows[1]
+    )
+
+def paired_ttest(pair1, pair2, confidence=0.95):
+    a, b = clean_pairs(pair1, pair2)
+    if a.size < 3:
+        raise ValueError('Kedua set data harus memiliki jumlah yang sama dan minimal 3 data poin.')
+    s1, s2 = GroupStats.from_array(a), GroupStats.from_array(b)
+    d = GroupStats.from_array(a - b)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r = float(np.dot(a - s1.mean, b - s2.mean) / ((a.size - 1) * s1.std * s2.std))
+        r_t = r * np.sqrt((a.size - 2) / (1 - r * r))
+        r_p = float(2 * stats.t.sf(abs(r_t), a.size - 2))
+
+        df = d.n - 1
+        t = d.mean / d.sem
+        p = float(2 * stats.t.sf(abs(t), df))
+    if d.var > 0:
+        half = _t_half_width(confidence, df, d.sem)
+        ci = (d.mean - half, d.mean + half)
+    else:
+        ci = (d.mean, d.mean)
+
+    return PairedTTestResult(s1, s2, r, r_p, d, TTestRow(float(t), df, p, d.mean, ci))
+
+
+# =========================================================================
+# ANOVA BERBASIS INDEKS GRUP
+# Keluaran tabel mengikuti format kolom pingouin (normality, homoscedasticity,
+# anova, kruskal, pairwise_tukey, pairwise_gameshowell) agar respons API
+# tidak berubah.
+# =========================================================================
+class GroupIndex:
+    """
+    Faktorisasi grup yang dihitung sekali: kode grup per baris, lalu jumlah,
+    jumlah kuadrat deviasi, dan ukuran tiap grup lewat np.bincount. Semua uji
+    prasyarat, omnibus, post-hoc, dan deskriptif ANOVA memakai indeks yang sama.
+    """
+    def __init__(self, values, codes, labels):
+        self.values = np.asarray(values, dtype=np.float64)
+        self.codes = np.asarray(codes, dtype=np.intp)
+        self.labels = list(labels)
+        self.k = len(self.labels)
+        self.counts = np.bincount(self.codes, minlength=self.k)
+        self.sums = np.bincount(self.codes, weights=self.values, minlength=self.k)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.means = self.sums / self.counts
+            dev = self.values - self.means[self.codes]
+            self.ss = np.bincount(self.codes, weights=dev * dev, minlength=self.k)
+            self.vars = self.ss / (self.counts - 1)
+        self.n = int(self.values.size)
+        self.grand_mean = float(self.values.mean()) if self.n else float('nan')
+        self._splits = None
+
+    @classmethod
+    def from_factor(cls, values, factor):
+        """Membuat indeks dari nilai numerik dan kolom grup; baris NaN (nilai atau grup) dibuang."""
+        values = np.asarray(values, dtype=np.float64)
+        codes, labels = pd.factorize(factor, sort=True)
+        keep = (codes >= 0) & ~np.isnan(values)
+        codes, values = codes[keep], values[keep]
+        used = np.unique(codes)
+        if used.size < len(labels):
+            # Buang kategori yang tidak memiliki data (mis. kategori categorical yang tidak terpakai)
+            remap = np.full(len(labels), -1)
+            remap[used] = np.arange(used.size)
+            codes = remap[codes]
+            labels = [labels[i] for i in used]
+        return cls(values, codes, list(labels))
+
+    def splits(self):
+        """Nilai per grup (urutan label), dari satu argsort stabil atas kode grup."""
+        if self._splits is None:
+            order = np.argsort(self.codes, kind='stable')
+            self._splits = np.split(self.values[order], np.cumsum(self.counts)[:-1])
+        return self._splits
+
+    @property
+    def ss_within(self):
+        return float(self.ss.sum())
+
+    @property
+    def ss_between(self):
+        return float(np.dot(self.counts, (self.means - self.grand_mean) ** 2))
+
+    def samples(self, cap, seed=0):
+        """
+        Sampel acak bertingkat (stratified) per grup: grup dengan data lebih dari
+        cap diambil cap nilai tanpa pengembalian dengan seed tetap, grup kecil
+        dikirim utuh. Urutan nilai asli dipertahankan.
+        """
+        rng = np.random.default_rng(seed)
+        out = []
+        for values in self.splits():
+            if values.size > cap:
+                values = values[np.sort(rng.choice(values.size, cap, replace=False))]
+            out.append(values)
+        return out
+
+    def box_summaries(self):
+        """Ringkasan box plot (lihat box_summary) untuk setiap grup."""
+        return [box_summary(values, max_outliers=50) for values in self.splits()]
+
+
+def group_normality_table(index, alpha=0.05):
+    """Shapiro-Wilk per grup (format pg.normality)."""
+    rows = []
+    for values in index.splits():
+        if values.size >= 3:
+            w, p = stats.shapiro(values)
+        else:
+            w, p = np.nan, np.nan
+        rows.append({'W': float(w), 'pval': float(p), 'normal': bool(p > alpha)})
+    return pd.DataFrame(rows, index=index.labels)
+
+def group_levene_table(index, alpha=0.05):
+    """Levene berbasis median (format pg.homoscedasticity method='levene')."""
+    medians = np.array([np.median(g) for g in index.splits()])
+    z = GroupIndex(np.abs(index.values - medians[index.codes]), index.codes, index.labels)
+    df1, df2 = index.k - 1, index.n - index.k
+    with np.errstate(invalid='ignore', divide='ignore'):
+        w = (z.ss_between / df1) / (z.ss_within / df2)
+    p = float(stats.f.sf(w, df1, df2))
+    return pd.DataFrame({'W': [float(w)], 'pval': [p], 'equal_var': [bool(p > alpha)]}, index=['levene'])
+
+def oneway_anova_table(index, source):
+    """Tabel One-Way ANOVA detail dari statistik cukup (format pg.anova detailed=True)."""
+    ssb, ssw = index.ss_between, index.ss_within
+    dfb, dfw = index.k - 1, index.n - index.k
+    msb, msw = ssb / dfb, ssw / dfw
+    with np.errstate(invalid='ignore', divide='ignore'):
+        f = msb / msw
+    return pd.DataFrame({
+        'Source': [source, 'Within'],
+        'SS': [ssb, ssw], 'DF': [dfb, dfw], 'MS': [msb, msw],
+        'F': [float(f), np.nan], 'p-unc': [float(stats.f.sf(f, dfb, dfw)), np.nan],
+        'np2': [ssb / (ssb + ssw), np.nan]
+    })
+
+def kruskal_table(index, source):
+    """Kruskal-Wallis dari jumlah peringkat per grup dengan koreksi ties (format pg.kruskal)."""
+    ranks = stats.rankdata(index.values)
+    rank_sums = np.bincount(index.codes, weights=ranks, minlength=index.k)
+    n = index.n
+    h = 12.0 / (n * (n + 1)) * np.sum(rank_sums ** 2 / index.counts) - 3 * (n + 1)
+    _, ties = np.unique(index.values, return_counts=True)
+    correction = 1 - np.sum(ties ** 3 - ties) / (n ** 3 - n)
+    h = h / correction if correction > 0 else h
+    ddof1 = index.k - 1
+    return pd.DataFrame({'Source': [source], 'ddof1': [ddof1], 'H': [float(h)], 'p-unc': [float(stats.chi2.sf(h, ddof1))]}, index=['Kruskal'])
+
+# Kuadratur Gauss-Legendre tetap untuk distribusi studentized range
+_SRANGE_Z, _SRANGE_WZ = np.polynomial.legendre.leggauss(128)
+_SRANGE_X, _SRANGE_WX = np.polynomial.legendre.leggauss(96)
+_SRANGE_Z_RANGE = 8.5
+_SRANGE_W_MAX = 12.0  # P(range k normal baku > 12) dapat diabaikan
+_SRANGE_CHUNK = 128
+_SRANGE_DF_ASYMPTOTIC = 100_000  # seperti scipy: df sebesar ini dianggap tak hingga (s = 1)
+
+def studentized_range_sf(q, k, df):
+    """
+    Survival function distribusi studentized range untuk array q dan df
+    sekaligus (setara stats.studentized_range.sf, selisih < 1e-8). Integral
+    dalam (atas z) dan luar (atas log s, s = chi_df / sqrt(df)) memakai
+    node kuadratur tetap sehingga semua pasangan dihitung sebagai operasi
+    array, bukan integrasi adaptif per elemen.
+    """
+    q, df = np.broadcast_arrays(np.asarray(q, dtype=np.float64), np.asarray(df, dtype=np.float64))
+    shape = q.shape
+    q, df = q.ravel(), df.ravel()
+    z = _SRANGE_Z_RANGE * _SRANGE_Z
+    wz = _SRANGE_Z_RANGE * _SRANGE_WZ * stats.norm.pdf(z)
+    out = np.full(q.size, np.nan)
+    finite = ~(np.isnan(q) | np.isnan(df)) & (df > 0)
+    infinite = np.flatnonzero(finite & (df >= _SRANGE_DF_ASYMPTOTIC))
+    valid = np.flatnonzero(finite & (df < _SRANGE_DF_ASYMPTOTIC))
+
+    if infinite.size:
+        w = np.abs(q[infinite])
+        out[infinite] = 1 - k * ((special.ndtr(z) - special.ndtr(z - w[:, None])) ** (k - 1)) @ wz
+
+    for start in range(0, valid.size, _SRANGE_CHUNK):
+        idx = valid[start:start + _SRANGE_CHUNK]
+        qc, dc = np.abs(q[idx]), df[idx]
+        x_lo = np.log(stats.chi.ppf(1e-12, dc) / np.sqrt(dc))
+        x_hi = np.log(stats.chi.isf(1e-12, dc) / np.sqrt(dc))
+        with np.errstate(divide='ignore'):
+            x_hi = np.maximum(np.minimum(x_hi, np.log(_SRANGE_W_MAX / qc)), x_lo)
+        half = ((x_hi - x_lo) / 2)[:, None]
+        x = x_lo[:, None] + half * (_SRANGE_X + 1)
+        s = np.exp(x)
+        log_density = stats.chi.logpdf(s * np.sqrt(dc)[:, None], dc[:, None]) + 0.5 * np.log(dc)[:, None] + x
+        w = qc[:, None] * s
+        sf_normal = 1 - k * np.einsum('z,mnz->mn', wz, (special.ndtr(z) - special.ndtr(z - w[..., None])) ** (k - 1))
+        out[idx] = np.sum(sf_normal * np.exp(log_density) * half * _SRANGE_WX, axis=1)
+    return np.clip(out, 0, 1).reshape(shape)
+
+def _pair_indices(k):
+    return np.triu_indices(k, 1)
+
+def _pairwise_hedges(index, g1, g2):
+    n1, n2 = index.counts[g1], index.counts[g2]
+    pooled = np.sqrt(((n1 - 1) * index.vars[g1] + (n2 - 1) * index.vars[g2]) / (n1 + n2 - 2))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        d = (index.means[g1] - index.means[g2]) / pooled
+    return d * (1 - 3 / (4 * (n1 + n2) - 9))
+
+def tukey_table(index):
+    """Tukey HSD untuk semua pasangan sekaligus dari mean, n, dan MS within (format pg.pairwise_tukey)."""
+    g1, g2 = _pair_indices(index.k)
+    df = index.n - index.k
+    msw = index.ss_within / df
+    diff = index.means[g1] - index.means[g2]
+    se = np.sqrt(msw * (1.0 / index.counts[g1] + 1.0 / index.counts[g2]))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t = diff / se
+    p = np.clip(studentized_range_sf(np.sqrt(2) * np.abs(t), index.k, df), 0, 1)
+    labels = np.array(index.labels, dtype=object)
+    return pd.DataFrame({
+        'A': labels[g1], 'B': labels[g2],
+        'mean(A)': index.means[g1], 'mean(B)': index.means[g2],
+        'diff': diff, 'se': se, 'T': t, 'p-tukey': p,
+        'hedges': _pairwise_hedges(index, g1, g2)
+    })
+
+def gameshowell_table(index):
+    """Games-Howell untuk semua pasangan sekaligus dari mean, varians, dan n (format pg.pairwise_gameshowell)."""
+    g1, g2 = _pair_indices(index.k)
+    v1 = index.vars[g1] / index.counts[g1]
+    v2 = index.vars[g2] / index.counts[g2]
+    diff = index.means[g1] - index.means[g2]
+    se = np.sqrt(v1 + v2)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t = diff / se
+        df = (v1 + v2) ** 2 / (v1 ** 2 / (index.counts[g1] - 1) + v2 ** 2 / (index.counts[g2] - 1))
+    p = np.clip(studentized_range_sf(np.sqrt(2) * np.abs(t), index.k, df), 0, 1)
+    labels = np.array(index.labels, dtype=object)
+    return pd.DataFrame({
+        'A': labels[g1], 'B': labels[g2],
+        'mean(A)': index.means[g1], 'mean(B)': index.means[g2],
+        'diff': diff, 'se': se, 'T': t, 'df': df, 'pval': p,
+        'hedges': _pairwise_hedges(index, g1, g2)
+    })
+
+def group_describe_table(index, label_columns):
+    """
+    Statistik deskriptif per grup (format groupby().describe().reset_index()).
+    label_columns: {nama_kolom: list label per grup}.
+    """
+    quartiles = np.array([np.quantile(g, [0.25, 0.5, 0.75]) for g in index.splits()])
+    mins = np.array([g.min() for g in index.splits()])
+    maxs = np.array([g.max() for g in index.splits()])
+    return pd.DataFrame({
+        **label_columns,
+        'count': index.counts.astype(np.float64), 'mean': index.means, 'std': np.sqrt(index.vars),
+        'min': mins, '25%': quartiles[:, 0], '50%': quartiles[:, 1], '75%': quartiles[:, 2], 'max': maxs
+    })
+
+def _cell_rss(cells, design):
+    """RSS model aditif dari statistik sel: SS within + SS tertimbang mean sel terhadap nilai fit."""
+    weights = np.sqrt(cells.counts)
+    coef, *_ = np.linalg.lstsq(design * weights[:, None], cells.means * weights, rcond=None)
+    resid = cells.means - design @ coef
+    return cells.ss_within + float(np.dot(cells.counts, resid * resid))
+
+def twoway_anova_table(values, factor1, factor2, iv1, iv2):
+    """
+    Two-Way ANOVA tipe II (format pg.anova between=[iv1, iv2] detailed=True).
+    SS dihitung dari statistik sel (n, mean, SS within) dengan regresi
+    tertimbang pada matriks desain berukuran jumlah sel, bukan jumlah baris.
+    Mengembalikan (tabel, GroupIndex sel, kode level faktor 1 & 2 per sel, label 1, label 2).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    codes1, labels1 = pd.factorize(factor1, sort=True)
+    codes2, labels2 = pd.factorize(factor2, sort=True)
+    keep = (codes1 >= 0) & (codes2 >= 0) & ~np.isnan(values)
+    values, codes1, codes2 = values[keep], codes1[keep], codes2[keep]
+    if values.size == 0:
+        raise ValueError('Tidak ada data valid untuk dianalisis.')
+
+    cell_codes, cell_keys = pd.factorize(codes1 * len(labels2) + codes2, sort=True)
+    cell_keys = np.asarray(cell_keys)
+    cells = GroupIndex(values, cell_codes, [str(k) for k in cell_keys])
+    level1, level2 = cell_keys // len(labels2), cell_keys % len(labels2)
+    used1, level1 = np.unique(level1, return_inverse=True)
+    used2, level2 = np.unique(level2, return_inverse=True)
+    a, b = used1.size, used2.size
+
+    intercept = np.ones((cells.k, 1))
+    dummies1 = np.eye(a)[level1][:, 1:]
+    dummies2 = np.eye(b)[level2][:, 1:]
+    rss_a = _cell_rss(cells, np.hstack([intercept, dummies1]))
+    rss_b = _cell_rss(cells, np.hstack([intercept, dummies2]))
+    rss_ab = _cell_rss(cells, np.hstack([intercept, dummies1, dummies2]))
+    ss_res = cells.ss_within
+
+    ss = np.array([rss_b - rss_ab, rss_a - rss_ab, rss_ab - ss_res, ss_res])
+    dof = np.array([a - 1, b - 1, cells.k - a - b + 1, cells.n - cells.k])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ms = ss / dof
+        f = ms[:3] / ms[3]
+        p = stats.f.sf(f, dof[:3], dof[3])
+        np2 = ss[:3] / (ss[:3] + ss_res)
+    table = pd.DataFrame({
+        'Source': [iv1, iv2, f'{iv1} * {iv2}', 'Residual'],
+        'SS': ss, 'DF': dof, 'MS': ms,
+        'F': list(f) + [np.nan], 'p-unc': list(p) + [np.nan], 'np2': list(np2) + [np.nan]
+    })
+    labels1 = [labels1[i] for i in used1]
+    labels2 = [labels2[i] for i in used2]
+    return table, cells, level1, level2, labels1, labels2
+
+
+# =========================================================================
+# KORELASI DAN REGRESI
+# Matriks korelasi dihitung sebagai perkalian matriks atas seluruh kolom
+# sekaligus (bukan loop per pasangan kolom), sehingga tetap cepat untuk
+# ratusan kolom.
+# =========================================================================
+CORRELATION_METHODS = ('pearson', 'spearman')
+
+def _correlation_p(r, n):
+    """p-value dua sisi uji t untuk r dengan df = n - 2 (elemen per elemen)."""
+    df = n - 2.0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t = np.abs(r) * np.sqrt(df / np.clip(1.0 - r * r, 0.0, None))
+        p = 2 * stats.t.sf(t, df)
+    p[np.abs(r) >= 1.0] = 0.0
+    p[df < 1] = np.nan
+    return p
+
+def correlation_matrix(matrix, method='pearson', missing='pairwise'):
+    """
+    Matriks korelasi Pearson/Spearman beserta p-value dan n untuk semua
+    pasangan kolom. missing='pairwise' memakai semua baris yang lengkap untuk
+    tiap pasangan (dihitung dengan perkalian matriks mask); 'listwise' hanya
+    baris tanpa NaN. Spearman selalu listwise karena peringkat harus dihitung
+    atas baris yang sama untuk semua kolom.
+    Mengembalikan dict berisi matriks r, p, dan n (ndarray k x k).
+    """
+    if method not in CORRELATION_METHODS:
+        raise ValueError(f"Metode korelasi tidak dikenal: {method}")
+    matrix = np.asarray(matrix, dtype=np.float64)
+    valid = ~np.isnan(matrix)
+    if method == 'spearman' or missing == 'listwise':
+        missing = 'listwise'
+        matrix = matrix[valid.all(axis=1)]
+        valid = np.ones(matrix.shape, dtype=bool)
+    if method == 'spearman':
+        matrix = stats.rankdata(matrix, axis=0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if valid.all():
+            n = np.full((matrix.shape[1],) * 2, float(matrix.shape[0]))
+            z = matrix - matrix.mean(axis=0)
+            z /= np.sqrt(np.einsum('ij,ij->j', z, z))
+            r = z.T @ z
+        else:
+            # Jumlah per pasangan dari baris yang valid di kedua kolom; kolom dipusatkan
+            # terlebih dahulu agar selisih jumlah kuadrat tidak kehilangan presisi
+            mask = valid.astype(np.float64)
+            centered = np.where(valid, matrix - np.nanmean(matrix, axis=0), 0.0)
+            n = mask.T @ mask
+            sx = centered.T @ mask
+            sxx = (centered * centered).T @ mask
+            cov = centered.T @ centered - sx * sx.T / n
+            var = sxx - sx * sx / n
+            r = cov / np.sqrt(var * var.T)
+    r = np.clip(r, -1.0, 1.0)
+    np.fill_diagonal(r, np.where(np.diag(n) >= 2, 1.0, np.nan))
+    return {'method': method, 'missing': missing, 'r': r, 'p': _correlation_p(r, n), 'n': n.astype(np.int64)}
+
+def _vif(x):
+    """VIF semua prediktor sekaligus: diagonal invers matriks korelasi prediktor."""
+    if x.shape[1] == 1:
+        return np.ones(1)
+    try:
+        return np.diag(np.linalg.inv(np.corrcoef(x, rowvar=False)))
+    except np.linalg.LinAlgError:
+        return np.full(x.shape[1], np.inf)
+
+def ols_regression(y, x, names, confidence=0.95, residual_sample=500, seed=0):
+    """
+    Regresi linear berganda (OLS, statsmodels) dengan baris ber-NaN dibuang
+    (listwise). Mengembalikan dict: koefisien (B, SE, beta terstandar, t, p,
+    CI, VIF), ringkasan model, diagnostik (Durbin-Watson, Jarque-Bera,
+    Breusch-Pagan, condition number), dan sampel residual vs fitted untuk plot.
+    """
+    y = np.asarray(y, dtype=np.float64).ravel()
+    x = np.asarray(x, dtype=np.float64).reshape(y.size, -1)
+    keep = ~(np.isnan(y) | np.isnan(x).any(axis=1))
+    y, x = y[keep], x[keep]
+    n, k = x.shape
+    if n <= k + 1:
+        raise ValueError(f'Jumlah data valid ({n}) harus lebih besar dari jumlah prediktor + 1 ({k + 1}).')
+
+    exog = sm.add_constant(x, has_constant='add')
+    fit = sm.OLS(y, exog).fit()
+    ci = fit.conf_int(alpha=1 - confidence)
+    sd_x, sd_y = x.std(axis=0, ddof=1), y.std(ddof=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        beta = np.concatenate([[np.nan], fit.params[1:] * sd_x / sd_y])
+    vif = np.concatenate([[np.nan], _vif(x)])
+    coefficients = [
+        {'term': term, 'B': float(fit.params[i]), 'se': float(fit.bse[i]), 'beta': float(beta[i]),
+         't': float(fit.tvalues[i]), 'p': float(fit.pvalues[i]),
+         'ci_lower': float(ci[i, 0]), 'ci_upper': float(ci[i, 1]), 'vif': float(vif[i])}
+        for i, term in enumerate(['(Konstanta)', *names])
+    ]
+
+    resid = fit.resid
+    jb, jb_p, skew, kurtosis = sm_stattools.jarque_bera(resid)
+    bp_lm, bp_p, bp_f, bp_f_p = sm_diagnostic.het_breuschpagan(resid, exog)
+    rng = np.random.default_rng(seed)
+    sample = np.sort(rng.choice(n, residual_sample, replace=False)) if n > residual_sample else np.arange(n)
+    return {
+        'coefficients': coefficients,
+        'model': {
+            'n': int(n), 'k': int(k), 'r': float(np.sqrt(max(fit.rsquared, 0.0))),
+            'r2': float(fit.rsquared), 'adj_r2': float(fit.rsquared_adj),
+            'se_estimate': float(np.sqrt(fit.mse_resid)),
+            'F': float(fit.fvalue), 'p': float(fit.f_pvalue),
+            'df_model': float(fit.df_model), 'df_resid': float(fit.df_resid),
+            'aic': float(fit.aic), 'bic': float(fit.bic),
+        },
+        'diagnostics': {
+            'durbin_watson': float(sm_stattools.durbin_watson(resid)),
+            'jarque_bera': {'statistic': float(jb), 'p': float(jb_p), 'skew': float(skew), 'kurtosis': float(kurtosis)},
+            'breusch_pagan': {'lm': float(bp_lm), 'p': float(bp_p), 'F': float(bp_f), 'f_p': float(bp_f_p)},
+            'condition_number': float(fit.condition_number),
+            'max_vif': float(np.max(vif[1:])),
+        },
+        'residuals': {'fitted': fit.fittedvalues[sample].tolist(), 'residual': resid[sample].tolist()},
+    }
@@ -0,0 +1,92 @@
+# ========================================================================
+# File: app/weasy_engine.py
+# Deskripsi: Renderer PDF berbasis HTML/CSS (WeasyPrint) untuk ekspor yang
+#            mempertahankan format editor. Konfigurasi font, stylesheet
+#            hasil parsing, dan logo disimpan hangat per worker karena
+#            inisialisasi WeasyPrint dari awal cukup mahal.
+# ========================================================================
+
+import base64
+import io
+from functools import lru_cache
+from html import escape
+
+from app.export_engine import get_logo_bytes
+from app.lazy import LazyModule, module_available
+
+# WeasyPrint baru diimpor saat ekspor pertama atau preload(); pustaka sistem
+# (Pango/Cairo) yang hilang baru terdeteksi sebagai OSError saat itu
+WEASYPRINT_ENABLED = module_available('weasyprint')
+if not WEASYPRINT_ENABLED:
+    print("PERINGATAN: Library 'weasyprint' tidak dapat dimuat. Ekspor PDF berbasis HTML tidak akan berfungsi.")
+weasyprint = LazyModule('weasyprint')
+weasy_fonts = LazyModule('weasyprint.text.fonts')
+
+EXPORT_CSS = """
+@page {
+    size: Letter;
+    margin: 2.5cm 2.5cm 2.5cm 3cm;
+    @bottom-center { content: counter(page); font-size: 9pt; color: #555; }
+}
+body { font-family: 'Times New Roman', 'DejaVu Serif', serif; font-size: 12pt; line-height: 1.5; color: #111; }
+.logo { float: right; width: 1.5in; }
+h1.doc-title { font-size: 18pt; margin: 0 0 18pt 0; }
+h1, h2, h3, h4 { font-family: 'Helvetica', 'DejaVu Sans', sans-serif; page-break-after: avoid; }
+h2 { font-size: 15pt; } h3 { font-size: 13pt; } h4 { font-size: 12pt; }
+p { margin: 0 0 8pt 0; text-align: justify; orphans: 2; widows: 2; }
+ul, ol { margin: 0 0 8pt 0; padding-left: 18pt; }
+li { margin-bottom: 4pt; }
+blockquote { margin: 0 0 8pt 18pt; font-style: italic; }
+table { border-collapse: collapse; width: 100%; margin-bottom: 8pt; }
+td, th { border: 1px solid #999; padding: 4pt; }
+img { max-width: 100%; }
+"""
+
+
+@lru_cache(maxsize=1)
+def get_font_config():
+    """FontConfiguration WeasyPrint, dibuat sekali per worker."""
+    return weasy_fonts.FontConfiguration()
+
+@lru_cache(maxsize=1)
+def get_stylesheet():
+    """Stylesheet ekspor yang sudah di-parse, dibuat sekali per worker."""
+    return weasyprint.CSS(string=EXPORT_CSS, font_config=get_font_config())
+
+@lru_cache(maxsize=1)
+def get_logo_data_uri():
+    logo_bytes = get_logo_bytes()
+    if logo_bytes is None:
+        return None
+    return "data:image/png;base64," + base64.b64encode(logo_bytes).decode('ascii')
+
+def _safe_url_fetcher(url, *args, **kwargs):
+    """Hanya data URI yang boleh dimuat; konten editor tidak boleh memicu request jaringan/berkas."""
+    if not url.startswith('data:'):
+        raise ValueError(f"Sumber eksternal tidak diizinkan dalam ekspor: {url[:80]}")
+    return weasyprint.default_url_fetcher(url, *args, **kwargs)
+
+def build_export_html(title, html_content):
+    logo_uri = get_logo_data_uri()
+    logo = f'<img class="logo" src="{logo_uri}" alt="">' if logo_uri else ''
+    return (
+        '<!DOCTYPE html><html lang="id"><head><meta charset="utf-8">'
+        f'<title>{escape(title)}</title></head><body>'
+        f'{logo}<h1 class="doc-title">{escape(title)}</h1>{html_content}</body></html>'
+    )
+
+def render_weasy_pdf(buffer, title, html_content):
+    document = weasyprint.HTML(string=build_export_html(title, html_content), url_fetcher=_safe_url_fetcher)
+    document.write_pdf(buffer, stylesheets=[get_stylesheet()], font_config=get_font_config())
+
+def preload():
+    """
+    Memanaskan cache WeasyPrint (fontconfig, stylesheet, logo, dan layout
+    pertama). Dipanggil saat worker gunicorn selesai boot.
+    """
+    if not WEASYPRINT_ENABLED:
+        return
+    get_font_config()
+    get_stylesheet()
+    get_logo_data_uri()
+    render_weasy_pdf(io.BytesIO(), 'Preload', '<p>OnThesis</p>')
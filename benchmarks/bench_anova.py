@@ -0,0 +1,93 @@
+# ========================================================================
+# File: benchmarks/bench_anova.py
+# Deskripsi: Membandingkan waktu end-to-end analisis ANOVA versi pingouin
+#            (setiap langkah mengelompokkan ulang DataFrame) dengan versi
+#            GroupIndex di app/stats_engine.py (faktorisasi sekali).
+#            Jalankan dari root repo: python benchmarks/bench_anova.py [n] [k] [ulang]
+# ========================================================================
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pingouin as pg
+
+# Root repo di sys.path agar modul diimpor lewat paket app (paket Flask ikut diinisialisasi)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app import stats_engine  # noqa: E402
+
+
+# Jalur endpoint: prasyarat, omnibus (ANOVA dan Kruskal), satu uji post-hoc, deskriptif, data plot
+def oneway_pingouin(df):
+    pg.normality(data=df, dv='y', group='g')
+    pg.homoscedasticity(data=df, dv='y', group='g', method='levene')
+    pg.anova(data=df, dv='y', between='g', detailed=True)
+    pg.kruskal(data=df, dv='y', between='g')
+    pg.pairwise_tukey(data=df, dv='y', between='g')
+    desc = df.groupby('g', observed=True)['y'].describe().reset_index()
+    [df['y'][df['g'] == g] for g in desc['g']]
+
+def oneway_engine(df):
+    index = stats_engine.GroupIndex.from_factor(df['y'].to_numpy(), df['g'])
+    stats_engine.group_normality_table(index)
+    stats_engine.group_levene_table(index)
+    stats_engine.oneway_anova_table(index, 'g')
+    stats_engine.kruskal_table(index, 'g')
+    stats_engine.tukey_table(index)
+    stats_engine.group_describe_table(index, {'g': index.labels})
+
+def twoway_pingouin(df):
+    df = df.copy()
+    df['g_h'] = df['g'].astype(str) + '_' + df['h'].astype(str)
+    pg.normality(data=df, dv='y', group='g')
+    pg.homoscedasticity(data=df, dv='y', group='g_h', method='levene')
+    pg.anova(data=df.drop(columns=['g_h']), dv='y', between=['g', 'h'], detailed=True)
+    df.groupby(['g', 'h'], observed=True)['y'].describe().reset_index()
+
+def twoway_engine(df):
+    aov, cells, level1, level2, labels1, labels2 = stats_engine.twoway_anova_table(df['y'].to_numpy(), df['g'], df['h'], 'g', 'h')
+    stats_engine.group_normality_table(stats_engine.GroupIndex(cells.values, level1[cells.codes], labels1))
+    stats_engine.group_levene_table(cells)
+    stats_engine.group_describe_table(cells, {'g': [labels1[i] for i in level1], 'h': [labels2[i] for i in level2]})
+
+def bench(name, fn, df, repeats):
+    fn(df)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(df)
+    elapsed = (time.perf_counter() - start) / repeats
+    print(f"{name:<20} {elapsed * 1000:9.2f} ms/analisis")
+    return elapsed
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 6
+    repeats = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    rng = np.random.default_rng(42)
+    df = pd.DataFrame({
+        'y': rng.normal(50, 10, n),
+        'g': pd.Categorical(rng.integers(0, k, n).astype(str)),
+        'h': pd.Categorical(rng.integers(0, 3, n).astype(str)),
+    })
+    # Sedikit ketidakseimbangan agar pingouin memakai jalur tipe II (statsmodels)
+    df = df.iloc[: n - n // 7].reset_index(drop=True)
+
+    print(f"n={len(df)}, k={k}, {repeats} pengulangan")
+    base = bench("one-way pingouin", oneway_pingouin, df, repeats)
+    fast = bench("one-way GroupIndex", oneway_engine, df, repeats)
+    print(f"{'':<20} {base / fast:9.1f}x lebih cepat")
+    base = bench("two-way pingouin", twoway_pingouin, df, repeats)
+    fast = bench("two-way GroupIndex", twoway_engine, df, repeats)
+    print(f"{'':<20} {base / fast:9.1f}x lebih cepat")
+
+    # Pemeriksaan kesetaraan hasil
+    index = stats_engine.GroupIndex.from_factor(df['y'].to_numpy(), df['g'])
+    ours = stats_engine.oneway_anova_table(index, 'g')
+    theirs = pg.anova(data=df, dv='y', between='g', detailed=True)
+    print("selisih F one-way:", abs(ours['F'].iloc[0] - theirs['F'].iloc[0]))
+    ours = stats_engine.twoway_anova_table(df['y'].to_numpy(), df['g'], df['h'], 'g', 'h')[0]
+    theirs = pg.anova(data=df, dv='y', between=['g', 'h'], detailed=True)
+    print("selisih SS two-way:", np.abs(ours['SS'].to_numpy() - theirs['SS'].to_numpy()).max())
@@ -0,0 +1,72 @@
+# ========================================================================
+# File: benchmarks/bench_binary_payload.py
+# Deskripsi: Membandingkan waktu decode body request analisis (beberapa
+#            grup angka) dari JSON (parse + konversi ke float64) dengan
+#            MessagePack ext type dan Arrow IPC (app/binary_payload.py),
+#            beserta ukuran body masing-masing.
+#            Jalankan dari root repo: python benchmarks/bench_binary_payload.py [n_per_grup] [grup] [ulang]
+# ========================================================================
+
+import json
+import os
+import sys
+import time
+
+import msgpack
+import numpy as np
+import pyarrow as pa
+
+# binary_payload hanya butuh Flask untuk fungsi berbasis request; decode murni dipakai langsung
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app import binary_payload  # noqa: E402
+
+
+def encode_json(groups):
+    return json.dumps({'groups': [g.tolist() for g in groups], 'confidence_level': 95}).encode('utf-8')
+
+def encode_msgpack(groups):
+    return binary_payload.encode_msgpack({'groups': groups, 'confidence_level': 95})
+
+def encode_arrow(groups):
+    table = pa.table({f'groups.{i}': g for i, g in enumerate(groups)})
+    table = table.replace_schema_metadata({'params': json.dumps({'confidence_level': 95})})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+# Jalur endpoint: decode body lalu setiap grup menjadi array float64
+def decode_json(body):
+    data = json.loads(body)
+    return [np.asarray(g, dtype=np.float64) for g in data['groups']]
+
+def decode_msgpack(body):
+    return [np.asarray(g, dtype=np.float64) for g in binary_payload.decode_msgpack(body)['groups']]
+
+def decode_arrow(body):
+    return [np.asarray(g, dtype=np.float64) for g in binary_payload.decode_arrow(body)['groups']]
+
+def bench(name, fn, body, repeats):
+    fn(body)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(body)
+    elapsed = (time.perf_counter() - start) / repeats
+    print(f"{name:<12} {len(body) / 1024:10.1f} KB {elapsed * 1000:9.2f} ms/request")
+    return elapsed
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    repeats = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    rng = np.random.default_rng(42)
+    groups = [rng.normal(50, 10, n) for _ in range(k)]
+
+    print(f"{k} grup x {n} nilai, {repeats} pengulangan")
+    base = bench("JSON", decode_json, encode_json(groups), repeats)
+    for name, encode, decode in (("MessagePack", encode_msgpack, decode_msgpack), ("Arrow IPC", encode_arrow, decode_arrow)):
+        body = encode(groups)
+        elapsed = bench(name, decode, body, repeats)
+        print(f"{'':<12} {base / elapsed:22.1f}x lebih cepat")
+        assert all(np.array_equal(a, b) for a, b in zip(decode(body), groups))
@@ -0,0 +1,58 @@
+# ========================================================================
+# File: benchmarks/bench_export_engines.py
+# Deskripsi: Membandingkan mesin ekspor PDF ReportLab dan WeasyPrint pada
+#            dokumen seukuran satu bab (heading, paragraf panjang, list).
+#            Jalankan dari root repo: python benchmarks/bench_export_engines.py
+# ========================================================================
+
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.export_engine import render_pdf, PDF_EXPORT_ENABLED
+from app.weasy_engine import render_weasy_pdf, preload, WEASYPRINT_ENABLED
+
+PARAGRAPH = (
+    "Penelitian ini bertujuan untuk menganalisis <b>pengaruh media sosial</b> terhadap "
+    "perilaku belajar mahasiswa. Data dikumpulkan melalui kuesioner daring dan dianalisis "
+    "menggunakan <i>regresi linear berganda</i> (Santoso, 2021). "
+) * 4
+
+
+def build_chapter(sections=12, paragraphs_per_section=8):
+    parts = []
+    for i in range(sections):
+        parts.append(f"<h3>{chr(65 + i % 26)}. Sub-bab {i + 1}</h3>")
+        for _ in range(paragraphs_per_section):
+            parts.append(f"<p>{PARAGRAPH}</p>")
+        parts.append("<ul>" + "".join(f"<li>Poin pembahasan {j + 1}</li>" for j in range(4)) + "</ul>")
+    return "".join(parts)
+
+
+def run(name, render, html, repeats):
+    timings = []
+    size = 0
+    for _ in range(repeats):
+        buffer = io.BytesIO()
+        start = time.perf_counter()
+        render(buffer, "Bab II Kajian Teori", html)
+        timings.append(time.perf_counter() - start)
+        size = buffer.tell()
+    print(f"{name:<12} pertama={timings[0] * 1000:8.1f} ms  "
+          f"hangat(min)={min(timings[1:] or timings) * 1000:8.1f} ms  ukuran={size / 1024:8.1f} KB")
+
+
+if __name__ == '__main__':
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    html = build_chapter()
+    print(f"Dokumen uji: {len(html) / 1024:.1f} KB HTML, {repeats} kali render per mesin")
+    if PDF_EXPORT_ENABLED:
+        run("ReportLab", render_pdf, html, repeats)
+    if WEASYPRINT_ENABLED:
+        start = time.perf_counter()
+        preload()
+        print(f"{'(preload)':<12} {(time.perf_counter() - start) * 1000:8.1f} ms")
+        run("WeasyPrint", render_weasy_pdf, html, repeats)
@@ -0,0 +1,75 @@
+# ========================================================================
+# File: benchmarks/bench_import_time.py
+# Deskripsi: Mengukur biaya impor pustaka berat yang kini ditunda lewat
+#            app/lazy.py, dibandingkan dengan impor modul aplikasi yang
+#            memakainya. Setiap impor dijalankan di subprocess baru dengan
+#            `python -X importtime` (waktu kumulatif) dan waktu dinding
+#            proses. Modul yang tidak terpasang dilewati. Modul aplikasi
+#            diimpor sebagai app.<modul>; waktu impornya dibaca dari baris
+#            modul itu sendiri, sedangkan waktu proses ikut memuat paket app.
+#            Jalankan dari root repo: python benchmarks/bench_import_time.py [ulang]
+# ========================================================================
+
+import os
+import re
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Pustaka yang sebelumnya diimpor saat modul aplikasi dimuat
+HEAVY_MODULES = [
+    'scipy.stats', 'scipy.special', 'statsmodels.api', 'PyPDF2', 'lxml.etree',
+    'reportlab.platypus', 'docx', 'weasyprint', 'google.generativeai',
+    'midtransclient', 'pyarrow', 'matplotlib.pyplot', 'seaborn',
+]
+# Modul aplikasi yang memakai impor malas (root repo di PYTHONPATH)
+APP_MODULES = ['app.stats_engine', 'app.binary_payload']
+
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+\d+\s+\|\s+(\d+)\s+\|\s+(.*)$')
+
+
+def measure(module, extra_path=None, repeat=3):
+    """(detik kumulatif dari -X importtime, detik dinding proses) terbaik dari beberapa ulangan, atau None jika gagal."""
+    env = dict(os.environ)
+    if extra_path:
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [extra_path, env.get('PYTHONPATH')]))
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                              env=env, capture_output=True, text=True)
+        wall = time.perf_counter() - start
+        if proc.returncode != 0:
+            return None
+        cumulative = 0
+        for line in proc.stderr.splitlines():
+            match = _IMPORTTIME_LINE.match(line)
+            if match and match.group(2).strip() == module:
+                # Baris pertama = pemuatan modul sebenarnya (baris terakhir hanya pembungkus paket induk)
+                cumulative = int(match.group(1)) / 1e6
+                break
+        if best is None or wall < best[1]:
+            best = (cumulative, wall)
+    return best
+
+
+def report(title, modules, extra_path=None, repeat=3):
+    print(title)
+    for module in modules:
+        result = measure(module, extra_path, repeat)
+        if result is None:
+            print(f"  {module:<22} (tidak terpasang, dilewati)")
+            continue
+        cumulative, wall = result
+        print(f"  {module:<22} {cumulative * 1000:8.1f} ms impor  {wall * 1000:8.1f} ms proses")
+    print()
+
+
+if __name__ == '__main__':
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    baseline = measure('os', repeat=repeat)
+    print(f"Interpreter kosong: {baseline[1] * 1000:.1f} ms proses\n")
+    report('Pustaka berat (biaya yang sebelumnya dibayar saat impor aplikasi):', HEAVY_MODULES, repeat=repeat)
+    report('Modul aplikasi dengan impor malas:', APP_MODULES, ROOT, repeat)
@@ -0,0 +1,39 @@
+# ========================================================================
+# File: benchmarks/bench_stats_engine.py
+# Deskripsi: Benchmark mesin statistik (app/stats_engine.py) tanpa Flask.
+#            Jalankan dari root repo: python benchmarks/bench_stats_engine.py
+# ========================================================================
+
+import os
+import sys
+import time
+
+import numpy as np
+
+# Root repo di sys.path agar modul diimpor lewat paket app (paket Flask ikut diinisialisasi)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app import stats_engine  # noqa: E402
+
+
+def bench(name, fn, repeats):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    elapsed = (time.perf_counter() - start) / repeats
+    print(f"{name:<22} {elapsed * 1000:9.3f} ms/panggilan")
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    rng = np.random.default_rng(42)
+    a = rng.normal(70, 10, n).tolist()
+    b = rng.normal(73, 12, n).tolist()
+    c = rng.normal(68, 9, n).tolist()
+    print(f"n={n} per grup, {repeats} pengulangan")
+    bench("normality", lambda: stats_engine.normality(a), repeats)
+    bench("levene", lambda: stats_engine.levene([a, b, c]), repeats)
+    bench("bartlett", lambda: stats_engine.bartlett([a, b, c]), repeats)
+    bench("independent_ttest", lambda: stats_engine.independent_ttest(a, b), repeats)
+    bench("paired_ttest", lambda: stats_engine.paired_ttest(a, b), repeats)
@@ -0,0 +1,56 @@
+# ========================================================================
+# File: benchmarks/bench_xlsx_ingest.py
+# Deskripsi: Membandingkan pembacaan dua kolom (nilai + grup) dari XLSX
+#            ekspor formulir yang lebar: pd.read_excel (jalur lama) vs
+#            pembaca streaming app/ingest.py, beserta waktu preview header.
+#            File uji dibuat dengan openpyxl (shared strings, seperti ekspor
+#            Google Forms).
+#            Jalankan dari root repo: python benchmarks/bench_xlsx_ingest.py [baris] [kolom_tambahan]
+# ========================================================================
+
+import io
+import os
+import sys
+import time
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ingest import preview_table, read_table
+
+
+def build_workbook(rows, extra_columns):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = 'Form Responses 1'
+    sheet.append(['Timestamp', 'Kelas', 'Nilai'] + [f'Pertanyaan {i + 1}' for i in range(extra_columns)])
+    rng = np.random.default_rng(42)
+    for i in range(rows):
+        sheet.append([f'2024-01-{i % 28 + 1:02d}', 'ABC'[i % 3], float(rng.normal(70, 10))]
+                     + [f'Jawaban {j % 5}' for j in range(extra_columns)])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    extra = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    data = build_workbook(rows, extra)
+    print(f"{rows} baris x {extra + 3} kolom, {len(data) / 1024 / 1024:.1f} MB")
+
+    old, old_time = timed(lambda: pd.read_excel(io.BytesIO(data), usecols=['Nilai', 'Kelas'], dtype={'Kelas': str}))
+    new, new_time = timed(lambda: read_table(io.BytesIO(data), 'bench.xlsx', numeric_columns=['Nilai'], categorical_columns=['Kelas']))
+    preview, preview_time = timed(lambda: preview_table(io.BytesIO(data), 'bench.xlsx'))
+    print(f"pd.read_excel        {old_time * 1000:9.1f} ms")
+    print(f"streaming (ingest)   {new_time * 1000:9.1f} ms   {old_time / new_time:.1f}x lebih cepat")
+    print(f"preview header       {preview_time * 1000:9.1f} ms   ({len(preview['columns'])} kolom, {preview['n_preview_rows']} baris)")
+    assert np.allclose(old['Nilai'].to_numpy(), new['Nilai'].to_numpy())
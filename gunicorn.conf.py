@@ -0,0 +1,27 @@
+# ========================================================================
+# File: gunicorn.conf.py
+# Deskripsi: Konfigurasi gunicorn (dibaca otomatis dari direktori kerja).
+#            Hook post_worker_init memanaskan cache yang mahal dibuat agar
+#            request pertama di setiap worker tidak menanggung biayanya:
+#            impor pustaka berat yang ditunda (app/lazy.py, diatur lewat env
+#            LAZY_WARM_UP) dan cache WeasyPrint.
+# ========================================================================
+
+def post_worker_init(worker):
+    try:
+        from app.lazy import warm_up_from_env
+        timings = warm_up_from_env()
+        loaded = ', '.join(f"{name} {seconds:.2f}s" for name, seconds in timings.items() if seconds is not None)
+        failed = [name for name, seconds in timings.items() if seconds is None]
+        worker.log.info(f"Modul malas dipanaskan: {loaded or '-'}")
+        if failed:
+            worker.log.warning(f"Modul malas gagal diimpor: {', '.join(failed)}")
+    except Exception as e:
+        worker.log.warning(f"Gagal memanaskan modul malas: {e}")
+
+    try:
+        from app.weasy_engine import preload
+        preload()
+        worker.log.info("Cache WeasyPrint berhasil dipanaskan.")
+    except Exception as e:
+        worker.log.warning(f"Gagal memanaskan cache WeasyPrint: {e}")
@@ -0,0 +1,77 @@
+# ========================================================================
+# File: tests/test_batch_analysis.py
+# Deskripsi: Setiap jenis uji batch harus terpetakan ke fungsi stats_engine
+#            dan dapat dijalankan dari spec hingga hasil; spec dengan kolom
+#            tidak dikenal hanya menggagalkan dirinya sendiri.
+# ========================================================================
+
+import numpy as np
+import pandas as pd
+
+from app.batch_analysis import BATCH_FUNCTIONS, BATCH_TESTS, plan_batch, run_batch
+
+
+def _frame():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'a': rng.normal(10, 2, 60),
+        'b': rng.normal(11, 2, 60),
+        'grup': np.repeat(['x', 'y'], 30),
+    })
+
+
+def test_every_batch_test_resolves_to_a_function():
+    assert set(BATCH_TESTS) == set(BATCH_FUNCTIONS)
+    for test in BATCH_TESTS:
+        assert callable(BATCH_FUNCTIONS[test]), test
+
+
+def test_every_batch_test_runs():
+    df = _frame()
+    specs = []
+    for test in BATCH_TESTS:
+        if test in ('levene', 'bartlett', 'independent_ttest'):
+            specs.append({'id': test, 'test': test, 'columns': ['a'], 'params': {'group_column': 'grup'}})
+        elif test == 'paired_ttest':
+            specs.append({'id': test, 'test': test, 'columns': ['a', 'b']})
+        else:
+            specs.append({'id': test, 'test': test, 'columns': ['a']})
+
+    tasks, errors = plan_batch(specs, lambda columns: df[columns], df.columns)
+    assert errors == []
+    results = {r['id']: r for r in run_batch(tasks)}
+    assert set(results) == set(BATCH_TESTS)
+    for test, result in results.items():
+        assert result['status'] == 'success', (test, result.get('error'))
+
+
+def test_unknown_test_is_rejected():
+    df = _frame()
+    tasks, errors = plan_batch([{'id': 'x', 'test': 'to_dict', 'columns': ['a']}], lambda columns: df[columns], df.columns)
+    assert tasks == []
+    assert errors[0]['status'] == 'error'
+
+
+def test_spec_with_unknown_column_does_not_fail_the_batch():
+    df = _frame()
+    loaded = []
+
+    def load_columns(columns):
+        loaded.extend(columns)
+        return df[columns]
+
+    specs = [
+        {'id': 'baik', 'test': 'descriptive', 'columns': ['a']},
+        {'id': 'salah-ketik', 'test': 'normality', 'columns': ['a', 'bb']},
+        {'id': 'grup-salah', 'test': 'levene', 'columns': ['b'], 'params': {'group_column': 'gurp'}},
+        {'id': 'baik-2', 'test': 'independent_ttest', 'columns': ['b'], 'params': {'group_column': 'grup'}},
+    ]
+    tasks, errors = plan_batch(specs, load_columns, df.columns)
+
+    assert {e['id'] for e in errors} == {'salah-ketik', 'grup-salah'}
+    assert all(e['status'] == 'error' for e in errors)
+    assert 'bb' in next(e for e in errors if e['id'] == 'salah-ketik')['error']
+    assert set(loaded) == {'a', 'b', 'grup'}
+    results = {r['id']: r for r in run_batch(tasks)}
+    assert set(results) == {'baik', 'baik-2'}
+    assert all(r['status'] == 'success' for r in results.values())
@@ -0,0 +1,57 @@
+# ========================================================================
+# File: tests/test_export_engine.py
+# Deskripsi: Kompilasi skripsi multi-bab ke PDF harus memuat setiap judul
+#            bab/sub-bab, daftar pustaka gabungan, dan daftar isi bernomor
+#            halaman.
+# ========================================================================
+
+import io
+import re
+
+import pytest
+
+pytest.importorskip('reportlab')
+PyPDF2 = pytest.importorskip('PyPDF2')
+
+from app.export_engine import compile_thesis_pdf
+
+
+def _chapters(count=4):
+    return [{
+        'title': f'BAB {i} Pembahasan {i}',
+        'content': '<p>' + 'Kalimat pengisi halaman. ' * 300 + '</p>'
+                   f'<h2>Daftar Pustaka</h2><p>1. Penulis{i}, A. (2020). Judul Rujukan {i}.</p>',
+        'sections': [{'sub_bab': f'{i}.1 Rincian {i}', 'content': '<p>Isi sub-bab.</p>'}],
+    } for i in range(1, count + 1)]
+
+
+def _pages_text(buffer):
+    reader = PyPDF2.PdfReader(io.BytesIO(buffer.getvalue()))
+    return [page.extract_text() for page in reader.pages]
+
+
+def test_compile_thesis_pdf_contains_every_chapter_and_bibliography():
+    buffer = io.BytesIO()
+    compile_thesis_pdf(buffer, 'Skripsi Uji', _chapters(), {'author': 'Mahasiswa'})
+    pages = _pages_text(buffer)
+    body = '\n'.join(pages[2:])
+
+    for i in range(1, 5):
+        assert f'BAB {i} Pembahasan {i}' in body
+        assert f'{i}.1 Rincian {i}' in body
+        assert f'Judul Rujukan {i}' in body
+    assert 'DAFTAR PUSTAKA' in pages[-1]
+
+
+def test_compile_thesis_pdf_toc_has_page_numbers():
+    buffer = io.BytesIO()
+    compile_thesis_pdf(buffer, 'Skripsi Uji', _chapters(), {})
+    pages = _pages_text(buffer)
+    toc = pages[1]
+
+    assert 'DAFTAR ISI' in toc
+    numbers = {int(n) for n in re.findall(r'\b\d+\b', toc)}
+    # Setiap bab diawali halaman baru setelah halaman judul dan daftar isi
+    chapter_pages = [index + 1 for index, text in enumerate(pages) if re.search(r'^BAB \d', text, re.M) and index > 1]
+    assert chapter_pages and set(chapter_pages) <= numbers
+    assert len(pages) in numbers  # daftar pustaka di halaman terakhir
@@ -0,0 +1,42 @@
+# ========================================================================
+# File: tests/test_ingest.py
+# Deskripsi: Pembacaan CSV berhenti pada batas baris dan tetap benar saat
+#            pembaca pyarrow harus jatuh kembali ke jalur pandas.
+# ========================================================================
+
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import ingest
+
+
+def _csv(rows):
+    frame = pd.DataFrame({'nilai': np.arange(rows, dtype=float), 'grup': np.array(['a', 'b'])[np.arange(rows) % 2], 'lain': 1})
+    return frame.to_csv(index=False).encode('utf-8')
+
+
+@pytest.mark.parametrize('pyarrow_available', [True, False])
+def test_read_table_stops_at_max_rows(monkeypatch, pyarrow_available):
+    if pyarrow_available and not ingest.PYARROW_AVAILABLE:
+        pytest.skip('pyarrow tidak terpasang')
+    monkeypatch.setattr(ingest, 'PYARROW_AVAILABLE', pyarrow_available)
+    df = ingest.read_table(io.BytesIO(_csv(50_000)), 'data.csv', ['nilai'], ['grup'], max_rows=1234)
+    assert list(df.columns) == ['nilai', 'grup']
+    assert len(df) == 1234
+    assert df['nilai'].iloc[-1] == 1233
+    assert isinstance(df['grup'].dtype, pd.CategoricalDtype)
+
+
+def test_read_csv_falls_back_when_later_block_changes_type(monkeypatch):
+    if not ingest.PYARROW_AVAILABLE:
+        pytest.skip('pyarrow tidak terpasang')
+    monkeypatch.setattr(ingest, 'CSV_BLOCK_BYTES', 1024)
+    data = b'nilai,grup\n' + b'1,a\n' * 2000 + b'-,b\n'
+    df = ingest.read_table(io.BytesIO(data), 'data.csv', ['nilai'], ['grup'])
+    assert len(df) == 2001
+    assert df['nilai'].isna().sum() == 1
+    full = ingest.read_full_table(io.BytesIO(data), 'data.csv', max_rows=10)
+    assert len(full) == 10
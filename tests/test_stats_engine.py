@@ -0,0 +1,153 @@
+# ========================================================================
+# File: tests/test_stats_engine.py
+# Deskripsi: Paritas numerik stats_engine terhadap pustaka yang digantikannya
+#            (scipy, statsmodels, pandas, pingouin) pada data dengan seed tetap:
+#            studentized_range_sf, tabel ANOVA satu/dua arah, Levene, Kruskal,
+#            post-hoc, korelasi dengan NaN, dan uji normalitas sampel besar.
+# ========================================================================
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from app.stats_engine import (
+    GroupIndex, correlation_matrix, gameshowell_table, group_levene_table, kruskal_table,
+    normality_columns, oneway_anova_table, studentized_range_sf, tukey_table, twoway_anova_table,
+)
+
+Q_GRID = np.array([0.1, 0.5, 1.0, 2.0, 3.5, 5.0, 8.0, 15.0])
+DF_GRID = np.array([1, 2, 3, 5, 10, 30, 120, 1000, 99_999, 100_000, 1e7, np.inf])
+
+
+@pytest.mark.parametrize('k', [2, 3, 5, 10, 20])
+def test_studentized_range_sf_matches_scipy(k):
+    q, df = np.meshgrid(Q_GRID, DF_GRID)
+    expected = np.vectorize(lambda qi, dfi: stats.studentized_range.sf(qi, k, dfi))(q, df)
+    np.testing.assert_allclose(studentized_range_sf(q, k, df), expected, rtol=0, atol=5e-8)
+
+
+def test_studentized_range_sf_invalid_input_is_nan():
+    result = studentized_range_sf([np.nan, 3.0, 3.0], 3, [10, np.nan, 0])
+    assert np.isnan(result).all()
+
+
+def _groups(seed=0):
+    """Tiga grup tidak seimbang dengan varians berbeda (dan satu nilai kembar untuk ties)."""
+    rng = np.random.default_rng(seed)
+    groups = [rng.normal(10, 1, 25), rng.normal(11, 2, 40), rng.normal(10.5, 3, 18)]
+    groups[2][:3] = groups[1][:3]
+    values = np.concatenate(groups)
+    factor = np.repeat(['a', 'b', 'c'], [g.size for g in groups])
+    return groups, GroupIndex.from_factor(values, factor)
+
+
+def test_oneway_anova_matches_scipy_f_oneway():
+    groups, index = _groups()
+    table = oneway_anova_table(index, 'grup')
+    expected = stats.f_oneway(*groups)
+    assert table.loc[0, 'F'] == pytest.approx(expected.statistic, rel=1e-10)
+    assert table.loc[0, 'p-unc'] == pytest.approx(expected.pvalue, rel=1e-8)
+    assert list(table['DF']) == [2, sum(g.size for g in groups) - 3]
+
+
+def test_group_levene_matches_scipy_median_levene():
+    groups, index = _groups()
+    table = group_levene_table(index)
+    expected = stats.levene(*groups, center='median')
+    assert table.loc['levene', 'W'] == pytest.approx(expected.statistic, rel=1e-10)
+    assert table.loc['levene', 'pval'] == pytest.approx(expected.pvalue, rel=1e-8)
+
+
+def test_kruskal_matches_scipy_with_ties():
+    groups, index = _groups()
+    table = kruskal_table(index, 'grup')
+    expected = stats.kruskal(*groups)
+    assert table.loc['Kruskal', 'H'] == pytest.approx(expected.statistic, rel=1e-10)
+    assert table.loc['Kruskal', 'p-unc'] == pytest.approx(expected.pvalue, rel=1e-8)
+
+
+def test_tukey_matches_scipy_tukey_hsd():
+    groups, index = _groups()
+    table = tukey_table(index)
+    expected = stats.tukey_hsd(*groups)
+    for _, row in table.iterrows():
+        i, j = index.labels.index(row['A']), index.labels.index(row['B'])
+        assert row['diff'] == pytest.approx(expected.statistic[i, j], rel=1e-10)
+        assert row['p-tukey'] == pytest.approx(expected.pvalue[i, j], abs=1e-6)
+
+
+def test_gameshowell_matches_pingouin():
+    pg = pytest.importorskip('pingouin')
+    groups, index = _groups()
+    frame = pd.DataFrame({'y': np.concatenate(groups), 'g': np.repeat(['a', 'b', 'c'], [g.size for g in groups])})
+    expected = pg.pairwise_gameshowell(frame, dv='y', between='g')
+    table = gameshowell_table(index)
+    for column in ('diff', 'se', 'T', 'df', 'hedges'):
+        np.testing.assert_allclose(table[column], expected[column], rtol=1e-8)
+    np.testing.assert_allclose(table['pval'], expected['pval'], atol=1e-6)
+
+
+def test_twoway_anova_matches_statsmodels_type2_unbalanced():
+    smf = pytest.importorskip('statsmodels.formula.api')
+    sm = pytest.importorskip('statsmodels.api')
+    rng = np.random.default_rng(1)
+    n = 150
+    frame = pd.DataFrame({
+        'a': rng.choice(['a1', 'a2', 'a3'], n, p=[0.5, 0.3, 0.2]),
+        'b': rng.choice(['b1', 'b2'], n, p=[0.7, 0.3]),
+    })
+    frame['y'] = rng.normal(0, 1, n) + (frame['a'] == 'a2') * 0.8 + (frame['b'] == 'b2') * 0.5 \
+        + ((frame['a'] == 'a3') & (frame['b'] == 'b2')) * 1.2
+    expected = sm.stats.anova_lm(smf.ols('y ~ C(a) * C(b)', data=frame).fit(), typ=2)
+    table, *_ = twoway_anova_table(frame['y'].to_numpy(), frame['a'], frame['b'], 'a', 'b')
+
+    for row, source in enumerate(['C(a)', 'C(b)', 'C(a):C(b)', 'Residual']):
+        assert table.loc[row, 'SS'] == pytest.approx(expected.loc[source, 'sum_sq'], rel=1e-8)
+        assert table.loc[row, 'DF'] == expected.loc[source, 'df']
+        if source != 'Residual':
+            assert table.loc[row, 'F'] == pytest.approx(expected.loc[source, 'F'], rel=1e-8)
+            assert table.loc[row, 'p-unc'] == pytest.approx(expected.loc[source, 'PR(>F)'], rel=1e-6)
+
+
+def _frame_with_nans(seed=2):
+    rng = np.random.default_rng(seed)
+    base = rng.normal(size=(200, 1))
+    frame = pd.DataFrame(base + rng.normal(scale=[0.5, 1.0, 2.0, 4.0], size=(200, 4)), columns=list('wxyz'))
+    for column, fraction in zip(frame.columns, (0.0, 0.05, 0.2, 0.35)):
+        frame.loc[rng.random(200) < fraction, column] = np.nan
+    return frame
+
+
+def test_correlation_matrix_pairwise_matches_pandas_with_nans():
+    frame = _frame_with_nans()
+    result = correlation_matrix(frame.to_numpy(), 'pearson', 'pairwise')
+    np.testing.assert_allclose(result['r'], frame.corr().to_numpy(), rtol=1e-10)
+    np.testing.assert_array_equal(result['n'], frame.notna().astype(int).T @ frame.notna().astype(int))
+    pair = frame[['x', 'z']].dropna()
+    assert result['p'][1, 3] == pytest.approx(stats.pearsonr(pair['x'], pair['z']).pvalue, rel=1e-8)
+
+
+def test_correlation_matrix_spearman_is_listwise():
+    frame = _frame_with_nans()
+    result = correlation_matrix(frame.to_numpy(), 'spearman')
+    np.testing.assert_allclose(result['r'], frame.dropna().corr(method='spearman').to_numpy(), rtol=1e-10)
+
+
+@pytest.mark.filterwarnings('ignore::FutureWarning')  # stats.anderson tanpa method di SciPy >= 1.17
+def test_normality_columns_match_scipy():
+    rng = np.random.default_rng(3)
+    matrix = np.column_stack([rng.normal(size=400), rng.exponential(size=400), rng.standard_t(5, size=400)])
+    matrix[rng.random(400) < 0.1, 1] = np.nan
+    results = normality_columns(matrix)
+    for j, result in enumerate(results):
+        column = matrix[~np.isnan(matrix[:, j]), j]
+        tests = {t['test']: t for t in result['tests']}
+        k2 = stats.normaltest(column)
+        jb = stats.jarque_bera(column)
+        assert tests["D'Agostino-Pearson"]['statistic'] == pytest.approx(k2.statistic, rel=1e-8)
+        assert tests["D'Agostino-Pearson"]['p'] == pytest.approx(k2.pvalue, rel=1e-6, abs=1e-300)
+        assert tests['Jarque-Bera']['statistic'] == pytest.approx(jb.statistic, rel=1e-8)
+        assert tests['Jarque-Bera']['p'] == pytest.approx(jb.pvalue, rel=1e-6, abs=1e-300)
+        assert tests['Anderson-Darling']['statistic'] == pytest.approx(stats.anderson(column).statistic, rel=1e-8)
+        assert result['n'] == column.size